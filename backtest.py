@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""Event-driven backtester for the sentiment + breakout strategy.
+
+Replays stored minute bars and historical sentiment records through the
+same rules the live trader uses:
+    - candidate ranking by probability (run_trader)
+    - screener.entry_conditions (entry_signal, evaluated for every bar)
+    - strategy.shares_for_risk (size_position)
+    - strategy.exit_levels / split_qty / trail_exit_reason (submit_split_exit)
+Fills go through SimBroker instead of Alpaca.
+
+Indicators and signals are computed once per symbol as whole-series
+arrays; the event loop only visits trader cycles, and each position's
+exits are found with a vectorized scan instead of stepping bar by bar.
+Returns:
+    BacktestResult with a trades DataFrame, realized equity curve and
+    summary stats (pnl, hit rate, drawdown)
+"""
+
+import os
+import glob
+import heapq
+import sqlite3
+from datetime import time as dtime
+
+import numpy as np
+import pandas as pd
+
+from screener import entry_conditions
+from columnar_sink import read_dataset
+from strategy import (
+    compute_indicators,
+    trail_ema,
+    shares_for_risk,
+    exit_levels,
+    split_qty
+)
+
+TZ_NY         = "America/New_York"
+TRADE_DB_FILE = "potential_trades.db"
+BAR_LOOKBACK  = pd.Timedelta(minutes=60)   # run_trader fetches the last 60 min
+
+# Live defaults from main_scheduler / stock_news_analyzer / trader / screener
+DEFAULT_PARAMS = {
+    "risk_pct":            0.02,
+    "stop_pct":            0.02,
+    "rr":                  2.0,
+    "ema_len":             5,
+    "sentiment_threshold": 0.7,
+    "title_penalty":       0.85,
+    "vol_mult":            1.5,
+    "pb_pct":              0.003,
+    "rsi_max":             70,
+    "max_open_trades":     3,
+    "max_checked_symbols": 5,
+    "cycle_minutes":       10,
+    "trader_start":        dtime(8, 0),
+    "trader_end":          dtime(19, 0),
+    "starting_cash":       100_000.0,
+}
+
+# ── Loaders ───────────────────────────────────────────────────────────────────
+def load_bars_csv(directory: str) -> dict:
+    """
+    Load <SYMBOL>.csv minute-bar files (TwelveData layout:
+    datetime,open,high,low,close,volume in NY time) into
+    {symbol: tz-aware DataFrame}.
+    """
+    bars = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+        symbol = os.path.splitext(os.path.basename(path))[0].upper()
+        df = pd.read_csv(path, parse_dates=["datetime"]).sort_values("datetime")
+        idx = pd.DatetimeIndex(df["datetime"])
+        df.index = idx.tz_localize(TZ_NY) if idx.tz is None else idx.tz_convert(TZ_NY)
+        bars[symbol] = df[["open", "high", "low", "close", "volume"]].astype(float)
+    return bars
+
+def load_sentiment_csv(path: str) -> pd.DataFrame:
+    """
+    Load sentiment records: timestamp,ticker,probability and optionally
+    sentiment (label) and used_fallback (title-only article).
+    """
+    return _normalize_sentiment(pd.read_csv(path))
+
+def load_sentiment_db(db_file: str = TRADE_DB_FILE) -> pd.DataFrame:
+    """
+    Load the saved trade candidates (ticker, probability, timestamp): the
+    full day-partitioned history when present, else the latest-per-ticker table.
+    """
+    conn = sqlite3.connect(db_file)
+    has_history = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'trade_history'").fetchone()
+    table = "trade_history" if has_history else "trades"
+    df = pd.read_sql_query(f"SELECT timestamp, ticker, probability FROM {table}", conn)
+    conn.close()
+    return _normalize_sentiment(df)
+
+def load_bars_columnar(root: str, start=None, end=None, symbols=None) -> dict:
+    """
+    Load the trader's recorded minute bars from the columnar `bars`
+    dataset under root into {symbol: tz-aware DataFrame}.
+    """
+    df = read_dataset("bars", root, start, end, symbols)
+    bars = {}
+    for symbol, g in df.groupby("ticker", sort=True):
+        g = g.drop_duplicates("timestamp", keep="last").set_index("timestamp")
+        bars[str(symbol).upper()] = g[["open", "high", "low", "close", "volume"]].astype(float)
+    return bars
+
+def load_sentiment_columnar(root: str, start=None, end=None) -> pd.DataFrame:
+    """Load every recorded per-ticker decision (timestamp, ticker, probability, sentiment)."""
+    df = read_dataset("decisions", root, start, end,
+                      columns=["timestamp", "ticker", "probability", "sentiment"])
+    return _normalize_sentiment(df)
+
+def _normalize_sentiment(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    ts = pd.to_datetime(df["timestamp"])
+    df["timestamp"] = ts.dt.tz_localize(TZ_NY) if ts.dt.tz is None else ts.dt.tz_convert(TZ_NY)
+    df["ticker"] = df["ticker"].astype(str).str.split(":").str[-1].str.strip()
+    return df.sort_values("timestamp").reset_index(drop=True)
+
+# ── Per-symbol preparation (vectorized) ───────────────────────────────────────
+def prepare_symbol(df: pd.DataFrame, params: dict, indicators: pd.DataFrame = None) -> dict:
+    """
+    Compute indicators, per-bar entry signal and trail EMA for one symbol.
+    Yesterday's high comes from the previous session's minute bars.
+    `indicators` lets callers (e.g. the sweep runner) reuse a frame that
+    already went through compute_indicators.
+    """
+    if indicators is None:
+        indicators = compute_indicators(df.copy())
+    ind = indicators
+
+    day = ind.index.normalize()
+    day_high = ind["high"].groupby(day).max()
+    y_high = day.map(day_high.shift(1)).to_numpy(dtype=float)
+    # no previous session in the data → treat as no breakout
+    y_high[np.isnan(y_high)] = np.inf
+
+    bars = {f: ind[f].to_numpy(dtype=float)[None, :]
+            for f in ("close", "volume", "vwap", "ema5", "rsi14")}
+    cond = entry_conditions(bars,
+                            y_high[None, :],
+                            vol_mult=params["vol_mult"],
+                            pb_pct=params["pb_pct"],
+                            rsi_max=params["rsi_max"])
+
+    day_codes = pd.factorize(day)[0]
+    day_end = np.searchsorted(day_codes, day_codes, side="right") - 1
+
+    return {
+        "ts":      ind.index.asi8,
+        "open":    ind["open"].to_numpy(dtype=float),
+        "high":    ind["high"].to_numpy(dtype=float),
+        "close":   ind["close"].to_numpy(dtype=float),
+        "ema":     trail_ema(ind["close"], params["ema_len"]).to_numpy(dtype=float),
+        "signal":  cond["signal"][0],
+        "day_end": day_end,
+        "days":    day_high.index,
+    }
+
+def _first(mask: np.ndarray):
+    """Index of the first True in mask, or None."""
+    if not mask.any():
+        return None
+    return int(np.argmax(mask))
+
+# ── Simulated broker ──────────────────────────────────────────────────────────
+class SimBroker:
+    """
+    Cash-only broker: market entries fill at the next bar's open, exits are
+    scheduled fills that settle when the clock reaches them.
+    A symbol counts as an open position until every share is sold,
+    like Alpaca's list_positions.
+    """
+
+    def __init__(self, cash: float):
+        self.cash    = cash
+        self.open    = {}     # symbol -> shares still held
+        self.fills   = []
+        self._exits  = []     # heap of (ts, seq, symbol, qty, price, reason)
+        self._seq    = 0
+
+    def buy(self, symbol, qty, price, ts):
+        self.cash -= qty * price
+        self.open[symbol] = self.open.get(symbol, 0) + qty
+        self.fills.append((ts, symbol, "buy", qty, price, "entry"))
+
+    def schedule_sell(self, symbol, qty, price, ts, reason):
+        heapq.heappush(self._exits, (ts, self._seq, symbol, qty, price, reason))
+        self._seq += 1
+
+    def advance(self, ts):
+        """Settle every scheduled sell at or before ts."""
+        while self._exits and self._exits[0][0] <= ts:
+            fill_ts, _, symbol, qty, price, reason = heapq.heappop(self._exits)
+            self.cash += qty * price
+            self.open[symbol] -= qty
+            if self.open[symbol] <= 0:
+                del self.open[symbol]
+            self.fills.append((fill_ts, symbol, "sell", qty, price, reason))
+
+    def open_symbols(self):
+        return set(self.open)
+
+# ── Split exit simulation ─────────────────────────────────────────────────────
+def simulate_split_exit(data: dict, fill_idx: int, entry_price: float, qty: int, params: dict):
+    """
+    Mirror submit_split_exit from the bar the entry filled on:
+      - half as a day limit at the rr target (fills at target, or the open
+        if the bar gaps through it)
+      - the rest trailed on close < EMA(ema_len) or close < hard stop,
+        sold at the next bar's open
+    Anything still held at the session's last bar is sold at its close
+    (the day limit expires and the trail runs out of bars).
+    Returns a list of (bar index, qty, price, reason).
+    """
+    stop_price, target_price = exit_levels(entry_price, params["stop_pct"], params["rr"])
+    half_qty, trail_qty      = split_qty(qty)
+    last = data["day_end"][fill_idx]
+    lo, hi = fill_idx + 1, last + 1
+    exits = []
+
+    if half_qty:
+        j = _first(data["high"][lo:hi] >= target_price)
+        if j is None:
+            exits.append((last, half_qty, data["close"][last], "eod"))
+        else:
+            j += lo
+            exits.append((j, half_qty, max(target_price, data["open"][j]), "target"))
+
+    close = data["close"][lo:hi]
+    broke_ema  = close < data["ema"][lo:hi]
+    broke_stop = close < stop_price
+    j = _first(broke_ema | broke_stop)
+    if j is None:
+        exits.append((last, trail_qty, data["close"][last], "eod"))
+    else:
+        reason = "EMA" if broke_ema[j] else "STOP"
+        j += lo
+        if j + 1 <= last:
+            exits.append((j + 1, trail_qty, data["open"][j + 1], reason))
+        else:
+            exits.append((j, trail_qty, data["close"][j], reason))
+    return exits
+
+# ── Backtest loop ─────────────────────────────────────────────────────────────
+class BacktestResult:
+    def __init__(self, trades: pd.DataFrame, fills: pd.DataFrame, starting_cash: float):
+        self.trades        = trades
+        self.fills         = fills
+        self.starting_cash = starting_cash
+
+    @property
+    def equity(self) -> pd.Series:
+        """Realized equity after each closed trade."""
+        if self.trades.empty:
+            return pd.Series([self.starting_cash], dtype=float)
+        t = self.trades.sort_values("exit_time")
+        return pd.Series(self.starting_cash + t["pnl"].cumsum().to_numpy(),
+                         index=t["exit_time"].to_numpy())
+
+    def summary(self) -> dict:
+        return summarize(self.trades, self.starting_cash)
+
+def summarize(trades: pd.DataFrame, starting_cash: float) -> dict:
+    """Compact stats: pnl, return, hit rate and max drawdown of realized equity."""
+    if trades.empty:
+        return {"trades": 0, "pnl": 0.0, "return_pct": 0.0,
+                "hit_rate": float("nan"), "max_drawdown": 0.0, "max_drawdown_pct": 0.0}
+    pnl = trades.sort_values("exit_time")["pnl"].to_numpy()
+    equity = starting_cash + np.concatenate([[0.0], np.cumsum(pnl)])
+    peak = np.maximum.accumulate(equity)
+    dd = peak - equity
+    return {
+        "trades":           int(len(pnl)),
+        "pnl":              float(pnl.sum()),
+        "return_pct":       float(pnl.sum() / starting_cash * 100),
+        "hit_rate":         float((pnl > 0).mean()),
+        "max_drawdown":     float(dd.max()),
+        "max_drawdown_pct": float((dd / peak).max() * 100),
+    }
+
+def _cycle_times(prepared: dict, params: dict) -> np.ndarray:
+    """run_trader timestamps (ns): every cycle_minutes inside the trader window on days with data."""
+    days = set()
+    for data in prepared.values():
+        days.update(data["days"])
+    freq  = f"{params['cycle_minutes']}min"
+    start = params["trader_start"]
+    end   = params["trader_end"]
+    times = []
+    for d in sorted(days):
+        first = d + pd.Timedelta(hours=start.hour, minutes=start.minute)
+        last  = d + pd.Timedelta(hours=end.hour, minutes=end.minute)
+        times.append(pd.date_range(first, last, freq=freq).asi8)
+    return np.concatenate(times) if times else np.array([], dtype=np.int64)
+
+def _sentiment_events(sentiment: pd.DataFrame, params: dict):
+    """
+    Records that would have been written to the trades table: apply the
+    title penalty, then keep only records meeting the threshold.
+    """
+    prob = sentiment["probability"].to_numpy(dtype=float)
+    if "used_fallback" in sentiment:
+        fallback = sentiment["used_fallback"].fillna(False).astype(bool).to_numpy()
+        prob = np.where(fallback, prob * params["title_penalty"], prob)
+    keep = prob >= params["sentiment_threshold"]
+    if "sentiment" in sentiment:
+        keep &= sentiment["sentiment"].str.lower().eq("positive").to_numpy()
+    return (sentiment["timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64)[keep],
+            sentiment["ticker"].to_numpy()[keep],
+            prob[keep])
+
+def run_backtest(bars: dict, sentiment: pd.DataFrame, params: dict = None,
+                 prepared: dict = None) -> BacktestResult:
+    """
+    Replay `bars` ({symbol: minute DataFrame}) and `sentiment` records.
+    `prepared` may hold already-prepared symbol data (see prepare_symbol).
+    """
+    p = dict(DEFAULT_PARAMS)
+    p.update(params or {})
+
+    if prepared is None:
+        prepared = {s: prepare_symbol(df, p) for s, df in bars.items() if len(df)}
+    broker = SimBroker(p["starting_cash"])
+    lookback = BAR_LOOKBACK.value
+
+    ev_ts, ev_ticker, ev_prob = _sentiment_events(sentiment, p)
+    ev_i = 0
+    trades_table = {}   # ticker -> latest saved probability
+    trades = []
+
+    for now in _cycle_times(prepared, p):
+        broker.advance(now)
+
+        while ev_i < len(ev_ts) and ev_ts[ev_i] <= now:
+            trades_table[ev_ticker[ev_i]] = ev_prob[ev_i]
+            ev_i += 1
+        if not trades_table:
+            continue
+
+        open_syms  = broker.open_symbols()
+        slots_left = p["max_open_trades"] - len(open_syms)
+        if slots_left <= 0:
+            continue
+
+        ranked = heapq.nlargest(p["max_checked_symbols"], trades_table.items(),
+                                key=lambda kv: kv[1])
+        for symbol, _ in ranked:
+            if slots_left <= 0:
+                break
+            data = prepared.get(symbol)
+            if symbol in open_syms or data is None:
+                continue
+
+            # latest bar run_trader would have seen, and the bar we'd fill on
+            i = np.searchsorted(data["ts"], now, side="right") - 1
+            if i < 0 or data["ts"][i] < now - lookback or not data["signal"][i]:
+                continue
+            fill_idx = i + 1
+            if fill_idx > data["day_end"][i]:
+                continue
+
+            qty = shares_for_risk(broker.cash, data["close"][i], p["risk_pct"], p["stop_pct"])
+            entry_price = data["open"][fill_idx]
+            qty = min(qty, int(broker.cash // entry_price))
+            if qty <= 0:
+                continue
+
+            fill_ts = data["ts"][fill_idx]
+            broker.buy(symbol, qty, entry_price, fill_ts)
+            exits = simulate_split_exit(data, fill_idx, entry_price, qty, p)
+            proceeds = 0.0
+            for j, q, px, reason in exits:
+                broker.schedule_sell(symbol, q, px, data["ts"][j], reason)
+                proceeds += q * px
+            trades.append({
+                "symbol":      symbol,
+                "signal_time": data["ts"][i],
+                "entry_time":  fill_ts,
+                "entry_price": entry_price,
+                "qty":         qty,
+                "exit_time":   max(data["ts"][j] for j, *_ in exits),
+                "exit_reasons": "/".join(r for *_, r in exits),
+                "pnl":         proceeds - qty * entry_price,
+            })
+            slots_left -= 1
+
+    broker.advance(np.iinfo(np.int64).max)
+
+    trades_df = pd.DataFrame(trades, columns=[
+        "symbol", "signal_time", "entry_time", "entry_price", "qty",
+        "exit_time", "exit_reasons", "pnl"])
+    for col in ("signal_time", "entry_time", "exit_time"):
+        trades_df[col] = pd.to_datetime(trades_df[col], utc=True).dt.tz_convert(TZ_NY)
+    fills_df = pd.DataFrame(broker.fills, columns=["ts", "symbol", "side", "qty", "price", "reason"])
+    fills_df["ts"] = pd.to_datetime(fills_df["ts"], utc=True).dt.tz_convert(TZ_NY)
+    return BacktestResult(trades_df, fills_df, p["starting_cash"])
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser("Backtest the sentiment + breakout strategy")
+    ap.add_argument("--bars-dir", required=True,
+                    help="Directory of <SYMBOL>.csv minute bars, or a columnar data dir")
+    ap.add_argument("--sentiment", default=TRADE_DB_FILE,
+                    help="Sentiment records (.csv), trades DB (.db) or a columnar data dir")
+    ap.add_argument("--trades-out", default=None,
+                    help="Optional CSV path for the simulated trades")
+    for key, val in DEFAULT_PARAMS.items():
+        if isinstance(val, (int, float)):
+            ap.add_argument(f"--{key.replace('_', '-')}", type=type(val), default=val)
+    args = ap.parse_args()
+
+    params = {k: getattr(args, k) for k, v in DEFAULT_PARAMS.items() if isinstance(v, (int, float))}
+    bars = (load_bars_columnar(args.bars_dir)
+            if os.path.isdir(os.path.join(args.bars_dir, "bars"))
+            else load_bars_csv(args.bars_dir))
+    if os.path.isdir(args.sentiment):
+        sentiment = load_sentiment_columnar(args.sentiment)
+    elif args.sentiment.endswith(".db"):
+        sentiment = load_sentiment_db(args.sentiment)
+    else:
+        sentiment = load_sentiment_csv(args.sentiment)
+
+    print(f"→ Backtesting {len(bars)} symbols against {len(sentiment)} sentiment records…")
+    result = run_backtest(bars, sentiment, params)
+    for k, v in result.summary().items():
+        print(f"   {k:>16}: {v:.4f}" if isinstance(v, float) else f"   {k:>16}: {v}")
+    if args.trades_out:
+        result.trades.to_csv(args.trades_out, index=False)
+        print(f"→ wrote {len(result.trades)} trades to {args.trades_out}")
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""Offline benchmark harness for the pipeline's hot paths.
+
+Every benchmark replays recorded inputs from benchmarks/fixtures/ (a saved
+TradingView gainers page, a Google News RSS feed, an article page, a
+TwelveData time_series response and Alpaca REST responses), so runs are
+reproducible and never touch the network.
+
+Results are written to benchmarks/results.json and compared against
+benchmarks/baselines.json: a benchmark regresses when its fastest run
+(min_s, the least noisy statistic) exceeds baseline × (1 + threshold).
+Sub-millisecond benchmarks are repeated until they've run for at least
+MIN_TOTAL_S and get the looser FAST_THRESHOLD, since scheduler jitter is a
+large fraction of their time. A benchmark over its limit is re-timed up to
+CONFIRM_RUNS more times and only fails if it stays over; --update-baseline
+likewise times CONFIRM_RUNS + 1 rounds and records the slowest round's
+min, so the baseline covers the recording machine's own drift. Benchmarks whose dependencies aren't
+installed (e.g. FinBERT weights, pandas_ta) are skipped and reported, and
+get no baseline until they've been recorded on a machine that has them.
+
+Baselines are absolute timings and only hold on the machine (and Python)
+that recorded them — the env they were taken on is stored alongside them
+and a mismatch is warned about. Re-record with --update-baseline before
+gating on a new machine.
+Usage:
+    python benchmarks/run_benchmarks.py                  # run + compare
+    python benchmarks/run_benchmarks.py --only gainers_parse feed_parse
+    python benchmarks/run_benchmarks.py --update-baseline
+Exits non-zero if any benchmark regressed.
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+from contextlib import contextmanager
+
+HERE     = os.path.dirname(os.path.abspath(__file__))
+ROOT     = os.path.dirname(HERE)
+FIXTURES = os.path.join(HERE, "fixtures")
+BASELINE_FILE = os.path.join(HERE, "baselines.json")
+RESULTS_FILE  = os.path.join(HERE, "results.json")
+DEFAULT_THRESHOLD = 0.25
+FAST_THRESHOLD    = 0.50    # for benchmarks under FAST_BELOW_S
+FAST_BELOW_S      = 0.001
+MIN_TOTAL_S       = 0.5     # keep repeating short benchmarks up to this much timed work
+MAX_REPEAT        = 1000
+CONFIRM_RUNS      = 2       # re-time a regressed benchmark this many times before failing
+
+for sub in ("", "scraper", "sentiment"):
+    path = os.path.join(ROOT, sub)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# trader.py reads credentials at import; nothing here talks to the network
+for var in ("APCA_API_KEY_ID", "APCA_API_SECRET_KEY", "TWELVEDATA_API_KEY"):
+    os.environ.setdefault(var, "offline-benchmark")
+
+class SkipBenchmark(Exception):
+    pass
+
+def fixture(name, mode="r"):
+    with open(os.path.join(FIXTURES, name), mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+        return f.read()
+
+def fixture_json(name):
+    return json.loads(fixture(name))
+
+def need(module):
+    """Import a module or skip the benchmark that needs it."""
+    try:
+        return __import__(module)
+    except Exception as e:
+        raise SkipBenchmark(f"{module} unavailable ({type(e).__name__}: {e})")
+
+# ── Replayed network layers ───────────────────────────────────────────────────
+class _Response:
+    def __init__(self, payload):
+        self._payload = payload
+        self.status_code = 200
+        self.ok = True
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+class ReplayAlpaca:
+    """Alpaca REST stand-in built from the recorded JSON responses."""
+
+    def __init__(self):
+        from alpaca_trade_api.entity import Account, Position
+        from alpaca_trade_api.entity_v2 import TradeV2
+        self._account   = Account(fixture_json("alpaca_account.json"))
+        self._positions = [Position(p) for p in fixture_json("alpaca_positions.json")]
+        self._trades    = {s: TradeV2(t) for s, t in fixture_json("alpaca_latest_trades.json")["trades"].items()}
+        self._daily     = fixture_json("alpaca_daily_bars.json")["bars"]
+
+    def get_bars(self, symbols, timeframe, start=None, end=None, limit=None):
+        import pandas as pd
+        rows = []
+        for s in symbols:
+            for b in self._daily.get(s, self._daily[next(iter(self._daily))]):
+                rows.append({"timestamp": pd.Timestamp(b["t"]), "symbol": s, "open": b["o"],
+                             "high": b["h"], "low": b["l"], "close": b["c"], "volume": b["v"]})
+        df = pd.DataFrame(rows).set_index("timestamp")
+        return type("Bars", (), {"df": df})()
+
+    def get_account(self):
+        return self._account
+
+    def list_positions(self):
+        return list(self._positions)
+
+    def get_latest_trades(self, symbols):
+        first = next(iter(self._trades.values()))
+        return {s: self._trades.get(s, first) for s in symbols}
+
+@contextmanager
+def patched(obj, name, value):
+    old = getattr(obj, name)
+    setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        setattr(obj, name, old)
+
+def _trader():
+    need("pandas_ta")
+    import trader
+    return trader
+
+def _twelvedata_get(*args, **kwargs):
+    return _Response(fixture_json("twelvedata_time_series.json"))
+
+# ── Benchmarks ────────────────────────────────────────────────────────────────
+# each entry: name -> setup() returning the zero-arg callable to time
+BENCHMARKS = {}
+
+def benchmark(name):
+    def deco(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return deco
+
+@benchmark("gainers_parse")
+def _gainers_parse():
+    scraper = need("tradingview_gainers_scraper")
+    html = fixture("tradingview_gainers.html")
+    def run():
+        rows = scraper.parse_gainers_html(html)
+        assert len(rows) == 100
+    return run
+
+@benchmark("feed_parse")
+def _feed_parse():
+    google_search = need("google_search")
+    rss = fixture("google_news.rss", "rb")
+    real_parse = google_search.feedparser.parse
+    def run():
+        with patched(google_search.feedparser, "parse", lambda url: real_parse(rss)):
+            arts = google_search.fetch_google_news_feed_sorted(
+                "Nuvve Holding", max_results=10, minutes_back=10 * 365 * 24 * 60)
+        assert len(arts) == 10
+    return run
+
+@benchmark("article_extract")
+def _article_extract():
+    article_sentiment = need("article_sentiment")
+    html = fixture("article.html")
+    url = "https://www.tipranks.com/news/company-announcements/nuvve-holding-engages-advisors-for-digital-asset-growth"
+    if article_sentiment.extract_main_content(url, html=html) is None:
+        raise SkipBenchmark("newspaper could not parse the fixture (NLTK data missing?)")
+    def run():
+        article_sentiment.extract_main_content(url, html=html)
+    return run
+
+@benchmark("http_cache_hit")
+def _http_cache_hit():
+    http_cache = need("http_cache")
+    import tempfile
+    url = "https://www.tipranks.com/news/company-announcements/nuvve-holding-engages-advisors-for-digital-asset-growth"
+    cache = http_cache.HttpCache(tempfile.mkdtemp(prefix="bench-http-cache-"), offline=True)
+    cache.put(url, fixture("article.html", "rb"), {"Content-Type": "text/html; charset=utf-8"})
+    def run():
+        resp = cache.get(url)
+        assert resp.from_cache and len(resp.text) > 1000
+    return run
+
+@benchmark("finbert_sentiment")
+def _finbert():
+    finbert_utils = need("finbert_utils")
+    article_sentiment = need("article_sentiment")
+    from bs4 import BeautifulSoup
+    text = BeautifulSoup(fixture("article.html"), "html.parser").find("div", class_="post-entry").get_text(" ")
+    def run():
+        finbert_utils.estimate_sentiment(text)
+    return run
+
+@benchmark("indicators_entry_signal")
+def _indicators_entry_signal():
+    trader = _trader()
+    api = ReplayAlpaca()
+    with patched(trader.requests, "get", _twelvedata_get):
+        bars = trader.get_minute_bars("NVVE", "2025-05-09T09:30:00", "2025-05-09T16:00:00")
+    def run():
+        with patched(trader, "api", api):
+            df = trader.compute_indicators(bars.copy())
+            trader.entry_signal("NVVE", df)
+    return run
+
+@benchmark("screener_universe")
+def _screener_universe():
+    trader = _trader()
+    import screener
+    with patched(trader.requests, "get", _twelvedata_get):
+        bars = trader.get_minute_bars("NVVE", "2025-05-09T09:30:00", "2025-05-09T16:00:00")
+    frames = {f"S{i:03d}": trader.compute_indicators(bars.tail(60).copy()) for i in range(300)}
+    highs  = {s: 2.2 for s in frames}
+    def run():
+        screener.screen_frames(frames, highs)
+    return run
+
+@benchmark("full_cycle")
+def _full_cycle():
+    """Gainers → feed → article → FinBERT → bars/indicators → screen → size, all replayed."""
+    scraper   = need("tradingview_gainers_scraper")
+    google_search = need("google_search")
+    article_sentiment = need("article_sentiment")
+    finbert_utils = need("finbert_utils")
+    trader = _trader()
+    import screener
+    from broker_snapshot import BrokerSnapshot
+
+    html, rss, art = fixture("tradingview_gainers.html"), fixture("google_news.rss", "rb"), fixture("article.html")
+    real_parse = google_search.feedparser.parse
+    api = ReplayAlpaca()
+    url = "https://www.tipranks.com/news/company-announcements/nuvve"
+
+    def run():
+        gainers = scraper.parse_gainers_html(html)[:5]
+        with patched(google_search.feedparser, "parse", lambda u: real_parse(rss)), \
+             patched(trader.requests, "get", _twelvedata_get), \
+             patched(trader, "api", api):
+            frames = {}
+            for row in gainers:
+                symbol = row["ticker"].split(":")[-1]
+                google_search.fetch_google_news_feed_sorted(
+                    row["company_name"], max_results=1, minutes_back=10 * 365 * 24 * 60)
+                content = article_sentiment.extract_main_content(url, html=art)
+                finbert_utils.estimate_sentiment(content["summary"] if content else row["company_name"])
+                bars = trader.get_minute_bars(symbol, "2025-05-09T15:00:00", "2025-05-09T16:00:00")
+                frames[symbol] = trader.compute_indicators(bars.tail(60).copy())
+            signals = screener.screen_frames(frames, trader.get_yesterday_highs(
+                {s: df.index[-1] for s, df in frames.items()}))
+            snapshot = BrokerSnapshot(api).refresh(list(frames))
+            for symbol in frames:
+                trader.size_position(symbol, snapshot=snapshot)
+        return signals
+    return run
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+def time_it(fn, repeat: int, warmup: int = 1):
+    t0 = time.perf_counter()
+    for _ in range(warmup):
+        fn()
+    per_run = (time.perf_counter() - t0) / max(warmup, 1)
+    if per_run > 0:
+        repeat = max(repeat, min(MAX_REPEAT, int(MIN_TOTAL_S / per_run)))
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()    # as timeit does: a collection landing in one sample is noise
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    samples.sort()
+    return {
+        "median_s": statistics.median(samples),
+        "min_s":    samples[0],
+        "max_s":    samples[-1],
+        "repeat":   repeat,
+    }
+
+def load_baselines():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(results: dict, baselines: dict, threshold: float):
+    """Returns the names of benchmarks slower than their baseline allows.
+
+    Compares min_s; baselines recorded before min_s was stored fall back to
+    their median.
+    """
+    regressed = []
+    for name, r in results.items():
+        if "min_s" not in r:
+            continue
+        base = baselines.get("benchmarks", {}).get(name)
+        if not base:
+            r["status"] = "new"
+            continue
+        base_s = base.get("min_s", base.get("median_s"))
+        limit = base_s * (1 + base.get("threshold", threshold))
+        r["baseline_s"] = base_s
+        r["change_pct"] = (r["min_s"] / base_s - 1) * 100
+        r["status"] = "REGRESSED" if r["min_s"] > limit else "ok"
+        if r["status"] == "REGRESSED":
+            regressed.append(name)
+    return regressed
+
+def default_threshold(r: dict, threshold: float) -> float:
+    return max(threshold, FAST_THRESHOLD) if r["min_s"] < FAST_BELOW_S else threshold
+
+def current_env() -> dict:
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "platform": platform.platform()}
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser("Offline benchmarks for the pipeline hot paths")
+    ap.add_argument("--only", nargs="*", default=None, help="Benchmark names to run")
+    ap.add_argument("--repeat", type=int, default=7, help="Minimum timed runs per benchmark (short ones get more)")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="Allowed slowdown vs baseline when the baseline has none (0.25 = 25%%)")
+    ap.add_argument("--update-baseline", action="store_true",
+                    help="Write these results as the new baselines")
+    args = ap.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        ap.error(f"unknown benchmarks: {sorted(unknown)}")
+
+    results, timed = {}, {}
+    for name in names:
+        try:
+            timed[name] = BENCHMARKS[name]()
+            results[name] = time_it(timed[name], args.repeat)
+        except SkipBenchmark as e:
+            results[name] = {"status": "skipped", "reason": str(e)}
+
+    baselines = load_baselines()
+    env = current_env()
+    if baselines.get("env") and baselines["env"] != env and not args.update_baseline:
+        print(f"[WARN] baselines were recorded on {baselines['env'].get('platform')} "
+              f"(python {baselines['env'].get('python')}); timings here may not compare")
+    regressed = compare(results, baselines, args.threshold)
+    for _ in range(CONFIRM_RUNS):
+        retime = list(timed) if args.update_baseline else regressed
+        if not retime:
+            break
+        for name in retime:
+            again = time_it(timed[name], args.repeat)
+            if (again["min_s"] > results[name]["min_s"]) == args.update_baseline:
+                results[name] = again
+        regressed = compare(results, baselines, args.threshold)
+
+    print(f"{'benchmark':<26}{'min':>11}{'median':>11}{'baseline':>11}{'change':>9}  status")
+    for name, r in results.items():
+        if "min_s" not in r:
+            print(f"{name:<26}{'':>11}{'':>11}{'':>11}{'':>9}  skipped: {r['reason']}")
+            continue
+        base = f"{r['baseline_s'] * 1000:.2f}ms" if "baseline_s" in r else "—"
+        change = f"{r['change_pct']:+.1f}%" if "change_pct" in r else ""
+        print(f"{name:<26}{r['min_s'] * 1000:>9.2f}ms{r['median_s'] * 1000:>9.2f}ms"
+              f"{base:>11}{change:>9}  {r['status']}")
+
+    with open(RESULTS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"env": env, "benchmarks": results}, f, indent=2)
+
+    if args.update_baseline:
+        merged = baselines.get("benchmarks", {})
+        for name, r in results.items():
+            if "min_s" in r:
+                merged[name] = {"min_s": r["min_s"], "median_s": r["median_s"],
+                                "threshold": merged.get(name, {}).get(
+                                    "threshold", default_threshold(r, args.threshold))}
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"env": env, "benchmarks": merged}, f, indent=2)
+        print(f"→ baselines updated in {BASELINE_FILE}")
+        return 0
+
+    if regressed:
+        print(f"✖ regressions: {', '.join(regressed)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
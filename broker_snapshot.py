@@ -0,0 +1,104 @@
+"""Per-pass snapshot of broker state for sizing.
+
+Loads the account, open positions and latest trade prices in bulk once
+per trading pass (the REST calls run concurrently), then keeps them up
+to date locally as orders go out and fill. Sizing reads cash and prices
+from here and reserves cash for each entry under one lock, so entries
+submitted in parallel can't spend the same dollars twice.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class BrokerSnapshot:
+    def __init__(self, api):
+        self.api        = api
+        self.lock       = threading.RLock()
+        self.cash       = 0.0
+        self.positions  = {}     # symbol -> qty held
+        self.prices     = {}     # symbol -> latest trade price
+        self.reserved   = {}     # symbol -> cash earmarked for a pending entry
+
+    # ── bulk loads ────────────────────────────────────────────────────────────
+    def refresh(self, symbols=()):
+        """Reload account, positions and (optionally) quotes for symbols."""
+        with ThreadPoolExecutor(max_workers=3) as exe:
+            acct_f = exe.submit(self.api.get_account)
+            pos_f  = exe.submit(self.api.list_positions)
+            quote_f = exe.submit(self._fetch_prices, list(symbols)) if symbols else None
+            acct, positions = acct_f.result(), pos_f.result()
+            prices = quote_f.result() if quote_f else {}
+        with self.lock:
+            self.cash      = float(acct.cash)
+            self.positions = {p.symbol: float(p.qty) for p in positions}
+            self.prices.update(prices)
+            self.reserved  = {}
+        return self
+
+    def load_prices(self, symbols):
+        """Bulk-load latest trade prices for symbols we don't have yet."""
+        with self.lock:
+            missing = [s for s in symbols if s not in self.prices]
+        if missing:
+            prices = self._fetch_prices(missing)
+            with self.lock:
+                self.prices.update(prices)
+
+    def _fetch_prices(self, symbols):
+        if not symbols:
+            return {}
+        try:
+            trades = self.api.get_latest_trades(symbols)
+            return {s: float(t.price) for s, t in trades.items()}
+        except Exception as e:
+            print(f"[WARN] Bulk latest-trade fetch failed ({e}); fetching one by one.")
+        prices = {}
+        for s in symbols:
+            try:
+                prices[s] = float(self.api.get_latest_trade(s).price)
+            except Exception:
+                continue
+        return prices
+
+    # ── reads ─────────────────────────────────────────────────────────────────
+    def open_symbols(self):
+        with self.lock:
+            return {s for s, q in self.positions.items() if q} | set(self.reserved)
+
+    def price(self, symbol):
+        with self.lock:
+            return self.prices.get(symbol)
+
+    def available_cash(self) -> float:
+        with self.lock:
+            return self.cash - sum(self.reserved.values())
+
+    # ── local updates ─────────────────────────────────────────────────────────
+    def reserve(self, symbol, qty: int, price: float) -> int:
+        """
+        Earmark cash for qty shares at price, shrinking qty to what's still
+        unreserved. Returns the quantity actually reserved.
+        """
+        with self.lock:
+            available = self.cash - sum(self.reserved.values())
+            qty = min(qty, int(max(available, 0) // price)) if price > 0 else 0
+            if qty > 0:
+                self.reserved[symbol] = self.reserved.get(symbol, 0.0) + qty * price
+            return qty
+
+    def release(self, symbol):
+        """Drop a reservation (entry rejected or never sent)."""
+        with self.lock:
+            self.reserved.pop(symbol, None)
+
+    def apply_fill(self, symbol, qty: int, price: float, side: str = "buy"):
+        """Book a fill: move reserved cash into the position."""
+        with self.lock:
+            if side == "buy":
+                self.reserved.pop(symbol, None)
+                self.cash -= qty * price
+                self.positions[symbol] = self.positions.get(symbol, 0) + qty
+            else:
+                self.cash += qty * price
+                self.positions[symbol] = self.positions.get(symbol, 0) - qty
+            self.prices[symbol] = price
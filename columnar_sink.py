@@ -0,0 +1,285 @@
+"""Columnar, date/ticker-partitioned history for research and backtests.
+
+ColumnarSink buffers records in memory and writes them in batches as
+Parquet (or Arrow IPC) files under
+
+    DATA_DIR/<dataset>/date=YYYY-MM-DD/ticker=XYZ/part-<ms>-<pid>-<n>.<ext>
+
+so a query for a few tickers over a few weeks only opens those
+directories. read_dataset() prunes on the partition names, then
+memory-maps each file (IPC files are read zero-copy; Parquet with
+memory_map=True and only the requested columns).
+
+Datasets written by the bot:
+    articles   - scored articles (stock titan / tipranks scrapers)
+    decisions  - every per-ticker sentiment decision from the news sweep
+    bars       - minute bars fetched by the trader (new bars only)
+
+pyarrow is optional: without it the same layout is written as small CSV
+files (slow to scan, but nothing is lost) and read back with pandas.
+compact() merges a day's part files into one per partition.
+"""
+
+import os
+import csv
+import glob
+import time
+import atexit
+import threading
+from datetime import datetime, date
+import zoneinfo
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pa_ipc = pq = None
+
+TZ_NY          = zoneinfo.ZoneInfo("America/New_York")
+DATA_DIR       = os.environ.get("COLUMNAR_DIR", "data")
+FORMAT         = os.environ.get("COLUMNAR_FORMAT", "parquet")    # parquet | ipc
+FLUSH_ROWS     = 500
+FLUSH_SECONDS  = 60.0
+NO_TICKER      = "_"        # partition for records without a ticker
+
+EXTENSIONS = {"parquet": ".parquet", "ipc": ".arrow", "csv": ".csv"}
+
+def _ts(value) -> datetime:
+    """Any timestamp-ish value → tz-aware NY datetime."""
+    if value is None:
+        return datetime.now(TZ_NY)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, TZ_NY)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, pd.Timestamp):
+        value = value.to_pydatetime()
+    return value.replace(tzinfo=TZ_NY) if value.tzinfo is None else value.astimezone(TZ_NY)
+
+def _partition_dir(root, dataset, day: date, ticker) -> str:
+    return os.path.join(root, dataset, f"date={day:%Y-%m-%d}", f"ticker={ticker or NO_TICKER}")
+
+# ── Writing ───────────────────────────────────────────────────────────────────
+def _write_file(path: str, rows: list, fmt: str):
+    tmp = path + ".tmp"
+    if fmt == "csv":
+        fields = list(dict.fromkeys(k for r in rows for k in r))
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=fields)
+            w.writeheader()
+            w.writerows({k: (v.isoformat() if isinstance(v, datetime) else v)
+                         for k, v in r.items()} for r in rows)
+    else:
+        table = pa.Table.from_pylist(rows)
+        if fmt == "ipc":
+            with pa.OSFile(tmp, "wb") as sink, pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)      # readers never see a half-written file
+
+class ColumnarSink:
+    def __init__(self, dataset: str, root: str = None, fmt: str = None,
+                 flush_rows: int = FLUSH_ROWS, flush_seconds: float = FLUSH_SECONDS):
+        fmt = fmt or FORMAT
+        if pa is None and fmt != "csv":
+            print(f"[WARN] pyarrow not installed; {dataset} history falls back to CSV partitions")
+            fmt = "csv"
+        self.dataset       = dataset
+        self.root          = root or DATA_DIR
+        self.fmt           = fmt
+        self.flush_rows    = flush_rows
+        self.flush_seconds = flush_seconds
+        self._buffer       = []
+        self._last_flush   = time.monotonic()
+        self._seq          = 0
+        self._lock         = threading.Lock()
+
+    def append(self, record: dict = None, **fields):
+        """Buffer one record; it needs a `ticker` (may be None) and gets a `timestamp`."""
+        rec = dict(record or {}, **fields)
+        rec["timestamp"] = _ts(rec.get("timestamp"))
+        with self._lock:
+            self._buffer.append(rec)
+            due = (len(self._buffer) >= self.flush_rows
+                   or time.monotonic() - self._last_flush >= self.flush_seconds)
+        if due:
+            self.flush()
+
+    def extend(self, records):
+        for rec in records:
+            self.append(rec)
+
+    def flush(self) -> list:
+        """Write buffered records, one file per (date, ticker). Returns the paths."""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return []
+            groups = {}
+            for rec in rows:
+                groups.setdefault((rec["timestamp"].date(), rec.get("ticker")), []).append(rec)
+            stamp = int(time.time() * 1000)
+            paths = []
+            for (day, ticker), group in groups.items():
+                folder = _partition_dir(self.root, self.dataset, day, ticker)
+                os.makedirs(folder, exist_ok=True)
+                self._seq += 1
+                path = os.path.join(folder, f"part-{stamp}-{os.getpid()}-{self._seq}"
+                                            f"{EXTENSIONS[self.fmt]}")
+                _write_file(path, group, self.fmt)
+                paths.append(path)
+        return paths
+
+    close = flush
+
+    def __len__(self):
+        return len(self._buffer)
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+def get_sink(dataset: str) -> ColumnarSink:
+    """Process-wide sink per dataset, flushed at exit."""
+    with _sinks_lock:
+        if dataset not in _sinks:
+            _sinks[dataset] = ColumnarSink(dataset)
+        return _sinks[dataset]
+
+@atexit.register
+def flush_all():
+    for sink in list(_sinks.values()):
+        try:
+            sink.flush()
+        except Exception as e:
+            print(f"[WARN] Couldn't flush {sink.dataset} history: {e}")
+
+_last_bar = {}      # symbol -> newest bar timestamp already written
+
+def _stored_newest(sink: ColumnarSink, symbol: str):
+    """Newest timestamp on disk for symbol (from its latest day's partition), or None."""
+    files = list_files(sink.dataset, sink.root, tickers=[symbol])
+    if not files:
+        return None
+    day = os.path.basename(os.path.dirname(os.path.dirname(files[-1])))[5:]
+    stored = read_dataset(sink.dataset, sink.root, start=day, end=day, tickers=[symbol],
+                          columns=["timestamp"])
+    return stored["timestamp"].max() if len(stored) else None
+
+def record_bars(symbol: str, df: pd.DataFrame, sink: ColumnarSink = None):
+    """Append only bars newer than the last ones written for symbol."""
+    if df is None or df.empty:
+        return 0
+    sink = sink if sink is not None else get_sink("bars")
+    if symbol not in _last_bar:
+        # first call since a restart: pick up where the stored history ends
+        _last_bar[symbol] = _stored_newest(sink, symbol)
+    newest = _last_bar[symbol]
+    fresh = df if newest is None else df[df.index > newest]
+    if fresh.empty:
+        return 0
+    for ts, row in fresh.iterrows():
+        sink.append({"ticker": symbol, "timestamp": ts,
+                     **{c: float(row[c]) for c in ("open", "high", "low", "close", "volume")}})
+    _last_bar[symbol] = fresh.index[-1]
+    return len(fresh)
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+def _to_date(value):
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    return _ts(value).date()
+
+def list_files(dataset: str, root: str = None, start=None, end=None, tickers=None) -> list:
+    """Part files whose date/ticker partitions overlap the request, oldest first."""
+    root = root or DATA_DIR
+    start, end = _to_date(start), _to_date(end)
+    wanted = {t.upper() for t in tickers} if tickers else None
+    out = []
+    for day_dir in sorted(glob.glob(os.path.join(root, dataset, "date=*"))):
+        day = datetime.strptime(os.path.basename(day_dir)[5:], "%Y-%m-%d").date()
+        if (start and day < start) or (end and day > end):
+            continue
+        for tick_dir in sorted(glob.glob(os.path.join(day_dir, "ticker=*"))):
+            if wanted is not None and os.path.basename(tick_dir)[7:].upper() not in wanted:
+                continue
+            out.extend(p for p in sorted(glob.glob(os.path.join(tick_dir, "part-*")))
+                       if not p.endswith(".tmp"))
+    return out
+
+def _read_file(path: str, columns=None):
+    if path.endswith(".csv"):
+        df = pd.read_csv(path)
+        return df[[c for c in columns if c in df]] if columns else df
+    if pa is None:
+        raise RuntimeError(f"pyarrow is required to read {path}")
+    if path.endswith(".arrow"):
+        with pa.memory_map(path, "r") as source:
+            table = pa_ipc.open_file(source).read_all()      # zero-copy view of the map
+        return table.select([c for c in columns if c in table.column_names]) if columns else table
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+def read_dataset(dataset: str, root: str = None, start=None, end=None, tickers=None,
+                 columns=None, as_pandas: bool = True):
+    """
+    Load a dataset between start/end (dates or timestamps, inclusive, by
+    partition day) for the given tickers. Returns a DataFrame sorted by
+    timestamp, or a pyarrow Table when as_pandas=False.
+    """
+    parts = [_read_file(p, columns) for p in list_files(dataset, root, start, end, tickers)]
+    frames = [p for p in parts if isinstance(p, pd.DataFrame)]
+    tables = [p for p in parts if not isinstance(p, pd.DataFrame)]
+    if not as_pandas:
+        if frames:
+            tables += [pa.Table.from_pandas(f, preserve_index=False) for f in frames]
+        if not tables:
+            return pa.table({}) if pa is not None else None
+        try:
+            return pa.concat_tables(tables, promote_options="default")
+        except TypeError:                      # pyarrow < 14
+            return pa.concat_tables(tables, promote=True)
+    frames += [t.to_pandas() for t in tables]
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    df = pd.concat(frames, ignore_index=True)
+    if "timestamp" in df:
+        ts = pd.to_datetime(df["timestamp"], utc=True)
+        df["timestamp"] = ts.dt.tz_convert(TZ_NY)
+        df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    return df
+
+def compact(dataset: str, day, root: str = None, fmt: str = None) -> int:
+    """Merge each partition's part files for one day into a single file. Returns files removed."""
+    root = root or DATA_DIR
+    fmt = (fmt or FORMAT) if pa is not None else "csv"
+    removed = 0
+    for tick_dir in glob.glob(os.path.join(root, dataset, f"date={_to_date(day):%Y-%m-%d}", "ticker=*")):
+        files = sorted(p for p in glob.glob(os.path.join(tick_dir, "part-*")) if not p.endswith(".tmp"))
+        if len(files) < 2:
+            continue
+        if fmt == "csv":
+            rows = pd.concat([pd.read_csv(p) for p in files], ignore_index=True).to_dict("records")
+        else:
+            rows = read_dataset(dataset, root, day, day, [tick_dir.rsplit("=", 1)[1]],
+                                as_pandas=False).to_pylist()
+        merged = os.path.join(tick_dir, f"part-{int(time.time() * 1000)}-{os.getpid()}-0"
+                                        f"{EXTENSIONS[fmt]}")
+        _write_file(merged, rows, fmt)
+        for p in files:
+            os.remove(p)
+        removed += len(files) - 1
+    return removed
+
+def compact_all(day=None, root: str = None) -> int:
+    """Nightly job: compact every dataset's partitions for day (default today)."""
+    root = root or DATA_DIR
+    day = _to_date(day) or datetime.now(TZ_NY).date()
+    flush_all()
+    removed = sum(compact(os.path.basename(d), day, root)
+                  for d in glob.glob(os.path.join(root, "*")) if os.path.isdir(d))
+    print(f"🗜️ Compacted {removed} part files for {day:%Y-%m-%d} under {root}/")
+    return removed
@@ -0,0 +1,50 @@
+# ====================================================================
+# Shared test setup: a pandas_ta stand-in so strategy.py / trader.py
+# import without the real package, stand-ins for the model clients,
+# and a minute-bar session builder
+# ====================================================================
+import os
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+
+if "pandas_ta" not in sys.modules:
+    fake_ta = types.ModuleType("pandas_ta")
+    fake_ta.ema  = lambda close, length: close.ewm(span=length, adjust=False).mean()
+    fake_ta.vwap = lambda high, low, close, volume: pd.Series(close.values, index=close.index)
+    fake_ta.rsi  = lambda close, length: pd.Series(50.0, index=close.index)
+    sys.modules['pandas_ta'] = fake_ta
+
+
+def make_session(day, closes, volume=100.0, start="09:30"):
+    """One flat-OHLC minute bar per close, starting at `start` New York time."""
+    idx = pd.date_range(f"{day} {start}", periods=len(closes), freq="min", tz="America/New_York")
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "open":   closes,
+        "high":   closes,
+        "low":    closes,
+        "close":  closes,
+        "volume": volume,
+    }, index=idx)
+
+
+def stub_model_clients():
+    """
+    Put scraper/ and sentiment/ on sys.path (as the scheduler runs) and
+    stand in for the scorer clients, which load models or need API keys at
+    import. For tests of the pipeline around the scorers, which they mock.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    for sub in ("scraper", "sentiment"):
+        path = os.path.join(root, sub)
+        if path not in sys.path:
+            sys.path.append(path)
+    for name in ("finbert_utils", "llama_utils", "gpt_utils", "googlenewsdecoder"):
+        if name not in sys.modules:
+            stub = types.ModuleType(name)
+            stub.estimate_sentiment = stub.estimate_sentiment_scores = stub.gnewsdecoder = \
+                lambda *args, **kwargs: None
+            sys.modules[name] = stub
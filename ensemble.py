@@ -0,0 +1,61 @@
+"""Cascaded sentiment ensemble with exact early exit.
+
+analyze_article's rule: average the scorers' [positive, neutral, negative]
+vectors; the article is a trade signal when "positive" is the top label
+and its averaged probability (times the title-fallback penalty) reaches
+SENTIMENT_THRESHOLD. In cascade mode the scorers run cheapest first, and
+after each one we check whether any outcome of the ones still to run could
+flip that decision. Each remaining scorer can:
+    - fail (dropped from the average), or
+    - answer with any positive probability in [0, 1]
+When threshold / penalty > 0.5, a positive mean above it is necessarily
+the top label, so the bounds below are exact; for lower bars we only stop
+early on a certain no-trade. A confident FinBERT negative never reaches
+the paid LLM APIs.
+"""
+
+import numpy as np
+
+from sentiment_scores import LABELS
+
+def mean_vector(vectors) -> np.ndarray:
+    return np.mean([[float(v.get(k, 0.0)) for k in LABELS] for v in vectors], axis=0)
+
+def is_trade(vectors, penalty: float, threshold: float) -> bool:
+    if not vectors:
+        return False
+    mean = mean_vector(vectors)
+    return int(np.argmax(mean)) == 0 and mean[0] * penalty >= threshold
+
+def outcomes(pos_probs, remaining: int, penalty: float, threshold: float):
+    """(can_trade, can_pass) over every way the remaining scorers could answer."""
+    total, n = sum(pos_probs), len(pos_probs)
+    can_trade = can_pass = False
+    for answered in range(remaining + 1):           # the rest fail
+        count = n + answered
+        if count == 0:
+            can_pass = True                         # nothing scored → no signal
+            continue
+        can_trade |= (total + answered) / count * penalty >= threshold
+        can_pass  |= total / count * penalty < threshold
+    if threshold / penalty <= 0.5:
+        can_pass = True                             # top-label check could still veto
+    return can_trade, can_pass
+
+def run_ensemble(scorers, score_one, penalty: float, threshold: float, cascade: bool = True):
+    """
+    score_one(name, fn) → {"positive": p, "neutral": p, "negative": p} or None.
+    Returns (results, skipped): results as [(name, vector)], skipped as
+    names never called because the decision was already fixed.
+    """
+    results = []
+    for i, (name, fn) in enumerate(scorers):
+        if cascade:
+            pos = [v["positive"] for _, v in results]
+            can_trade, can_pass = outcomes(pos, len(scorers) - i, penalty, threshold)
+            if not (can_trade and can_pass):
+                return results, [n for n, _ in scorers[i:]]
+        scored = score_one(name, fn)
+        if scored is not None:
+            results.append((name, scored))
+    return results, []
@@ -0,0 +1,101 @@
+"""Local HTTP stub with scripted faults, for exercising resilience.py.
+
+Each path gets a script: a list of faults consumed one per request (the
+last one repeats). Faults:
+    ("ok", body)          200 with a JSON body
+    ("delay", s, body)    sleep s seconds, then 200 with body
+    ("error", status)     that HTTP status with an error body
+    ("drop",)             close the connection without answering
+Usage:
+    server = FaultServer().start()
+    server.script("/chat", [("error", 503), ("delay", 2, {"ok": 1}), ("ok", {"ok": 1})])
+    requests.post(server.url("/chat"), json={...})
+    python fault_server.py --port 8089     # every path answers {"ok": true}
+"""
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _serve(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        fault = self.server.next_fault(self.path.split("?", 1)[0])
+        kind = fault[0]
+        if kind == "drop":
+            self.close_connection = True
+            self.connection.close()
+            return
+        if kind == "delay":
+            time.sleep(fault[1])
+            status, body = 200, fault[2] if len(fault) > 2 else {"ok": True}
+        elif kind == "error":
+            status, body = fault[1], {"error": f"injected {fault[1]}"}
+        else:
+            status, body = 200, fault[1] if len(fault) > 1 else {"ok": True}
+        data = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except OSError:
+            pass                    # client gave up (timeout / hedge winner)
+
+    do_GET  = _serve
+    do_POST = _serve
+
+class FaultServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self._scripts = {}
+        self._lock    = threading.Lock()
+        self.hits     = {}
+
+    def script(self, path: str, faults):
+        with self._lock:
+            self._scripts[path] = list(faults)
+            self.hits[path] = 0
+
+    def next_fault(self, path: str):
+        with self._lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+            faults = self._scripts.get(path)
+            if not faults:
+                return ("ok", {"ok": True})
+            return faults.pop(0) if len(faults) > 1 else faults[0]
+
+    def url(self, path: str = "/") -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="fault-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser("Fault-injection HTTP stub")
+    ap.add_argument("--port", type=int, default=8089)
+    args = ap.parse_args()
+    server = FaultServer(port=args.port)
+    print(f"🧪 Fault server on {server.url()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
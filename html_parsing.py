@@ -0,0 +1,183 @@
+"""One small HTML API for the scrapers, on the fastest parser installed.
+
+parse(html) builds a document with, in order of preference:
+    selectolax (lexbor, C)  →  lxml (libxml2, C)  →  BeautifulSoup("html.parser")
+and exposes only what the scrapers need: select(css) / select_one(css),
+attr(name), text() (BeautifulSoup get_text(" ", strip=True) semantics).
+Selectors are a simple CSS subset — tag, .class, #id, [attr], [attr="v"],
+descendant and ">" child combinators — translated to XPath for lxml.
+
+Script payloads don't need a tree at all: iter_scripts(), ld_json()
+and state_json() scan the raw markup for <script> bodies and decode the
+JSON in place (json.JSONDecoder.raw_decode for object literals), so the
+multi-megabyte SPA pages are never fully parsed.
+Returns:
+    parse(html) -> Document; ld_json(html) -> [objects]; state_json(html) -> dict | None
+"""
+
+import re
+import json
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _Selectolax
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as _Selectolax
+    except ImportError:
+        _Selectolax = None
+
+try:
+    import lxml.html as _lxml_html
+except ImportError:
+    _lxml_html = None
+
+from bs4 import BeautifulSoup
+
+BACKENDS = tuple(name for name, mod in (("selectolax", _Selectolax), ("lxml", _lxml_html),
+                                        ("bs4", BeautifulSoup)) if mod is not None)
+
+# ── CSS subset → XPath (lxml) ─────────────────────────────────────────────────
+_COMPOUND_RE = re.compile(r"""
+    (?P<tag>[a-zA-Z][\w-]*|\*)?
+    (?P<rest>(?:\.[\w-]+|\#[\w-]+|\[[^\]]+\])*)
+""", re.VERBOSE)
+_PART_RE = re.compile(r"""\.([\w-]+)|\#([\w-]+)|\[\s*([\w-]+)\s*(?:=\s*["']?([^"'\]]*)["']?\s*)?\]""")
+
+def css_to_xpath(css: str) -> str:
+    xpath, axis = ".", "//"
+    for token in re.findall(r">|[^\s>]+", css.strip()):
+        if token == ">":
+            axis = "/"
+            continue
+        m = _COMPOUND_RE.fullmatch(token)
+        if not m:
+            raise ValueError(f"unsupported selector: {css!r}")
+        preds = []
+        for cls, ident, attr, value in _PART_RE.findall(m.group("rest") or ""):
+            if cls:
+                preds.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')")
+            elif ident:
+                preds.append(f"@id='{ident}'")
+            elif value:
+                preds.append(f"@{attr}='{value}'")
+            else:
+                preds.append(f"@{attr}")
+        xpath += axis + (m.group("tag") or "*") + "".join(f"[{p}]" for p in preds)
+        axis = "//"
+    return xpath
+
+# ── Nodes ─────────────────────────────────────────────────────────────────────
+class Node:
+    """Wraps one element of whichever backend parsed the page."""
+
+    __slots__ = ("_el", "_kind")
+
+    def __init__(self, el, kind):
+        self._el, self._kind = el, kind
+
+    def select(self, css: str) -> list:
+        if self._kind == "selectolax":
+            return [Node(e, self._kind) for e in self._el.css(css)]
+        if self._kind == "lxml":
+            return [Node(e, self._kind) for e in self._el.xpath(css_to_xpath(css))]
+        return [Node(e, self._kind) for e in self._el.select(css)]
+
+    def select_one(self, css: str):
+        if self._kind == "selectolax":
+            el = self._el.css_first(css)
+            return Node(el, self._kind) if el is not None else None
+        found = self.select(css)
+        return found[0] if found else None
+
+    def attr(self, name: str, default=None):
+        if self._kind == "selectolax":
+            value = self._el.attributes.get(name)
+            return default if value is None else value
+        return self._el.get(name, default)
+
+    def text(self, sep: str = " ") -> str:
+        """Stripped text pieces joined by sep (BeautifulSoup get_text(sep, strip=True))."""
+        if self._kind == "selectolax":
+            pieces = (self._el.text(deep=True, separator="\x00", strip=False) or "").split("\x00")
+        elif self._kind == "lxml":
+            pieces = self._el.itertext()
+        else:
+            return self._el.get_text(separator=sep, strip=True)
+        return sep.join(p.strip() for p in pieces if p and p.strip())
+
+class Document(Node):
+    __slots__ = ("backend",)
+
+    def __init__(self, el, kind):
+        super().__init__(el, kind)
+        self.backend = kind
+
+    def title(self) -> str:
+        node = self.select_one("title")
+        return node.text() if node is not None else ""
+
+def parse(html, backend: str = None) -> Document:
+    """Parse html with `backend` (default: the fastest available)."""
+    backend = backend or BACKENDS[0]
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    if backend == "selectolax":
+        return Document(_Selectolax(html).root, "selectolax")
+    if backend == "lxml":
+        if not html.strip():
+            html = "<html></html>"
+        return Document(_lxml_html.document_fromstring(html), "lxml")
+    return Document(BeautifulSoup(html, "html.parser"), "bs4")
+
+# ── Streaming script scans ────────────────────────────────────────────────────
+_SCRIPT_OPEN_RE = re.compile(r"<script\b([^>]*)>", re.IGNORECASE)
+_SCRIPT_CLOSE_RE = re.compile(r"</script\s*>", re.IGNORECASE)
+_ATTR_RE = re.compile(r"""([\w:-]+)\s*(?:=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""")
+
+def iter_scripts(html: str, type_: str = None, contains: str = None):
+    """Yield (attrs, body) for each <script>, filtered by type and/or a substring of the body."""
+    pos = 0
+    while True:
+        m = _SCRIPT_OPEN_RE.search(html, pos)
+        if not m:
+            return
+        end = _SCRIPT_CLOSE_RE.search(html, m.end())
+        stop = end.start() if end else len(html)
+        pos = end.end() if end else len(html)
+        if contains is not None and html.find(contains, m.end(), stop) < 0:
+            continue
+        attrs = {k.lower(): (a or b or c or "") for k, a, b, c in _ATTR_RE.findall(m.group(1))}
+        if type_ is not None and attrs.get("type", "").lower() != type_:
+            continue
+        yield attrs, html[m.end():stop]
+
+def ld_json(html: str) -> list:
+    """Every decodable application/ld+json payload, in page order."""
+    out = []
+    for _attrs, body in iter_scripts(html, type_="application/ld+json"):
+        try:
+            out.append(json.loads(body))
+        except ValueError:
+            continue
+    return out
+
+_JSON_PARSE_RE = re.compile(r'\s*=\s*JSON\.parse\(\s*"((?:[^"\\]|\\.)*)"\s*\)')
+
+def state_json(html: str, var: str = "window.__STATE__"):
+    """
+    Decode `var = JSON.parse("…")` or `var = {…}` from the page's scripts,
+    or None if it isn't there or doesn't decode.
+    """
+    for _attrs, body in iter_scripts(html, contains=var):
+        at = body.find(var) + len(var)
+        m = _JSON_PARSE_RE.match(body, at)
+        try:
+            if m:
+                # the argument is a JS string literal; decode its escapes, then the JSON inside
+                return json.loads(m.group(1).encode("utf-8").decode("unicode_escape"))
+            brace = body.find("{", at)
+            if brace >= 0 and body[at:brace].strip() == "=":
+                return json.JSONDecoder().raw_decode(body, brace)[0]
+        except ValueError:
+            return None
+    return None
@@ -0,0 +1,268 @@
+"""Shared on-disk HTTP response cache for the scrapers and article extractor.
+
+Bodies are stored gzip-compressed and content-addressed,
+
+    CACHE_DIR/objects/<sha256[:2]>/<sha256>.gz
+
+so identical pages fetched from different URLs are kept once, and an
+SQLite index (CACHE_DIR/index.db) maps each URL to its body, validators
+(ETag / Last-Modified), fetch time and last use.
+
+get(url, max_age=...) behaves like requests.get for the callers here:
+    - fresh entry (younger than max_age)   → served from disk, no request
+    - stale entry with validators          → conditional GET; a 304 just
+                                             refreshes the entry
+    - anything else                        → normal GET; 200s are stored
+    - OFFLINE (HTTP_CACHE_OFFLINE=1)       → cached entries only, else
+                                             OfflineMiss (a RequestException)
+Once the store grows past MAX_BYTES the least recently used entries are
+evicted, and bodies nothing points at any more are deleted.
+
+`python http_cache.py stats | evict | export URL PATH` inspects the store;
+export writes a cached body out as a benchmark fixture.
+"""
+
+import os
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import metrics
+
+CACHE_DIR  = os.environ.get("HTTP_CACHE_DIR", ".http_cache")
+MAX_BYTES  = int(float(os.environ.get("HTTP_CACHE_MAX_MB", "512")) * 1024 * 1024)
+OFFLINE    = os.environ.get("HTTP_CACHE_OFFLINE", "0") == "1"
+EVICT_TO   = 0.9            # evict down to this fraction of MAX_BYTES
+USER_AGENT = "Mozilla/5.0"
+
+class OfflineMiss(requests.ConnectionError):
+    """Offline mode and the URL is not in the cache."""
+
+class CachedResponse:
+    """The bit of requests.Response the scrapers use."""
+
+    def __init__(self, url, status_code, content, headers, from_cache):
+        self.url         = url
+        self.status_code = status_code
+        self.content     = content
+        self.headers     = CaseInsensitiveDict(headers or {})
+        self.from_cache  = from_cache
+
+    @property
+    def text(self):
+        ctype = self.headers.get("Content-Type", "")
+        charset = ctype.split("charset=", 1)[1].split(";")[0].strip() if "charset=" in ctype else "utf-8"
+        return self.content.decode(charset, errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}", response=self)
+
+KEEP_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+class HttpCache:
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = MAX_BYTES, offline: bool = OFFLINE):
+        self.root      = root
+        self.max_bytes = max_bytes
+        self.offline   = offline
+        self._lock     = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        conn = self._connect()
+        conn.executescript("""
+          CREATE TABLE IF NOT EXISTS responses (
+            url        TEXT PRIMARY KEY,
+            digest     TEXT NOT NULL,
+            size       INTEGER NOT NULL,
+            headers    TEXT,
+            fetched_at REAL NOT NULL,
+            last_used  REAL NOT NULL
+          );
+          CREATE INDEX IF NOT EXISTS idx_responses_used ON responses (last_used);
+          CREATE INDEX IF NOT EXISTS idx_responses_digest ON responses (digest);
+        """)
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(os.path.join(self.root, "index.db"), timeout=30)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest + ".gz")
+
+    # ── store ────────────────────────────────────────────────────────────────
+    def lookup(self, url: str):
+        """(body, headers, fetched_at) for url, or None."""
+        conn = self._connect()
+        row = conn.execute("SELECT digest, headers, fetched_at FROM responses WHERE url = ?",
+                           (url,)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        try:
+            with gzip.open(self._object_path(row[0]), "rb") as f:
+                body = f.read()
+        except (OSError, EOFError):
+            return None             # body evicted or damaged: treat as a miss
+        return body, json.loads(row[1] or "{}"), row[2]
+
+    def put(self, url: str, body: bytes, headers=None, fetched_at: float = None) -> str:
+        """Store body for url (also used to seed fixtures); returns its digest."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(body)
+            os.replace(tmp, path)
+        kept = {k: v for k, v in (headers or {}).items() if k in KEEP_HEADERS}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT digest FROM responses WHERE url = ?", (url,)).fetchone()
+            conn.execute("""
+                INSERT OR REPLACE INTO responses (url, digest, size, headers, fetched_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (url, digest, os.path.getsize(path), json.dumps(kept), fetched_at or now, now))
+            conn.commit()
+            # a changed page leaves its previous body behind; drop it unless another URL shares it
+            if old is not None and old[0] != digest:
+                self._drop_if_unreferenced(conn, old[0])
+            conn.close()
+        self.evict()
+        return digest
+
+    def _drop_if_unreferenced(self, conn, digest: str) -> bool:
+        if conn.execute("SELECT 1 FROM responses WHERE digest = ?", (digest,)).fetchone() is not None:
+            return False
+        try:
+            os.remove(self._object_path(digest))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _touch(self, url: str, fetched: bool = False):
+        now = time.time()
+        conn = self._connect()
+        if fetched:
+            conn.execute("UPDATE responses SET last_used = ?, fetched_at = ? WHERE url = ?", (now, now, url))
+        else:
+            conn.execute("UPDATE responses SET last_used = ? WHERE url = ?", (now, url))
+        conn.commit()
+        conn.close()
+
+    def evict(self, max_bytes: int = None) -> int:
+        """Drop least recently used entries until the store fits; returns entries removed."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock:
+            conn = self._connect()
+            # objects shared by several URLs are counted once
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM responses)"
+            ).fetchone()[0]
+            if total <= max_bytes:
+                conn.close()
+                return 0
+            target, removed = max_bytes * EVICT_TO, 0
+            for url, digest, size in conn.execute(
+                    "SELECT url, digest, size FROM responses ORDER BY last_used").fetchall():
+                if total <= target:
+                    break
+                conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                removed += 1
+                if self._drop_if_unreferenced(conn, digest):
+                    total -= size
+            conn.commit()
+            conn.close()
+        return removed
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        entries, objects, size = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT digest), "
+            "(SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM responses)) "
+            "FROM responses").fetchone()
+        conn.close()
+        return {"entries": entries, "objects": objects, "bytes": size, "max_bytes": self.max_bytes}
+
+    # ── fetch ────────────────────────────────────────────────────────────────
+    def get(self, url: str, headers=None, timeout=10, max_age: float = 0, session=None) -> CachedResponse:
+        """GET through the cache; max_age (seconds) is how long an entry is served without revalidating."""
+        cached = self.lookup(url)
+        if cached is not None:
+            body, cached_headers, fetched_at = cached
+            if self.offline or time.time() - fetched_at < max_age:
+                self._touch(url)
+                _count("fresh")
+                return CachedResponse(url, 200, body, cached_headers, True)
+        elif self.offline:
+            _count("offline_miss")
+            raise OfflineMiss(f"{url} is not cached (offline mode)")
+
+        send = {"User-Agent": USER_AGENT, **(headers or {})}
+        if cached is not None:
+            if cached_headers.get("ETag"):
+                send["If-None-Match"] = cached_headers["ETag"]
+            if cached_headers.get("Last-Modified"):
+                send["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+        resp = (session or requests).get(url, headers=send, timeout=timeout)
+        if resp.status_code == 304 and cached is not None:
+            self._touch(url, fetched=True)
+            _count("revalidated")
+            return CachedResponse(url, 200, body, cached_headers, True)
+        if resp.status_code == 200:
+            self.put(url, resp.content, resp.headers)
+            _count("miss" if cached is None else "changed")
+        return CachedResponse(url, resp.status_code, resp.content, resp.headers, False)
+
+def _count(result: str):
+    metrics.incr("http_cache", result=result)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> HttpCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
+
+def get(url: str, **kwargs) -> CachedResponse:
+    """Module-level shortcut through the process-wide cache."""
+    return get_cache().get(url, **kwargs)
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser("Inspect the HTTP response cache")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats")
+    ev = sub.add_parser("evict")
+    ev.add_argument("--max-mb", type=float, default=None)
+    ex = sub.add_parser("export", help="write a cached body to a file (e.g. a benchmark fixture)")
+    ex.add_argument("url")
+    ex.add_argument("path")
+    args = ap.parse_args()
+
+    cache = get_cache()
+    if args.cmd == "stats":
+        print(json.dumps(cache.stats(), indent=2))
+    elif args.cmd == "evict":
+        max_bytes = None if args.max_mb is None else int(args.max_mb * 1024 * 1024)
+        print(f"🧹 evicted {cache.evict(max_bytes)} entries")
+    else:
+        hit = cache.lookup(args.url)
+        if hit is None:
+            raise SystemExit(f"✖ {args.url} is not cached")
+        with open(args.path, "wb") as f:
+            f.write(hit[0])
+        print(f"→ wrote {len(hit[0])} bytes to {args.path}")
@@ -0,0 +1,175 @@
+"""Drift-free, wall-clock job scheduler.
+
+Each Job fires on fixed wall-clock boundaries (every N minutes from
+midnight, plus an optional offset), no matter how long earlier runs
+took. Jobs run on their own threads so a slow job never delays another,
+and each job decides what happens if it is still running when its next
+slot comes up:
+    overlap="skip"   drop that slot
+    overlap="queue"  run once more as soon as the current run finishes
+                     (at most one run is queued)
+Jobs can be limited to a time-of-day window, and MarketCalendar keeps
+them to trading sessions (holidays off, half-day closes respected).
+"""
+
+import threading
+from datetime import datetime, date, time as dtime, timedelta
+import zoneinfo
+
+import metrics
+
+TZ_NY = zoneinfo.ZoneInfo("America/New_York")
+
+# Used when the broker calendar can't be reached: weekdays, full extended session
+DEFAULT_SESSION = (dtime(4, 0), dtime(20, 0))
+
+# ── Market calendar ───────────────────────────────────────────────────────────
+class MarketCalendar:
+    """
+    Trading sessions from Alpaca's /calendar (session_open/session_close
+    cover pre- and after-hours, so half days end early automatically).
+    Without an API client, every weekday is a full session.
+    """
+
+    def __init__(self, api=None, tz=TZ_NY, days_ahead: int = 30):
+        self.api        = api
+        self.tz         = tz
+        self.days_ahead = days_ahead
+        self._sessions  = {}
+        self._loaded    = None     # (start, end) range we have
+        self._lock      = threading.Lock()
+
+    def _load(self, day: date):
+        start, end = day - timedelta(days=1), day + timedelta(days=self.days_ahead)
+        sessions = {}
+        for c in self.api.get_calendar(start=start.isoformat(), end=end.isoformat()):
+            d = c.date.date()
+            try:
+                sessions[d] = (c.session_open, c.session_close)
+            except (AttributeError, KeyError):
+                sessions[d] = (c.open, c.close)
+        self._sessions = sessions
+        self._loaded   = (start, end)
+
+    def session(self, day: date):
+        """(open, close) times for day's extended session, or None if closed."""
+        if self.api is None:
+            return DEFAULT_SESSION if day.weekday() < 5 else None
+        with self._lock:
+            if self._loaded is None or not (self._loaded[0] <= day <= self._loaded[1]):
+                try:
+                    self._load(day)
+                except Exception as e:
+                    print(f"[WARN] Market calendar unavailable ({e}); assuming weekday session.")
+                    return DEFAULT_SESSION if day.weekday() < 5 else None
+            return self._sessions.get(day)
+
+    def is_open(self, when: datetime, start: dtime = None, end: dtime = None) -> bool:
+        """True if `when` is inside today's session, narrowed to [start, end]."""
+        session = self.session(when.date())
+        if session is None:
+            return False
+        lo = max(session[0], start) if start else session[0]
+        hi = min(session[1], end)   if end   else session[1]
+        return lo <= when.time() <= hi
+
+# ── Jobs ──────────────────────────────────────────────────────────────────────
+class Job:
+    def __init__(self,
+                 name: str,
+                 func,
+                 every_minutes: float,
+                 offset_minutes: float = 0,
+                 window: tuple = None,
+                 overlap: str = "skip",
+                 market_hours: bool = True):
+        if overlap not in ("skip", "queue"):
+            raise ValueError(f"overlap must be 'skip' or 'queue', got {overlap!r}")
+        self.name         = name
+        self.func         = func
+        self.every        = timedelta(minutes=every_minutes)
+        self.offset       = timedelta(minutes=offset_minutes)
+        self.window       = window          # (start dtime, end dtime) or None
+        self.overlap      = overlap
+        self.market_hours = market_hours
+        self.running      = False
+        self.queued       = False
+        self.next_run     = None
+
+    def schedule_after(self, now: datetime) -> datetime:
+        """Next wall-clock slot strictly after now (midnight + offset + k·every)."""
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        since = now - midnight - self.offset
+        k = int(since // self.every) + 1
+        self.next_run = midnight + self.offset + k * self.every
+        return self.next_run
+
+# ── Scheduler ─────────────────────────────────────────────────────────────────
+class Scheduler:
+    def __init__(self, jobs, calendar: MarketCalendar = None, tz=TZ_NY):
+        self.jobs     = list(jobs)
+        self.calendar = calendar or MarketCalendar(tz=tz)
+        self.tz       = tz
+        self._lock    = threading.Lock()
+        self._stop    = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self):
+        now = datetime.now(self.tz)
+        for job in self.jobs:
+            job.schedule_after(now)
+            print(f"🗓️  {job.name}: every {job.every}, first run {job.next_run.isoformat()}")
+
+        while not self._stop.is_set():
+            wake = min(job.next_run for job in self.jobs)
+            delay = (wake - datetime.now(self.tz)).total_seconds()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            now = datetime.now(self.tz)
+            for job in self.jobs:
+                if job.next_run <= now:
+                    slot = job.next_run
+                    job.schedule_after(now)
+                    self._dispatch(job, slot)
+
+    def _in_window(self, job: Job, when: datetime) -> bool:
+        start, end = job.window if job.window else (None, None)
+        if job.market_hours:
+            return self.calendar.is_open(when, start, end)
+        if job.window is None:
+            return True
+        return start <= when.time() <= end
+
+    def _dispatch(self, job: Job, slot: datetime):
+        if not self._in_window(job, slot):
+            return
+        with self._lock:
+            if job.running:
+                if job.overlap == "queue":
+                    job.queued = True
+                    print(f"⏳ {job.name} still running; queued the {slot:%H:%M} run.")
+                else:
+                    print(f"⏭️  {job.name} still running; skipped the {slot:%H:%M} run.")
+                return
+            job.running = True
+        threading.Thread(target=self._run_job, args=(job, slot),
+                         name=f"job-{job.name}", daemon=True).start()
+
+    def _run_job(self, job: Job, slot: datetime):
+        while True:
+            started = datetime.now(self.tz)
+            try:
+                with metrics.job(job.name):
+                    job.func()
+            except Exception as e:
+                print(f"[ERROR] Job {job.name} ({slot:%H:%M}) failed: {e}")
+            took = (datetime.now(self.tz) - started).total_seconds()
+            print(f"✔ {job.name} ({slot:%H:%M}) finished in {took:.1f}s")
+            with self._lock:
+                if not job.queued:
+                    job.running = False
+                    return
+                job.queued = False
+            slot = datetime.now(self.tz)
@@ -0,0 +1,147 @@
+"""Non-blocking, structured logging for the pipeline.
+
+setup_logging() puts a single QueueHandler on the root logger, so worker
+threads only enqueue a record; a QueueListener thread does the formatting
+and the actual stdout/file writes. Records can carry structured fields
+(ticker, url, stage, duration, ...) via `extra=`, and are rendered either
+as JSON lines (LOG_FORMAT=json) or as readable text with key=value pairs.
+
+Levels are set per module:
+    LOG_LEVEL=INFO
+    LOG_LEVELS="stock_news_analyzer=DEBUG,trader=WARNING"
+Debug calls use %-style arguments (formatted only if the record is
+emitted); anything costlier is wrapped in `if log.isEnabledFor(DEBUG)`.
+Usage:
+    from log_config import get_logger
+    log = get_logger(__name__)
+    log.info("Saved %s @ %.2f", ticker, prob, extra={"ticker": ticker, "stage": "save"})
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL   = os.environ.get("LOG_LEVEL", "INFO")
+LOG_LEVELS  = os.environ.get("LOG_LEVELS", "")             # "module=LEVEL,..."
+LOG_FORMAT  = os.environ.get("LOG_FORMAT", "text")         # "text" | "json"
+LOG_FILE    = os.environ.get("LOG_FILE")                   # optional extra sink
+FIELDS      = ("ticker", "url", "stage", "duration", "model", "prob", "sentiment", "table")
+
+_listener = None
+_lock     = threading.Lock()
+
+# ── Formatters ────────────────────────────────────────────────────────────────
+def _fields(record) -> dict:
+    return {k: getattr(record, k) for k in FIELDS if getattr(record, k, None) is not None}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg plus structured fields."""
+
+    def format(self, record):
+        out = {
+            "ts":     round(record.created, 3),
+            "level":  record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg":    record.getMessage(),
+            **_fields(record),
+        }
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-5s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        line = super().format(record)
+        extra = _fields(record)
+        if extra:
+            line += "  " + " ".join(f"{k}={v}" for k, v in extra.items())
+        return line
+
+# ── Setup ─────────────────────────────────────────────────────────────────────
+def _parse_levels(spec: str) -> dict:
+    levels = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, level = part.partition("=")
+        if level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+class _PrepareQueueHandler(QueueHandler):
+    """Keep records intact (fields, exc_info) for the listener to format."""
+
+    def prepare(self, record):
+        if record.args:
+            record.msg  = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+def setup_logging(level: str = None, levels: str = None, fmt: str = None, logfile: str = None):
+    """Install the queue handler + background listener (idempotent)."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        formatter = JsonFormatter() if (fmt or LOG_FORMAT) == "json" else TextFormatter()
+        handlers = [logging.StreamHandler(sys.stdout)]
+        if logfile or LOG_FILE:
+            handlers.append(logging.FileHandler(logfile or LOG_FILE, encoding="utf-8"))
+        for h in handlers:
+            h.setFormatter(formatter)
+
+        q = queue.SimpleQueue()
+        root = logging.getLogger()
+        for h in list(root.handlers):
+            root.removeHandler(h)
+        root.addHandler(_PrepareQueueHandler(q))
+        root.setLevel((level or LOG_LEVEL).upper())
+        for name, lvl in _parse_levels(levels if levels is not None else LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(lvl)
+
+        _listener = QueueListener(q, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+def shutdown_logging():
+    """Flush whatever is still queued and stop the listener thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+def _after_fork_in_child():
+    """
+    A forked worker inherits the QueueHandler but not the listener thread,
+    so its records would sit in a queue nobody drains. Give the child the
+    listener's sinks directly instead (it is single-threaded anyway).
+    """
+    global _listener, _lock
+    _lock = threading.Lock()
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        if isinstance(h, QueueHandler):
+            root.removeHandler(h)
+    for h in _listener.handlers:
+        root.addHandler(h)
+    _listener = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
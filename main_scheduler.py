@@ -1,14 +1,23 @@
 #!/usr/bin/env python3
-import os, time, sqlite3
+import os, sqlite3, argparse, threading
+from functools import partial
 from datetime import datetime, time as dtime, timedelta
 import zoneinfo
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from tradingview_gainers_scraper import run_scraper_pipeline
+from stock_titan_ingester import ingest_once as ingest_stock_titan
 from stock_news_analyzer import (
     init_url_cache,
+    get_latest_gainers,
     fetch_news_for_company,
+    fetch_routed_news,
+    clean_ticker,
     process_articles_for_ticker,
+    score_ticker,
+    apply_ticker_score,
+    record_article_sentiment,
+    start_sentiment_pool,
+    stop_sentiment_pool,
     TRADE_DB_FILE,
     MAX_WORKERS
 )
@@ -16,48 +25,76 @@ from trader import (
     api,
     get_minute_bars,
     compute_indicators,
-    entry_signal,
+    get_yesterday_highs,
     size_position,
     submit_split_exit
 )
+from screener import screen_frames
+from broker_snapshot import BrokerSnapshot
+from sentiment_state import get_state
+from trade_history import run_maintenance
+from columnar_sink import record_bars, compact_all
+from job_scheduler import Job, Scheduler, MarketCalendar
+from work_queue import make_queue, run_worker, WORK_QUEUE_URL
+from priority import rank_gainers, momentum_score, priority_score, PriorityScheduler
+from symbol_index import get_symbol_index, refresh_symbols
+import metrics
+from log_config import setup_logging
 
 # ── CONFIG ────────────────────────────────────────────────────────────────
-INTERVAL_MINUTES    = 10
+GAINERS_MINUTES     = 10     # TradingView gainers scrape
+NEWS_MINUTES        = 10     # Google News sweep + sentiment
+NEWS_OFFSET_MINUTES = 1      # let most scrapes land first; the table swap keeps reads safe
+TRADER_MINUTES      = 1      # entry screening pass
+STOCK_TITAN_MINUTES = 1      # StockTitan live feed: only updates past the cursor
+COLLECT_MINUTES     = 1      # coordinator: pull finished worker results
+WORKER_THREADS      = 8      # worker: concurrent ticker jobs per process
+MAINTENANCE_AT      = 21 * 60  # minutes after midnight: nightly prune/archive/VACUUM
+QUEUE_KEEP_S        = 86400  # coordinator: collected/failed jobs kept this long
+NEWS_BUDGET_S       = 240    # stop starting new tickers this far into a sweep
+SCORE_WORKERS       = 4      # tickers being scored at once (each fans out per article)
 TRADER_START        = dtime(8, 0)
 TRADER_END          = dtime(19, 0)
 TZ_NY               = zoneinfo.ZoneInfo("America/New_York")
 
 MAX_OPEN_TRADES     = 3
 MAX_CHECKED_SYMBOLS = 5
+MIN_DECAYED_SCORE   = 0.35   # one half-life after a 0.7 article
 
 # NEW: your risk parameters
 RISK_PCT_PER_TRADE  = 0.02   # lose no more than  2% of cash
 STOP_PCT_PER_TRADE  = 0.02   # hard stop at 2% below entry
 
 def run_trader():
-    # 1) how many are already open?
-    open_positions = api.list_positions()
-    open_syms      = {p.symbol for p in open_positions}
-    slots_left     = MAX_OPEN_TRADES - len(open_syms)
+    # 1) how many are already open? (account + positions in one bulk load)
+    snapshot   = BrokerSnapshot(api).refresh()
+    open_syms  = snapshot.open_symbols()
+    slots_left = MAX_OPEN_TRADES - len(open_syms)
     if slots_left <= 0:
         print(f"🔒 max open trades ({MAX_OPEN_TRADES}) reached; skipping entries.")
         return
 
-    # 2) pick top symbols by probability
-    conn = sqlite3.connect(TRADE_DB_FILE)
-    cur  = conn.cursor()
-    cur.execute(
-        "SELECT ticker FROM trades "
-        "ORDER BY probability DESC LIMIT ?",
-        (MAX_CHECKED_SYMBOLS,)
-    )
-    rows = [r[0] for r in cur.fetchall()]
-    conn.close()
-
-    # 3) exclude already‐open & cap by slots_left
-    candidates = [s for s in rows if s not in open_syms][:slots_left]
-
-    # 4) test entry & size position
+    # 2) pick top symbols by time-decayed sentiment, skipping already-open ones
+    state = get_state()
+    if len(state):
+        candidates = [t for t, _ in state.top_k(MAX_CHECKED_SYMBOLS,
+                                                min_score=MIN_DECAYED_SCORE,
+                                                exclude=open_syms)]
+    else:
+        # 3) no rolling state yet (fresh install): fall back to the trades table
+        conn = sqlite3.connect(TRADE_DB_FILE)
+        cur  = conn.cursor()
+        cur.execute(
+            "SELECT ticker FROM trades "
+            "ORDER BY probability DESC LIMIT ?",
+            (MAX_CHECKED_SYMBOLS,)
+        )
+        rows = [r[0] for r in cur.fetchall()]
+        conn.close()
+        candidates = [s for s in rows if s not in open_syms]
+
+    # 4) fetch bars & indicators for every candidate
+    frames = {}
     for symbol in candidates:
         end   = datetime.now(TZ_NY)
         start = end - timedelta(minutes=60)
@@ -65,48 +102,225 @@ def run_trader():
         if df.empty:
             print(f"[{symbol}] no minute‐data; skipping.")
             continue
+        record_bars(symbol, df)
+        frames[symbol] = compute_indicators(df)
+    if not frames:
+        return
 
-        df = compute_indicators(df)
-        if entry_signal(symbol, df):
-            qty = size_position(symbol,
-                                risk_pct=RISK_PCT_PER_TRADE,
-                                stop_pct=STOP_PCT_PER_TRADE)
-            if qty > 0:
-                submit_split_exit(symbol,
-                                  qty,
-                                  stop_pct=STOP_PCT_PER_TRADE)
-            else:
-                print(f"[{symbol}] not enough cash to size a {RISK_PCT_PER_TRADE*100:.1f}% risk trade.")
-        else:
+    # 5) screen the whole universe at once, then enter in probability order
+    y_highs = get_yesterday_highs({s: df.index[-1] for s, df in frames.items()})
+    signals = screen_frames(frames, y_highs)
+    snapshot.load_prices([s for s in frames if signals.at[s, "signal"]])
+    for symbol in frames:
+        if not signals.at[symbol, "signal"]:
             print(f"[{symbol}] no entry signal.")
+            continue
+        if slots_left <= 0:
+            print(f"[{symbol}] entry signal, but no open slots left.")
+            continue
+        qty = size_position(symbol,
+                            risk_pct=RISK_PCT_PER_TRADE,
+                            stop_pct=STOP_PCT_PER_TRADE,
+                            snapshot=snapshot)
+        if qty > 0:
+            submit_split_exit(symbol,
+                              qty,
+                              stop_pct=STOP_PCT_PER_TRADE,
+                              snapshot=snapshot)
+            slots_left -= 1
+        else:
+            print(f"[{symbol}] not enough cash to size a {RISK_PCT_PER_TRADE*100:.1f}% risk trade.")
+
+def _cycle_key(now=None) -> str:
+    now = (now or datetime.now(TZ_NY)).replace(second=0, microsecond=0)
+    return (now - timedelta(minutes=now.minute % NEWS_MINUTES)).strftime("%Y%m%d%H%M")
+
+def run_news_sweep(queue=None):
+    gainers = rank_gainers(get_latest_gainers())
+    if queue is not None:
+        # coordinator: one job per ticker per cycle, strongest movers first
+        # (workers lease in enqueue order); re-sweeps of a cycle are no-ops
+        cycle = _cycle_key()
+        added = sum(queue.enqueue("ticker", row, key=f"ticker:{row['ticker']}:{cycle}")
+                    for row in gainers if row.get("company_name"))
+        print(f"📬 Queued {added} ticker jobs for cycle {cycle}.")
+        return
+    print(f"📰 News sweep over {len(gainers)} gainers…")
+    # feeds are cheap I/O and fan out wide; scoring has its own small pool so
+    # the heap, not thread wake-up order, decides which ticker is scored next
+    # and the budget is checked before each one starts
+    fetcher = PriorityScheduler(max_workers=MAX_WORKERS, budget_s=NEWS_BUDGET_S)
+    scorer  = PriorityScheduler(max_workers=SCORE_WORKERS, budget_s=NEWS_BUDGET_S)
+
+    # headlines one search turns up about other gainers go to them, and a
+    # gainer that already has routed headlines when its turn comes skips its own search
+    universe = {clean_ticker(row["ticker"]) for row in gainers if row.get("ticker")}
+    routed_lock, started, routed_to = threading.Lock(), set(), {}
+
+    def fetch(row):
+        ticker = clean_ticker(row["ticker"])
+        with routed_lock:
+            started.add(ticker)
+            news = routed_to.pop(ticker, None)
+        if news:
+            metrics.incr("news_searches_saved")
+        else:
+            routed = fetch_routed_news(row, universe)
+            news = routed.pop(ticker, None)
+            with routed_lock:
+                for other, arts in routed.items():
+                    if other not in started:
+                        routed_to.setdefault(other, []).extend(arts)
+        if news:
+            # fresh news bumps a ticker ahead of equally strong names still waiting
+            scorer.push(priority_score(row, news), process_articles_for_ticker, row["ticker"], news,
+                        name=f"score:{row['ticker']}")
+
+    def fetch_all():
+        try:
+            fetcher.run()
+        finally:
+            scorer.release()
+
+    for row in gainers:
+        fetcher.push(momentum_score(row), fetch, row, name=f"news:{row['ticker']}")
+    scorer.hold()                      # scoring runs until the last fetch is in
+    feeds = threading.Thread(target=metrics.bind(fetch_all), name="news-fetch", daemon=True)
+    feeds.start()
+    scorer.run()
+    feeds.join()
+    skipped = fetcher.skipped + scorer.skipped
+    if skipped:
+        print(f"⏱️  News budget ({NEWS_BUDGET_S}s) spent; skipped {len(skipped)} "
+              f"low-priority tasks: {', '.join(skipped[:10])}")
+    metrics.log_cycle_summary("news")
+
+# ── Distributed mode ──────────────────────────────────────────────────────
+def analyze_ticker_job(row):
+    """Worker side: news + extraction + sentiment for one gainer."""
+    ticker, company, news = fetch_news_for_company(row)
+    if not company or not news:
+        return None
+    # newly scored articles travel with the result: the rolling state lives on the coordinator
+    fresh = []
+    scored = score_ticker(ticker, news, on_scored=lambda *article: fresh.append(article))
+    if not scored:
+        return None
+    return {"ticker": ticker, "prob": scored[0], "sentiment": scored[1], "articles": fresh}
+
+def collect_results(queue):
+    """Coordinator side: write finished worker results into the trades table."""
+    results = queue.collect()
+    for r in results:
+        if r["result"]:
+            for article in r["result"].get("articles", ()):
+                record_article_sentiment(*article)
+            apply_ticker_score(r["result"]["ticker"], r["result"]["prob"], r["result"]["sentiment"])
+    if results:
+        print(f"📥 Collected {len(results)} ticker results.")
+
+def purge_queue(queue):
+    removed = queue.purge(QUEUE_KEEP_S)
+    print(f"🧹 Work queue: purged {removed} finished jobs.")
+
+def run_workers(queue_url, threads=WORKER_THREADS):
+    stop = threading.Event()
+    handlers = {"ticker": analyze_ticker_job}
+    workers = [threading.Thread(target=run_worker, args=(make_queue(queue_url), handlers),
+                                kwargs={"stop": stop}, name=f"worker-{i}", daemon=True)
+               for i in range(threads)]
+    for w in workers:
+        w.start()
+    print(f"🛠️  {threads} workers leasing from {queue_url}")
+    try:
+        while any(w.is_alive() for w in workers):
+            stop.wait(1)
+    except KeyboardInterrupt:
+        stop.set()
+
+def build_jobs(queue=None):
+    # Scraping and news follow the extended session (pre-market through
+    # after-hours, holidays off, half days cut short); the trader is further
+    # narrowed to its own window. Housekeeping below runs every day.
+    jobs = [
+        Job("gainers", run_scraper_pipeline,
+            every_minutes=GAINERS_MINUTES,
+            overlap="skip",
+            market_hours=True),
+        Job("news", partial(run_news_sweep, queue),
+            every_minutes=NEWS_MINUTES,
+            offset_minutes=NEWS_OFFSET_MINUTES,
+            overlap="queue",
+            market_hours=True),
+        Job("stock_titan", ingest_stock_titan,
+            every_minutes=STOCK_TITAN_MINUTES,
+            overlap="skip",
+            market_hours=True),
+        Job("trader", run_trader,
+            every_minutes=TRADER_MINUTES,
+            window=(TRADER_START, TRADER_END),
+            overlap="skip",
+            market_hours=True),
+    ]
+    jobs.append(Job("maintenance", partial(run_maintenance, TRADE_DB_FILE),
+                    every_minutes=24 * 60,
+                    offset_minutes=MAINTENANCE_AT,
+                    overlap="skip",
+                    market_hours=False))
+    jobs.append(Job("compact", compact_all,
+                    every_minutes=24 * 60,
+                    offset_minutes=MAINTENANCE_AT + 5,
+                    overlap="skip",
+                    market_hours=False))
+    jobs.append(Job("symbols", partial(refresh_symbols, api),
+                    every_minutes=24 * 60,
+                    offset_minutes=MAINTENANCE_AT + 10,
+                    overlap="skip",
+                    market_hours=False))
+    if queue is not None:
+        jobs.append(Job("collect", partial(collect_results, queue),
+                        every_minutes=COLLECT_MINUTES,
+                        overlap="skip",
+                        market_hours=True))
+        jobs.append(Job("purge_queue", partial(purge_queue, queue),
+                        every_minutes=24 * 60,
+                        offset_minutes=MAINTENANCE_AT + 15,
+                        overlap="skip",
+                        market_hours=False))
+    return jobs
 
 def main():
+    ap = argparse.ArgumentParser("News-sentiment trading scheduler")
+    ap.add_argument("--mode", choices=("local", "coordinator", "worker"), default="local",
+                    help="local: do everything here; coordinator: scrape, queue analysis "
+                         "and trade; worker: run queued analysis jobs")
+    ap.add_argument("--queue", default=WORK_QUEUE_URL, help="sqlite:///file.db or tcp://host:port")
+    ap.add_argument("--threads", type=int, default=WORKER_THREADS, help="Worker threads (worker mode)")
+    args = ap.parse_args()
+
+    setup_logging()
+    start_sentiment_pool()     # fork workers before the scheduler starts threads
     print("Initializing URL cache…")
     init_url_cache()
+    if not len(get_symbol_index()):
+        print("Building symbol master…")
+        try:
+            refresh_symbols(api)
+        except Exception as e:
+            print(f"[WARN] Symbol master build failed ({e}); searching by scraped company names.")
 
-    while True:
-        now = datetime.now(TZ_NY)
-        print(f"\n[{now.isoformat()}] Starting cycle…")
-
-        gainers = run_scraper_pipeline()
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as exe:
-            futures = {exe.submit(fetch_news_for_company, row): row
-                       for row in gainers}
-            for future in as_completed(futures):
-                ticker, company, news = future.result()
-                if not company or not news:
-                    continue
-                process_articles_for_ticker(ticker, news)
-
-        now_time = now.time()
-        if TRADER_START <= now_time <= TRADER_END:
-            print("→ Within trading hours. Running trader…")
-            run_trader()
-        else:
-            print("→ Outside trading hours. Skipping trader.")
-
-        print(f"Sleeping {INTERVAL_MINUTES} minutes…")
-        time.sleep(INTERVAL_MINUTES * 60)
+    try:
+        if args.mode == "worker":
+            run_workers(args.queue, args.threads)
+            return
+        queue = make_queue(args.queue) if args.mode == "coordinator" else None
+        scheduler = Scheduler(build_jobs(queue), MarketCalendar(api, tz=TZ_NY), tz=TZ_NY)
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            scheduler.stop()
+    finally:
+        stop_sentiment_pool()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,331 @@
+"""Lightweight pipeline metrics: timers, counters and histograms.
+
+Disabled by default (METRICS_ENABLED=1 turns it on). When disabled,
+timer() hands back one shared no-op context manager and timed()-wrapped
+functions skip straight to the call, so instrumentation left in hot paths
+costs a flag check.
+
+When enabled:
+    - every stage timing lands in a cumulative histogram (for the optional
+      Prometheus text dump) and in the current cycle's stats
+    - log_cycle_summary() writes one JSON line per cycle to METRICS_LOG
+      (count / total / mean / max / p95 per stage, plus counters) and
+      starts a new cycle
+    - cycles are kept per job: samples recorded under `with metrics.job(name)`
+      (or on threads started through bind()) only show up in that job's
+      cycle summary, so concurrent scheduler jobs don't mix
+    - METRICS_EVENTS=1 additionally writes one JSON line per timing
+Usage:
+    with metrics.timer("feed_fetch"): ...
+    with metrics.timer("sentiment", model="finbert"): ...
+    @metrics.timed("article_extract")
+    metrics.incr("cache_hits", stage="url_cache")
+    with metrics.job("news"): ... metrics.log_cycle_summary("news")
+    executor.submit(metrics.bind(fn), ...)
+    with metrics.capture() as reg: ...; metrics.merge(reg.export())   # across processes
+"""
+
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+import contextlib
+import contextvars
+
+METRICS_LOG     = os.environ.get("METRICS_LOG", "metrics.jsonl")
+PROM_FILE       = os.environ.get("METRICS_PROM_FILE")       # optional text dump
+BUCKETS         = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_enabled = os.environ.get("METRICS_ENABLED", "0") == "1"
+_events  = os.environ.get("METRICS_EVENTS", "0") == "1"
+_job     = contextvars.ContextVar("metrics_job", default=None)   # whose cycle samples go to
+
+def enable(events: bool = None):
+    global _enabled, _events
+    _enabled = True
+    if events is not None:
+        _events = events
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def enabled() -> bool:
+    return _enabled
+
+# ── Primitives ────────────────────────────────────────────────────────────────
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts  = [0] * (len(buckets) + 1)    # last slot is +Inf
+        self.count   = 0
+        self.sum     = 0.0
+        self.max     = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum   += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound holding the q-th observation (max for +Inf)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name     = name
+        self.labels   = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.registry.observe(self.name, elapsed, **self.labels)
+        if exc_type is not None:
+            self.registry.incr(f"{self.name}_errors", **self.labels)
+        return False
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+class _Cycle:
+    __slots__ = ("hists", "counts", "start")
+
+    def __init__(self):
+        self.hists  = {}
+        self.counts = {}
+        self.start  = time.time()
+
+class Registry:
+    def __init__(self):
+        self._lock       = threading.Lock()
+        self.counters    = {}      # cumulative
+        self.histograms  = {}      # cumulative
+        self._cycles     = {}      # job -> _Cycle since that job's last summary
+
+    def _cycle(self, job):
+        cycle = self._cycles.get(job)
+        if cycle is None:
+            cycle = self._cycles[job] = _Cycle()
+        return cycle
+
+    def observe(self, name, value, **labels):
+        key, job = _key(name, labels), _job.get()
+        with self._lock:
+            for table in (self.histograms, self._cycle(job).hists):
+                hist = table.get(key)
+                if hist is None:
+                    hist = table[key] = Histogram()
+                hist.observe(value)
+        if _events:
+            extra = {"job": job} if job else {}
+            self._write({"type": "timing", "stage": name, "duration": round(value, 6),
+                         "ts": time.time(), **extra, **labels})
+
+    def incr(self, name, value=1, **labels):
+        key, job = _key(name, labels), _job.get()
+        with self._lock:
+            counts = self._cycle(job).counts
+            self.counters[key] = self.counters.get(key, 0) + value
+            counts[key]        = counts.get(key, 0) + value
+
+    def cycle_summary(self, reset: bool = True, job: str = None) -> dict:
+        """Summary of one job's current cycle (the calling job's by default)."""
+        job = job if job is not None else _job.get()
+        with self._lock:
+            cycle = self._cycle(job)
+            hists, counts, started = cycle.hists, cycle.counts, cycle.start
+            if reset:
+                self._cycles[job] = _Cycle()
+        stages = {}
+        for (name, labels), h in sorted(hists.items()):
+            label = name + "".join(f"[{v}]" for _, v in labels)
+            stages[label] = {
+                "count": h.count,
+                "total": round(h.sum, 4),
+                "mean":  round(h.sum / h.count, 4),
+                "max":   round(h.max, 4),
+                "p95":   round(h.quantile(0.95), 4),
+            }
+        counters = {name + "".join(f"[{v}]" for _, v in labels): v
+                    for (name, labels), v in sorted(counts.items())}
+        return {"type": "cycle", "start": started, "end": time.time(),
+                "stages": stages, "counters": counters}
+
+    def export(self) -> dict:
+        """Cumulative samples as plain data (picklable), for merge() elsewhere."""
+        with self._lock:
+            return {"hists": [(key, list(h.counts), h.count, h.sum, h.max)
+                              for key, h in self.histograms.items()],
+                    "counters": list(self.counters.items())}
+
+    def merge(self, data: dict):
+        """Fold another registry's export() in, counting toward the calling job's cycle."""
+        job = _job.get()
+        with self._lock:
+            cycle = self._cycle(job)
+            for key, counts, count, total, peak in data["hists"]:
+                for table in (self.histograms, cycle.hists):
+                    hist = table.get(key)
+                    if hist is None:
+                        hist = table[key] = Histogram()
+                    hist.counts = [a + b for a, b in zip(hist.counts, counts)]
+                    hist.count += count
+                    hist.sum   += total
+                    hist.max    = max(hist.max, peak)
+            for key, value in data["counters"]:
+                self.counters[key] = self.counters.get(key, 0) + value
+                cycle.counts[key]  = cycle.counts.get(key, 0) + value
+
+    def render_prometheus(self, prefix: str = "pipeline") -> str:
+        """Cumulative metrics in Prometheus text exposition format."""
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            hists = dict(self.histograms)
+            counters = dict(self.counters)
+        for name in sorted({n for n, _ in hists}):
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for (n, labels), h in sorted(hists.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, c in zip(h.buckets, h.counts):
+                    cumulative += c
+                    lines.append(f"{metric}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_bucket{fmt(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{metric}_sum{fmt(labels)} {h.sum:.6f}")
+                lines.append(f"{metric}_count{fmt(labels)} {h.count}")
+        for name in sorted({n for n, _ in counters}):
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (n, labels), v in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{metric}{fmt(labels)} {v}")
+        return "\n".join(lines) + "\n"
+
+    def _write(self, record: dict):
+        try:
+            with open(METRICS_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"[WARN] Could not write metrics log: {e}")
+
+_registry = Registry()
+
+# ── Module-level API ──────────────────────────────────────────────────────────
+@contextlib.contextmanager
+def job(name: str):
+    """Attribute samples recorded in this block to job `name`'s cycle."""
+    token = _job.set(name)
+    try:
+        yield
+    finally:
+        _job.reset(token)
+
+def bind(fn):
+    """Wrap fn so it records into the caller's job when run on another thread."""
+    name = _job.get()
+    if name is None:
+        return fn
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with job(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+def timer(stage: str, **labels):
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(_registry, stage, labels)
+
+def timed(stage: str, **labels):
+    """Decorator form of timer()."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Timer(_registry, stage, labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def incr(name: str, value=1, **labels):
+    if _enabled:
+        _registry.incr(name, value, **labels)
+
+def observe(name: str, value: float, **labels):
+    if _enabled:
+        _registry.observe(name, value, **labels)
+
+@contextlib.contextmanager
+def capture():
+    """Record into a fresh registry for the block (a pool worker shipping its samples back)."""
+    global _registry
+    outer, _registry = _registry, Registry()
+    try:
+        yield _registry
+    finally:
+        _registry = outer
+
+def merge(data: dict):
+    if _enabled:
+        _registry.merge(data)
+
+def cycle_summary(reset: bool = True, job: str = None) -> dict:
+    return _registry.cycle_summary(reset, job)
+
+def render_prometheus(prefix: str = "pipeline") -> str:
+    return _registry.render_prometheus(prefix)
+
+def log_cycle_summary(name: str = "cycle"):
+    """Write the calling job's cycle summary as a JSON line, print a short table,
+    start a new cycle."""
+    if not _enabled:
+        return None
+    summary = cycle_summary(reset=True)
+    summary["name"] = name
+    _registry._write(summary)
+    if PROM_FILE:
+        with open(PROM_FILE, "w", encoding="utf-8") as f:
+            f.write(render_prometheus())
+    print(f"📊 {name}: {summary['end'] - summary['start']:.1f}s")
+    for stage, s in sorted(summary["stages"].items(), key=lambda kv: -kv[1]["total"]):
+        print(f"   {stage:<28} n={s['count']:<5} total={s['total']:>8.2f}s "
+              f"mean={s['mean']:.3f}s p95={s['p95']:.3f}s max={s['max']:.3f}s")
+    if summary["counters"]:
+        print("   " + "  ".join(f"{k}={v}" for k, v in summary["counters"].items()))
+    return summary
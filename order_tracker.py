@@ -0,0 +1,194 @@
+"""Shared, non-blocking order-fill tracker.
+
+One background poller watches every pending entry order in batched
+list_orders calls (with get_order as a fallback) and, optionally, an
+Alpaca trade_updates stream. When an order resolves, the tracker calls
+back into the caller instead of the caller busy-waiting:
+    on_fill(filled_qty, avg_price)   full fill, or the filled part of a
+                                     partial fill that was cancelled
+    on_reject(reason)                rejected / cancelled / expired with
+                                     nothing filled, or timed out
+Orders still open at their deadline are cancelled; whatever filled by
+then is handed to on_fill.
+The poller thread only lives while something is pending.
+"""
+
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+
+FILL_TIMEOUT_S   = 30      # cancel an entry that hasn't filled by then
+CANCEL_GRACE_S   = 10      # wait this long for the cancel to settle
+POLL_INTERVAL_S  = 0.5
+STREAM_POLL_S    = 5.0     # backstop poll rate while a stream is attached
+
+TERMINAL = {"filled", "canceled", "expired", "rejected", "done_for_day", "stopped", "suspended"}
+
+def _field(order, name, default=None):
+    """Read a field from an Alpaca Order entity or a raw stream dict."""
+    if isinstance(order, dict):
+        return order.get(name, default)
+    return getattr(order, name, default)
+
+class _Tracked:
+    def __init__(self, order_id, symbol, qty, on_fill, on_reject, deadline):
+        self.order_id  = order_id
+        self.symbol    = symbol
+        self.qty       = qty
+        self.on_fill   = on_fill
+        self.on_reject = on_reject
+        self.deadline  = deadline
+        self.submitted = datetime.now(timezone.utc)
+        self.cancel_requested = False
+        self.filled_qty = 0
+        self.avg_price  = None
+
+class OrderTracker:
+    def __init__(self, api, poll_interval: float = POLL_INTERVAL_S):
+        self.api           = api
+        self.poll_interval = poll_interval
+        self._pending      = {}
+        self._lock         = threading.Lock()
+        self._running      = False
+        self._streaming    = False
+
+    # ── registration ──────────────────────────────────────────────────────────
+    def track(self, order_id, qty, on_fill, on_reject=None,
+              symbol=None, timeout: float = FILL_TIMEOUT_S):
+        """Watch order_id until it resolves; returns immediately."""
+        tracked = _Tracked(order_id, symbol, qty, on_fill, on_reject,
+                           time.monotonic() + timeout)
+        with self._lock:
+            self._pending[order_id] = tracked
+            start = not self._running
+            self._running = True
+        if start:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def pending(self):
+        with self._lock:
+            return list(self._pending)
+
+    # ── streaming ─────────────────────────────────────────────────────────────
+    def attach_stream(self, stream):
+        """
+        Subscribe to an alpaca_trade_api Stream's trade_updates; polling is
+        kept as a slower backstop in case an event is missed.
+        """
+        async def _on_update(data):
+            self.handle_trade_update(_field(data, "event"), _field(data, "order"))
+        stream.subscribe_trade_updates(_on_update)
+        self._streaming = True
+
+    def handle_trade_update(self, event, order):
+        with self._lock:
+            tracked = self._pending.get(_field(order, "id"))
+        if tracked is None:
+            return
+        if event in ("fill", "partial_fill"):
+            self._resolve(tracked, order)
+        elif event in ("canceled", "expired", "rejected", "done_for_day"):
+            self._resolve(tracked, order, status=event)
+
+    # ── polling ───────────────────────────────────────────────────────────────
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"[WARN] Order poll failed: {e}")
+            with self._lock:
+                idle = not self._pending
+            if not idle:
+                time.sleep(STREAM_POLL_S if self._streaming else self.poll_interval)
+
+    def poll_once(self):
+        with self._lock:
+            batch = list(self._pending.values())
+        if not batch:
+            return
+        orders = self._fetch_orders(batch)
+        now = time.monotonic()
+        for tracked in batch:
+            order = orders.get(tracked.order_id)
+            if order is not None and self._resolve(tracked, order):
+                continue
+            if now >= tracked.deadline:
+                self._expire(tracked, order)
+
+    def _fetch_orders(self, batch):
+        """One list_orders round-trip for the whole batch; get_order for stragglers."""
+        ids = {t.order_id for t in batch}
+        found = {}
+        list_orders = getattr(self.api, "list_orders", None)
+        if list_orders is not None and len(batch) > 1:
+            since = min(t.submitted for t in batch) - timedelta(seconds=5)
+            symbols = sorted({t.symbol for t in batch if t.symbol})
+            try:
+                for o in list_orders(status="all", after=since.isoformat(),
+                                     symbols=symbols or None, limit=500):
+                    if o.id in ids:
+                        found[o.id] = o
+            except Exception as e:
+                print(f"[WARN] list_orders failed, falling back to get_order: {e}")
+        for oid in ids - set(found):
+            try:
+                found[oid] = self.api.get_order(oid)
+            except Exception as e:
+                print(f"[WARN] get_order({oid}) failed: {e}")
+        return found
+
+    # ── resolution ────────────────────────────────────────────────────────────
+    def _resolve(self, tracked, order, status=None) -> bool:
+        """Settle tracked from an order snapshot; returns True once it's done."""
+        status = status or _field(order, "status")
+        avg    = _field(order, "filled_avg_price")
+        filled = _field(order, "filled_qty")
+        filled = float(filled) if filled not in (None, "") else 0.0
+        if avg:
+            tracked.avg_price = float(avg)
+            # clients that don't report status/qty only set a price once filled
+            if status is None:
+                status = "filled"
+        if status == "filled" and not filled:
+            filled = tracked.qty
+        tracked.filled_qty = int(filled)
+
+        if status not in TERMINAL:
+            return False
+        if not self._pop(tracked):
+            return True
+        if tracked.filled_qty > 0 and tracked.avg_price:
+            if status != "filled":
+                print(f"[WARN] {tracked.symbol or tracked.order_id}: partial fill "
+                      f"{tracked.filled_qty}/{tracked.qty} ({status})")
+            tracked.on_fill(tracked.filled_qty, tracked.avg_price)
+        elif tracked.on_reject:
+            tracked.on_reject(status)
+        return True
+
+    def _expire(self, tracked, order):
+        if not tracked.cancel_requested:
+            tracked.cancel_requested = True
+            tracked.deadline = time.monotonic() + CANCEL_GRACE_S
+            print(f"[WARN] {tracked.symbol or tracked.order_id}: not filled in time; cancelling.")
+            try:
+                self.api.cancel_order(tracked.order_id)
+            except Exception as e:
+                print(f"[WARN] cancel_order({tracked.order_id}) failed: {e}")
+            return
+        # cancel never confirmed: settle with whatever we last saw
+        if not self._pop(tracked):
+            return
+        if tracked.filled_qty > 0 and tracked.avg_price:
+            tracked.on_fill(tracked.filled_qty, tracked.avg_price)
+        elif tracked.on_reject:
+            tracked.on_reject("timeout")
+
+    def _pop(self, tracked) -> bool:
+        with self._lock:
+            return self._pending.pop(tracked.order_id, None) is not None
@@ -0,0 +1,146 @@
+"""Momentum-first ordering for the news sweep.
+
+Gainers are ranked by a priority built from the scraped % change and
+relative volume (and, once their feed is in, how fresh the news is), and
+PriorityScheduler runs work highest-priority first on a fixed pool of
+threads under a per-cycle time budget. Once the budget is spent nothing
+new is started; whatever is left (the lowest-priority names) is reported
+as skipped and picked up again next cycle.
+"""
+
+import math
+import time
+import heapq
+import itertools
+import threading
+from datetime import datetime
+
+import metrics
+
+W_PCT               = 2.0     # weight on log1p(% change / 100)
+W_RVOL              = 1.0     # weight on log1p(relative volume)
+W_NEWS              = 1.0     # weight on news freshness (1 = just published)
+NEWS_HALF_LIFE_MIN  = 10.0    # freshness halves every N minutes
+
+_SUFFIX = {"K": 1e3, "M": 1e6, "B": 1e9}
+
+# ── Parsing / scoring ─────────────────────────────────────────────────────────
+def parse_number(text) -> float:
+    """'+265.46%' → 265.46, '7.87' → 7.87, '1.2K' → 1200, '−3.1%' → -3.1, junk → 0."""
+    if text is None:
+        return 0.0
+    if isinstance(text, (int, float)):
+        return float(text)
+    s = str(text).strip().replace(",", "").replace("%", "").replace("−", "-")
+    mult = 1.0
+    if s and s[-1].upper() in _SUFFIX:
+        mult, s = _SUFFIX[s[-1].upper()], s[:-1]
+    try:
+        return float(s) * mult
+    except ValueError:
+        return 0.0
+
+def momentum_score(row: dict) -> float:
+    pct  = max(parse_number(row.get("pct_change")), 0.0)
+    rvol = max(parse_number(row.get("rel_volume")), 0.0)
+    return W_PCT * math.log1p(pct / 100) + W_RVOL * math.log1p(rvol)
+
+def news_freshness(articles, now: datetime = None) -> float:
+    """1.0 for news published just now, halving every NEWS_HALF_LIFE_MIN (naive UTC times)."""
+    now = now or datetime.utcnow()
+    best = 0.0
+    for art in articles or ():
+        try:
+            age = (now - datetime.fromisoformat(art["published"])).total_seconds() / 60
+        except (KeyError, TypeError, ValueError):
+            continue
+        best = max(best, 0.5 ** (max(age, 0.0) / NEWS_HALF_LIFE_MIN))
+    return best
+
+def priority_score(row: dict, articles=None, now: datetime = None) -> float:
+    return momentum_score(row) + W_NEWS * news_freshness(articles, now)
+
+def rank_gainers(rows):
+    """Rows sorted by momentum, strongest first (stable for ties)."""
+    return sorted(rows, key=momentum_score, reverse=True)
+
+# ── Scheduler ─────────────────────────────────────────────────────────────────
+class PriorityScheduler:
+    """
+    Max-heap of tasks drained by max_workers threads. Tasks may push more
+    tasks (e.g. a feed fetch pushes its scoring step at a news-aware
+    priority). run() returns once everything started has finished and
+    nothing runnable is left.
+    """
+
+    def __init__(self, max_workers: int = 8, budget_s: float = None):
+        self.max_workers = max_workers
+        self.budget_s    = budget_s
+        self.deadline    = None
+        self.skipped     = []
+        self.done        = 0
+        self.errors      = 0
+        self._heap       = []
+        self._seq        = itertools.count()
+        self._inflight   = 0
+        self._cond       = threading.Condition()
+
+    def push(self, priority: float, fn, *args, name: str = None):
+        with self._cond:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                self.skipped.append(name or fn.__name__)
+                return
+            heapq.heappush(self._heap, (-priority, next(self._seq), name or fn.__name__, fn, args))
+            self._cond.notify()
+
+    def hold(self):
+        """Keep run() going while another thread may still push (until release())."""
+        with self._cond:
+            self._inflight += 1
+
+    def release(self):
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._heap and self._inflight:
+                    self._cond.wait()
+                if not self._heap:
+                    self._cond.notify_all()
+                    return
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    self.skipped.extend(name for _, _, name, _, _ in sorted(self._heap))
+                    self._heap.clear()
+                    self._cond.notify_all()
+                    return
+                _, _, name, fn, args = heapq.heappop(self._heap)
+                self._inflight += 1
+            try:
+                fn(*args)
+                ok = True
+            except Exception as e:
+                print(f"[ERROR] {name} failed: {e}")
+                ok = False
+            with self._cond:
+                self._inflight -= 1
+                if ok:
+                    self.done += 1
+                else:
+                    self.errors += 1
+                self._cond.notify_all()
+
+    def run(self) -> dict:
+        if self.budget_s is not None:
+            self.deadline = time.monotonic() + self.budget_s
+        # workers record metrics under the job that started the run
+        threads = [threading.Thread(target=metrics.bind(self._worker), name=f"prio-{i}",
+                                    daemon=True)
+                   for i in range(self.max_workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return {"done": self.done, "errors": self.errors, "skipped": list(self.skipped)}
@@ -0,0 +1,245 @@
+"""Timeouts, retries, circuit breakers and hedged requests for external calls.
+
+Every outbound dependency is an endpoint with a policy (POLICIES):
+    timeout      hard per-attempt deadline in seconds; the caller stops
+                 waiting even if the library underneath doesn't honour it
+    retries      extra attempts after the first, with full-jitter
+                 exponential backoff (sleep ~ U(0, min(cap, base·2^n)))
+    hedge_after  if set, fire a duplicate request when the first hasn't
+                 answered after this many seconds; first success wins.
+                 Opt-in: a hedge pays for the request twice, so billed
+                 endpoints (llama, gpt) leave it off
+    failures / reset_s
+                 circuit breaker: after `failures` consecutive failed
+                 calls the endpoint is skipped for reset_s, then a single
+                 trial call decides whether it closes again
+    bulkhead     threads the endpoint's attempts run on; each endpoint has
+                 its own pool, so calls hung (or hedged) on one provider
+                 can't hold the threads another endpoint's calls need
+Usage:
+    resilience.call("llama", llama_sentiment, text)
+    if resilience.is_open("gpt"): ...        # skip without waiting
+"""
+
+import os
+import time
+import random
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import metrics
+
+DEFAULT_POLICY = dict(timeout=15.0, retries=1, backoff_s=0.5, max_backoff_s=5.0,
+                      hedge_after=None, failures=5, reset_s=60.0, bulkhead=8)
+
+POLICIES = {
+    "finbert":    dict(timeout=30.0, retries=0),
+    "llama":      dict(timeout=20.0, retries=1, bulkhead=16),
+    "gpt":        dict(timeout=20.0, retries=1, bulkhead=16),
+    "twelvedata": dict(timeout=10.0, retries=2),
+    "alpaca":     dict(timeout=10.0, retries=2),
+}
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+class CallTimeout(TimeoutError):
+    pass
+
+def policy(endpoint: str) -> dict:
+    return {**DEFAULT_POLICY, **POLICIES.get(endpoint, {})}
+
+def http_timeout(endpoint: str):
+    """(connect, read) timeout to pass to requests for this endpoint."""
+    t = policy(endpoint)["timeout"]
+    return (min(5.0, t), t)
+
+# ── Circuit breaker ───────────────────────────────────────────────────────────
+class CircuitBreaker:
+    def __init__(self, name: str, failures: int = 5, reset_s: float = 60.0):
+        self.name      = name
+        self.failures  = failures
+        self.reset_s   = reset_s
+        self.state     = "closed"
+        self.count     = 0
+        self.opened_at = 0.0
+        self._trial    = False
+        self._lock     = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_s:
+                self.state = "half_open"
+                self._trial = False
+            if self.state == "half_open" and not self._trial:
+                self._trial = True          # exactly one probe at a time
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == "open" and time.monotonic() - self.opened_at < self.reset_s
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.count, self._trial = "closed", 0, False
+
+    def record_failure(self):
+        with self._lock:
+            self.count += 1
+            if self.state == "half_open" or self.count >= self.failures:
+                if self.state != "open":
+                    print(f"[WARN] Circuit for {self.name} opened after {self.count} failures.")
+                    metrics.incr("breaker_open", endpoint=self.name)
+                self.state, self.opened_at, self._trial = "open", time.monotonic(), False
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def breaker(endpoint: str) -> CircuitBreaker:
+    with _breakers_lock:
+        b = _breakers.get(endpoint)
+        if b is None:
+            p = policy(endpoint)
+            b = _breakers[endpoint] = CircuitBreaker(endpoint, p["failures"], p["reset_s"])
+        return b
+
+def is_open(endpoint: str) -> bool:
+    if _delegate is not None:
+        return endpoint in _delegate[0]
+    return breaker(endpoint).is_open()
+
+def open_endpoints() -> list:
+    with _breakers_lock:
+        names = list(_breakers)
+    return [name for name in names if is_open(name)]
+
+# ── Pool workers ──────────────────────────────────────────────────────────────
+# A forked worker's breakers are a stale copy of the parent's, and what it
+# records never reaches the parent. Inside delegated() the worker takes the
+# parent's open endpoints as given and only collects outcomes, which the
+# parent replays into its own breakers with apply_outcomes().
+_delegate = None        # (blocked endpoints, [(endpoint, ok)]) while delegated
+
+class _Recorder:
+    def __init__(self, endpoint, blocked, outcomes):
+        self.endpoint = endpoint
+        self.blocked  = blocked
+        self.outcomes = outcomes
+
+    def allow(self) -> bool:
+        return self.endpoint not in self.blocked
+
+    def record_success(self):
+        self.outcomes.append((self.endpoint, True))
+
+    def record_failure(self):
+        self.outcomes.append((self.endpoint, False))
+
+@contextlib.contextmanager
+def delegated(blocked=()):
+    """Record breaker outcomes instead of applying them; yields the outcome list."""
+    global _delegate
+    outer, _delegate = _delegate, (frozenset(blocked), [])
+    try:
+        yield _delegate[1]
+    finally:
+        _delegate = outer
+
+def apply_outcomes(outcomes):
+    for endpoint, ok in outcomes:
+        if ok:
+            breaker(endpoint).record_success()
+        else:
+            breaker(endpoint).record_failure()
+
+def reset(endpoint: str = None):
+    """Forget breaker state and pools (one endpoint, or all) so policy changes apply."""
+    with _breakers_lock:
+        if endpoint is None:
+            _breakers.clear()
+        else:
+            _breakers.pop(endpoint, None)
+    with _executors_lock:
+        names = list(_executors) if endpoint is None else [endpoint]
+        for name in names:
+            ex = _executors.pop(name, None)
+            if ex is not None:
+                ex.shutdown(wait=False)
+
+# ── Attempts ──────────────────────────────────────────────────────────────────
+# attempts run on a per-endpoint pool (bulkhead) so the caller can stop
+# waiting on a hung call without starving other endpoints
+_executors = {}
+_executors_lock = threading.Lock()
+
+def executor(endpoint: str) -> ThreadPoolExecutor:
+    with _executors_lock:
+        ex = _executors.get(endpoint)
+        if ex is None:
+            ex = _executors[endpoint] = ThreadPoolExecutor(
+                max_workers=policy(endpoint)["bulkhead"], thread_name_prefix=f"resilience-{endpoint}")
+        return ex
+
+def _reset_after_fork():
+    # a forked worker inherits the executors' bookkeeping but none of their threads
+    global _executors, _executors_lock, _breakers_lock
+    _executors = {}
+    _executors_lock = threading.Lock()
+    _breakers_lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _attempt(endpoint, fn, args, kwargs, timeout, hedge_after):
+    pool, fn = executor(endpoint), metrics.bind(fn)
+    futures = [pool.submit(fn, *args, **kwargs)]
+    deadline = time.monotonic() + timeout
+    try:
+        if hedge_after is not None and hedge_after < timeout:
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                metrics.incr("hedged_requests", endpoint=endpoint)
+                futures.append(pool.submit(fn, *args, **kwargs))
+        error = None
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    return f.result()
+                error = f.exception()
+        if error is not None and not pending:
+            raise error
+        raise CallTimeout(f"{endpoint} did not answer within {timeout:.1f}s")
+    finally:
+        # attempts still queued behind a saturated bulkhead must not run later
+        # (a running one can't be stopped; cancel() leaves it alone)
+        for f in futures:
+            f.cancel()
+
+def call(endpoint: str, fn, *args, retry_on=(Exception,), **kwargs):
+    """Run fn(*args, **kwargs) under endpoint's timeout / retry / breaker / hedge policy."""
+    p = policy(endpoint)
+    b = breaker(endpoint) if _delegate is None else _Recorder(endpoint, *_delegate)
+    if not b.allow():
+        metrics.incr("breaker_skips", endpoint=endpoint)
+        raise CircuitOpenError(f"{endpoint} circuit is open")
+
+    for n in range(p["retries"] + 1):
+        try:
+            result = _attempt(endpoint, fn, args, kwargs, p["timeout"], p["hedge_after"])
+            b.record_success()
+            return result
+        except Exception as e:
+            if n == p["retries"] or not isinstance(e, retry_on):
+                b.record_failure()
+                raise
+            metrics.incr("retries", endpoint=endpoint)
+            time.sleep(random.uniform(0, min(p["max_backoff_s"], p["backoff_s"] * 2 ** n)))
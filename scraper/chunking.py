@@ -0,0 +1,113 @@
+"""Sentence-aware window planning for long-document FinBERT scoring.
+
+The article is split into sentences, each sentence is tokenized once
+(without special tokens) and given a relevance weight: the headline and
+lead sentences count most, sentences naming a ticker ("(NASDAQ: NVVE)",
+"$NVVE", "( (NVVE) )" or caller-supplied terms) get a boost, and boilerplate (cookie
+banners, "all rights reserved", ...) nearly none.
+
+plan_windows() then fills at most max_windows windows of max_tokens
+each with the most relevant sentences (first-fit, whole sentences, kept
+in document order inside a window) and returns each window's token ids
+with a weight (relevance × tokens). finbert_utils frames every
+window with [CLS]/[SEP] and runs them as one padded batch, so the cost
+per article is bounded by max_windows however long the page is.
+"""
+
+import re
+
+HEADLINE_WEIGHT = 3.0
+LEAD_WEIGHT     = 2.0
+LEAD_SENTENCES  = 3          # sentences after the headline that count as the lead
+MENTION_BOOST   = 1.5
+SHORT_TOKENS    = 4          # fragments shorter than this are half weight
+BOILERPLATE_WEIGHT = 0.1
+MIN_WEIGHT      = 0.2        # below this a sentence is only scored if nothing else is left
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"“(A-Z0-9$])|\n+")
+_TICKER_RE   = re.compile(r"\b(?:NYSE|NASDAQ|Nasdaq|NYSE American|AMEX|OTC|TSX)\s*:\s*([A-Z]{1,5})\b"
+                          r"|\$([A-Z]{1,5})\b|\(\s*\(\s*([A-Z]{1,5})\s*\)\s*\)")
+_ABBREV_RE   = re.compile(r"\b(?:Corp|Inc|Co|Ltd|Mr|Mrs|Ms|Dr|Jr|St|vs|U\.S)\.$")
+_BOILERPLATE = re.compile(
+    r"cookie|subscribe|sign up|newsletter|all rights reserved|click here|terms of (?:use|service)"
+    r"|privacy policy|advertisement|forward-looking statements|read more|share this",
+    re.IGNORECASE)
+
+def split_sentences(text: str) -> list:
+    out = []
+    for piece in _SENTENCE_RE.split(text or ""):
+        piece = (piece or "").strip()
+        if not piece:
+            continue
+        if out and _ABBREV_RE.search(out[-1]):     # "Nuvve Holding Corp. (NASDAQ: NVVE) …"
+            out[-1] += " " + piece
+        else:
+            out.append(piece)
+    return out
+
+def find_tickers(text: str) -> set:
+    """Tickers named in exchange, cashtag or "((XYZ))" form."""
+    return {next(g for g in m.groups() if g) for m in _TICKER_RE.finditer(text or "")}
+
+def sentence_weights(sentences, n_tokens, terms=()) -> list:
+    terms = [t.lower() for t in terms if t]
+    weights = []
+    for i, (sent, n) in enumerate(zip(sentences, n_tokens)):
+        if i == 0:
+            w = HEADLINE_WEIGHT
+        elif i <= LEAD_SENTENCES:
+            w = LEAD_WEIGHT
+        else:
+            w = 1.0
+        lower = sent.lower()
+        if _TICKER_RE.search(sent) or any(t in lower for t in terms):
+            w += MENTION_BOOST
+        if _BOILERPLATE.search(sent):
+            w *= BOILERPLATE_WEIGHT
+        if n < SHORT_TOKENS:
+            w *= 0.5
+        weights.append(w)
+    return weights
+
+def _segments(token_ids, weights, max_tokens):
+    """(sentence, offset, ids, weight) with over-long sentences cut into max_tokens pieces."""
+    out = []
+    for pos, (ids, w) in enumerate(zip(token_ids, weights)):
+        for start in range(0, max(len(ids), 1), max_tokens):
+            piece = list(ids[start:start + max_tokens])
+            if piece:
+                out.append((pos, start, piece, w))
+    return out
+
+def plan_windows(token_ids, weights, max_tokens: int = 510, max_windows: int = 4) -> list:
+    """
+    token_ids: per-sentence token id lists (no special tokens)
+    weights:   per-sentence relevance
+    Returns [(ids, weight)], at most max_windows windows of at most
+    max_tokens ids each, sentences kept in document order.
+    """
+    segs = _segments(token_ids, weights, max_tokens)
+    segs = [s for s in segs if s[3] >= MIN_WEIGHT] or segs
+    # most relevant first (earlier text winning ties), first-fit into the
+    # open windows; a segment that fits nowhere is dropped, so smaller
+    # relevant ones can still use the space
+    bins = []
+    for seg in sorted(segs, key=lambda s: (-s[3], s[0], s[1])):
+        size = len(seg[2])
+        for b in bins:
+            if b["size"] + size <= max_tokens:
+                break
+        else:
+            if len(bins) >= max_windows:
+                continue
+            b = {"size": 0, "segs": []}
+            bins.append(b)
+        b["size"] += size
+        b["segs"].append(seg)
+
+    windows = []
+    for b in sorted(bins, key=lambda b: min((s[0], s[1]) for s in b["segs"])):
+        ordered = sorted(b["segs"], key=lambda s: (s[0], s[1]))
+        windows.append(([tok for s in ordered for tok in s[2]],
+                        sum(s[3] * len(s[2]) for s in ordered)))
+    return windows
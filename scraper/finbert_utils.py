@@ -1,47 +1,86 @@
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
-from typing import Tuple
+from typing import Tuple, Dict
+import os
 import math
 
+from chunking import split_sentences, find_tickers, sentence_weights, plan_windows
+from lru_cache import LRUCache, content_key
+
 device = "cuda:0" if torch.cuda.is_available() else "cpu"
 
-tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
+tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert", use_fast=True)
 model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert").to(device)
 labels = ["positive", "negative", "neutral"]
 
-def estimate_sentiment(text: str) -> Tuple[float, str]:
-    if not text:
-        return 0, labels[-1]
+MAX_TOKENS = 512                                             # model limit, incl. [CLS]/[SEP]
+MAX_CHUNKS = int(os.environ.get("FINBERT_MAX_CHUNKS", "4"))  # windows scored per document
+CACHE_SIZE = int(os.environ.get("FINBERT_CACHE_SIZE", "4096"))  # entries per cache, 0 = off
 
-    # Tokenize the full text without truncating
-    tokens = tokenizer(text, return_tensors="pt", padding=False, truncation=False)
-    input_ids = tokens["input_ids"][0]  # remove batch dimension
-    chunk_size = 512
+# sentence → token ids, and framed window ids → logits (CPU tensor); per process
+token_cache = LRUCache("finbert_tokens", CACHE_SIZE)
+logit_cache = LRUCache("finbert_logits", CACHE_SIZE)
 
-    # Split input_ids into chunks of 512
-    chunks = [input_ids[i:i + chunk_size] for i in range(0, len(input_ids), chunk_size)]
+def tokenize_sentences(sentences):
+    """Token ids (no special tokens) per sentence; only unseen sentences hit the tokenizer."""
+    keys = [content_key(s) for s in sentences]
+    out = [token_cache.get(k) for k in keys]
+    missing = [i for i, ids in enumerate(out) if ids is None]
+    if missing:
+        encoded = tokenizer([sentences[i] for i in missing], add_special_tokens=False)["input_ids"]
+        for i, ids in zip(missing, encoded):
+            out[i] = ids
+            token_cache.put(keys[i], ids)
+    return out
 
-    # Track sum of softmax scores
-    sentiment_scores = torch.zeros(len(labels), device=device)
+def cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "logits": logit_cache.stats()}
 
-    for chunk in chunks:
-        inputs = {
-            "input_ids": chunk.unsqueeze(0).to(device),
-            "attention_mask": torch.ones_like(chunk).unsqueeze(0).to(device),
-        }
-        with torch.no_grad():
-            logits = model(**inputs)["logits"]
-            probs = torch.nn.functional.softmax(logits[0], dim=-1)
-            sentiment_scores += probs
+def build_windows(text: str, terms=(), max_chunks: int = MAX_CHUNKS):
+    """[(input ids framed with [CLS] … [SEP], weight)] for the most relevant sections of text."""
+    sentences = split_sentences(text) or [text]
+    token_ids = tokenize_sentences(sentences)
+    weights = sentence_weights(sentences, [len(ids) for ids in token_ids],
+                               terms=set(terms) | find_tickers(text))
+    windows = plan_windows(token_ids, weights, max_tokens=MAX_TOKENS - 2, max_windows=max_chunks)
+    return [([tokenizer.cls_token_id] + ids + [tokenizer.sep_token_id], w) for ids, w in windows]
+
+def estimate_sentiment_scores(text: str, terms=(), max_chunks: int = MAX_CHUNKS) -> Dict[str, float]:
+    """Relevance-weighted softmax over all three labels, all windows in one batch."""
+    if not text:
+        return {"positive": 0.0, "neutral": 1.0, "negative": 0.0}
+
+    windows = build_windows(text, terms, max_chunks)
+    if not windows:
+        return {"positive": 0.0, "neutral": 1.0, "negative": 0.0}
 
-    # Average sentiment across chunks
-    sentiment_scores /= len(chunks)
+    # only windows not scored before go through the model, as one padded batch
+    keys = [content_key(ids) for ids, _ in windows]
+    logits = [logit_cache.get(k) for k in keys]
+    missing = [i for i, row in enumerate(logits) if row is None]
+    if missing:
+        batch = tokenizer.pad({"input_ids": [windows[i][0] for i in missing]}, return_tensors="pt")
+        batch = {k: v.to(device) for k, v in batch.items()}
+        with torch.no_grad():
+            fresh = model(**batch)["logits"].cpu()
+        for i, row in zip(missing, fresh):
+            logits[i] = row
+            logit_cache.put(keys[i], row)
+    probs = torch.nn.functional.softmax(torch.stack(logits).to(device), dim=-1)
 
-    probability = torch.max(sentiment_scores)
-    sentiment = labels[torch.argmax(sentiment_scores)]
+    weights = torch.tensor([w for _, w in windows], dtype=probs.dtype, device=device)
+    if not math.isfinite(float(weights.sum())) or float(weights.sum()) <= 0:
+        weights = torch.ones_like(weights)
+    sentiment_scores = (probs * weights[:, None]).sum(dim=0) / weights.sum()
+    return dict(zip(labels, sentiment_scores.tolist()))
 
-    return probability.item(), sentiment
+def estimate_sentiment(text: str) -> Tuple[float, str]:
+    if not text:
+        return 0, labels[-1]
+    scores = estimate_sentiment_scores(text)
+    sentiment = max(scores, key=scores.get)
+    return scores[sentiment], sentiment
 
 if __name__ == "__main__":
     tensor, sentiment = estimate_sentiment('Nuvve Holding ( (NVVE) ) has issued an update.\nOn May 9, 2025, Nuvve Holding Corp. announced its engagement with multiple digital asset advisory consultants to accelerate the growth of its new subsidiary, Nuvve-DigitalAssets.\nThis strategic move aims to enhance Nuvve’s digital asset portfolio and create long-term shareholder value through blockchain innovation.\nThe company has formed a Digital Asset Management Portfolio Committee, chaired by renowned crypto investor James Altucher, to oversee investment decisions.\nMore about Nuvve Holding Nuvve Holding Corp. (NASDAQ: NVVE) is a global leader in vehicle-to-grid (V2G) technology, which enables electric vehicles to store and discharge energy, transforming them into mobile energy resources to help stabilize the grid.')
-    print(tensor, sentiment)
\ No newline at end of file
+    print(tensor, sentiment)
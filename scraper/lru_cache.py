@@ -0,0 +1,67 @@
+"""Small thread-safe LRU cache keyed by content hash.
+
+finbert_utils keeps two of these: sentence text → token ids, and framed
+window ids → logits. Titles re-scored as fallbacks, or summaries seen
+again in a later cycle, then cost a dict lookup instead of a tokenizer
+call and a forward pass. Keys are 16-byte blake2b digests, so memory is
+bounded by `maxsize` entries whatever the text length.
+Returns:
+    LRUCache.get() -> value or None; stats() -> hits, misses, size, hit_rate
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import metrics
+
+def content_key(data) -> bytes:
+    """Digest of a str, bytes or sequence of ints (token ids)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    elif not isinstance(data, (bytes, bytearray)):
+        data = ",".join(map(str, data)).encode("ascii")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+class LRUCache:
+    def __init__(self, name: str, maxsize: int = 4096):
+        self.name    = name
+        self.maxsize = maxsize
+        self.hits    = 0
+        self.misses  = 0
+        self._data   = OrderedDict()
+        self._lock   = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        metrics.incr(f"{self.name}_cache_{'misses' if value is None else 'hits'}")
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data),
+                    "hit_rate": self.hits / total if total else 0.0}
+
+    def __len__(self):
+        return len(self._data)
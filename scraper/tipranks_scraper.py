@@ -1,16 +1,17 @@
-import re
-import json
 import time
-import csv
 import requests
-from bs4 import BeautifulSoup
 from finbert_utils import estimate_sentiment
+from columnar_sink import get_sink
+import http_cache
+from html_parsing import parse, state_json
 # from llama_utils import estimate_sentiment
 
 # 1) Original news page is the SPA that contains the JSON blob
 NEWS_SPA_URL = "https://www.tipranks.com/news"
 # 2) Article pages are on the blog subdomain
 BLOG_BASE    = "https://blog.tipranks.com"
+# 3) Blog posts rarely change once published: reuse cached HTML this long
+ARTICLE_MAX_AGE = 6 * 3600
 
 def fetch_state_json(url):
     """
@@ -20,39 +21,17 @@ def fetch_state_json(url):
     """
     headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = http_cache.get(url, headers=headers, timeout=10)
         resp.raise_for_status()
     except requests.RequestException as e:
         print(f"✖ Failed to fetch SPA JSON at {url!r}: {e}")
         return None
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    for script in soup.find_all("script"):
-        src = script.string or script.text or ""
-        if "window.__STATE__" not in src:
-            continue
+    state = state_json(resp.text, "window.__STATE__")
+    if state is not None:
+        return state
 
-        # 1) Try JSON.parse("…");
-        m = re.search(r'window\.__STATE__\s*=\s*JSON\.parse\("([\s\S]*?)"\);', src)
-        if m:
-            js_escaped = m.group(1)
-            decoded = js_escaped.encode("utf-8").decode("unicode_escape")
-            try:
-                return json.loads(decoded)
-            except json.JSONDecodeError as e:
-                print(f"  ⚠ JSON.parse decode error: {e}")
-                return None
-
-        # 2) Fallback: direct = {…}
-        m2 = re.search(r'window\.__STATE__\s*=\s*({[\s\S]*?})', src)
-        if m2:
-            try:
-                return json.loads(m2.group(1))
-            except json.JSONDecodeError as e:
-                print(f"  ⚠ direct JSON decode error: {e}")
-                return None
-
-    print("✖ Did not find any window.__STATE__ in SPA")
+    print("✖ Did not find a decodable window.__STATE__ in SPA")
     return None
 
 def build_blog_url(post):
@@ -73,22 +52,22 @@ def scrape_text(url):
     """
     headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        r = requests.get(url, headers=headers, timeout=10)
+        r = http_cache.get(url, headers=headers, timeout=10, max_age=ARTICLE_MAX_AGE)
         r.raise_for_status()
     except requests.RequestException as e:
         print(f"    ✖ Failed to fetch article at {url!r}: {e}")
         return None
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    doc = parse(r.text)
 
     # 1) Locate the post-entry container
-    container = soup.find("div", class_="post-entry")
+    container = doc.select_one("div.post-entry")
     if not container:
         print(f"    ⚠ No <div class='post-entry'> found in {url!r}")
         return None
 
     # 2) Extract only its <p> children
-    paras = container.find_all("p")
+    paras = container.select("p")
     if not paras:
         print(f"    ⚠ No <p> tags inside post-entry for {url!r}")
         return None
@@ -96,7 +75,7 @@ def scrape_text(url):
     # 3) Join and return their text content
     lines = []
     for p in paras:
-        text = p.get_text(separator=" ", strip=True)
+        text = p.text()
         # skip empty strings
         if text:
             lines.append(text)
@@ -114,44 +93,41 @@ def run_trending_blog_pipeline():
                     .get("trending", [])
     print(f"2) Found {len(trending)} trending items")
 
-    with open("trending_blog.csv", "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["url", "tickers_from_state", "sentiment", "score"])
-
-        for post in trending:
-            url = build_blog_url(post)
-            print("→", url)
-
-            #  Extract tickers straight from the JSON 'stocks' array
-            page_tickers = [
-                s["ticker"]
-                for s in post.get("stocks", [])
-                if s.get("ticker")
-            ]
-
-            # scrape the blog page for its paragraphs (text only)
-            text = scrape_text(url)
-            if text is None:
-                print("    → skipping due to fetch error.")
-                continue
-
-            # sentiment
-            try:
-                score, label = estimate_sentiment(text)
-            except Exception as e:
-                print(f"    ✖ Sentiment analysis failed on {url!r}: {e}")
-                continue
-
-            # write to CSV
-            writer.writerow([
-                url,
-                "|".join(page_tickers),
-                label,
-                f"{score:.4f}"
-            ])
-
-            print(f"   [{label} {score:.2f}] tickers: {page_tickers}")
-            time.sleep(1)  # polite crawl delay
+    sink = get_sink("articles")
+    for post in trending:
+        url = build_blog_url(post)
+        print("→", url)
+
+        #  Extract tickers straight from the JSON 'stocks' array
+        page_tickers = [
+            s["ticker"]
+            for s in post.get("stocks", [])
+            if s.get("ticker")
+        ]
+
+        # scrape the blog page for its paragraphs (text only)
+        text = scrape_text(url)
+        if text is None:
+            print("    → skipping due to fetch error.")
+            continue
+
+        # sentiment
+        try:
+            score, label = estimate_sentiment(text)
+        except Exception as e:
+            print(f"    ✖ Sentiment analysis failed on {url!r}: {e}")
+            continue
+
+        # one row per ticker into the columnar article history
+        for ticker in page_tickers or [None]:
+            sink.append(ticker=ticker, url=url, source="blog",
+                        tickers="|".join(page_tickers), sentiment=label,
+                        probability=float(score), scraper="tipranks")
+
+        print(f"   [{label} {score:.2f}] tickers: {page_tickers}")
+        time.sleep(1)  # polite crawl delay
+
+    sink.flush()
 
 if __name__ == "__main__":
     run_trending_blog_pipeline()
\ No newline at end of file
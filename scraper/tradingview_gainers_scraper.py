@@ -17,9 +17,11 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from bs4 import BeautifulSoup
 from datetime import datetime, time as dtime
 
+import metrics
+from html_parsing import parse
+
 try:
     from zoneinfo import ZoneInfo  # Python 3.9+
     NY = ZoneInfo("America/New_York")
@@ -60,10 +62,15 @@ def init_db(db_file):
     conn.commit()
     conn.close()
 
-def save_to_db(db_file, rows):
+@metrics.timed("db_write", table="gainers")
+def save_to_db(db_file, rows, replace=False):
+    """Insert rows; with replace=True the old rows go in the same transaction,
+    so readers see either the previous screen or the new one, never a gap."""
     conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False)
     c = conn.cursor()
     c.execute("PRAGMA journal_mode=WAL;")
+    if replace:
+        c.execute("DELETE FROM gainers;")
     sql = """
       INSERT OR REPLACE INTO gainers 
         (ticker, company_name, pct_change, rel_volume)
@@ -102,6 +109,7 @@ def clear_db(db_file):
     conn.commit()
     conn.close()
 
+@metrics.timed("gainers_scrape")
 def scrape_gainers(page_url, timeout=15):
     chrome_options = Options()
     chrome_options.add_argument("--headless")
@@ -114,18 +122,23 @@ def scrape_gainers(page_url, timeout=15):
         EC.presence_of_element_located((By.CSS_SELECTOR, "tr.listRow"))
     )
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    html = driver.page_source
     driver.quit()
+    return parse_gainers_html(html)
+
+def parse_gainers_html(html):
+    """Pull ticker / company / % change / rel. volume out of the screener table."""
+    doc = parse(html)
 
     results = []
-    for tr in soup.select("tr.listRow"):
-        ticker = tr.get("data-rowkey")
-        name_tag = tr.find("sup", class_="tickerDescription-GrtoTeat")
-        company_name = name_tag.get_text(strip=True) if name_tag else None
-        pct_tag = tr.find_all("td")[1].find("span")
-        pct_change = pct_tag.get_text(strip=True) if pct_tag else None
-        rel_vol_td = tr.find_all("td")[4]
-        rel_volume = rel_vol_td.get_text(strip=True) if rel_vol_td else None
+    for tr in doc.select("tr.listRow"):
+        ticker = tr.attr("data-rowkey")
+        name_tag = tr.select_one("sup.tickerDescription-GrtoTeat")
+        company_name = name_tag.text() if name_tag else None
+        tds = tr.select("td")
+        pct_tag = tds[1].select_one("span") if len(tds) > 1 else None
+        pct_change = pct_tag.text() if pct_tag else None
+        rel_volume = tds[4].text() if len(tds) > 4 else None
 
         results.append({
             "ticker":       ticker,
@@ -134,16 +147,18 @@ def scrape_gainers(page_url, timeout=15):
             "rel_volume":   rel_volume
         })
 
+    metrics.incr("gainers_rows", len(results))
     return results
 
 def run_scraper_pipeline(db_file=DB_FILE):
     """Runs the full scraping + DB save pipeline and returns the data."""
-    clear_db(db_file)  # Clear the existing rows before inserting new data
     init_db(db_file)
     url = pick_gainers_url()
     print("Scraping:", url)
     rows = scrape_gainers(url)
-    save_to_db(db_file, rows)
+    # Swap the table contents only once the scrape is in hand: the news sweep
+    # may read gainers.db at any point while the browser is still loading.
+    save_to_db(db_file, rows, replace=True)
     print(f"Saved {len(rows)} rows to {db_file}")
     return rows
 
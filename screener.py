@@ -0,0 +1,133 @@
+"""Vectorized entry-signal screener.
+
+Evaluates the same four conditions as trader.entry_signal, but for a
+whole universe of symbols at once on a stacked (symbol × time) array:
+  1) Breaks above yesterday's high
+  2) Volume > 1.5× 20-period avg
+  3) Pullback to VWAP or EMA5 in last 5 bars
+  4) RSI14 < 70
+Returns:
+    boolean entry mask (one per symbol) plus per-condition diagnostics
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ── Signal thresholds (same defaults as trader.entry_signal) ──────────────────
+VOLUME_MULT    = 1.5
+VOLUME_WINDOW  = 20
+PULLBACK_PCT   = 0.003
+PULLBACK_BARS  = 5
+RSI_MAX        = 70
+
+FIELDS = ("close", "volume", "vwap", "ema5", "rsi14")
+
+# ── Stacking helpers ──────────────────────────────────────────────────────────
+def stack_bars(frames: dict, fields=FIELDS, length: int = None):
+    """
+    Stack per-symbol indicator DataFrames (output of compute_indicators)
+    into (symbol × time) float arrays.
+    Rows are right-aligned on each symbol's last bar and left-padded with
+    NaN, so column -1 is always "the last bar" for every symbol.
+    Returns (symbols, {field: ndarray}).
+    """
+    symbols = list(frames)
+    if length is None:
+        length = max((len(df) for df in frames.values()), default=0)
+    bars = {f: np.full((len(symbols), length), np.nan) for f in fields}
+    for i, sym in enumerate(symbols):
+        df = frames[sym].tail(length)
+        n = len(df)
+        if n == 0:
+            continue
+        for f in fields:
+            bars[f][i, length - n:] = df[f].to_numpy(dtype=float)
+    return symbols, bars
+
+def _rolling(arr: np.ndarray, window: int, reduce, pad_partial: bool):
+    """
+    Apply `reduce` over a trailing window along the time axis.
+    With pad_partial=False the first window-1 columns are NaN (pandas
+    rolling(window) semantics); with pad_partial=True they are reduced
+    over whatever bars are available (DataFrame.tail(window) semantics).
+    """
+    n_sym, n_time = arr.shape
+    if pad_partial:
+        padded = np.concatenate(
+            [np.full((n_sym, window - 1), np.nan), arr], axis=1)
+        return reduce(sliding_window_view(padded, window, axis=1), axis=-1)
+    out = np.full((n_sym, n_time), np.nan)
+    if n_time >= window:
+        out[:, window - 1:] = reduce(sliding_window_view(arr, window, axis=1), axis=-1)
+    return out
+
+# ── Conditions ────────────────────────────────────────────────────────────────
+def entry_conditions(bars: dict,
+                     y_high,
+                     vol_mult: float  = VOLUME_MULT,
+                     vol_window: int  = VOLUME_WINDOW,
+                     pb_pct: float    = PULLBACK_PCT,
+                     pb_bars: int     = PULLBACK_BARS,
+                     rsi_max: float   = RSI_MAX) -> dict:
+    """
+    Evaluate every condition at every bar of a stacked (symbol × time)
+    array. `y_high` is broadcast against the bars, so it may be one value
+    per symbol (shape (n_sym, 1)) or one value per bar.
+
+    NaN handling mirrors entry_signal's pandas comparisons: a condition
+    only fails on an explicit comparison, so NaN volume averages or RSI
+    values (too little history) do not block an entry.
+    """
+    close  = bars["close"]
+    volume = bars["volume"]
+
+    breakout = ~(close <= y_high)
+
+    vol_avg   = _rolling(volume, vol_window, np.mean, pad_partial=False)
+    volume_ok = ~(volume < vol_mult * vol_avg)
+
+    vwap_dist = _rolling(np.abs(close - bars["vwap"]), pb_bars, np.fmin.reduce, pad_partial=True)
+    ema_dist  = _rolling(np.abs(close - bars["ema5"]), pb_bars, np.fmin.reduce, pad_partial=True)
+    band      = pb_pct * close
+    pullback  = (vwap_dist < band) | (ema_dist < band)
+
+    rsi_ok = ~(bars["rsi14"] >= rsi_max)
+
+    return {
+        "breakout":  breakout,
+        "volume":    volume_ok,
+        "pullback":  pullback,
+        "rsi":       rsi_ok,
+        "signal":    breakout & volume_ok & pullback & rsi_ok,
+        "vol_avg":   vol_avg,
+        "vwap_dist": vwap_dist,
+        "ema_dist":  ema_dist,
+    }
+
+def screen_entries(bars: dict, y_high, **thresholds):
+    """
+    Screen the last bar of every symbol.
+    `y_high` is a 1-D array with one yesterday's high per symbol.
+    Returns (mask, diagnostics) where mask is a boolean array aligned with
+    the stacked symbols and diagnostics holds each condition's last-bar
+    value under the same keys as entry_conditions.
+    """
+    y_high = np.asarray(y_high, dtype=float).reshape(-1, 1)
+    cond = entry_conditions(bars, y_high, **thresholds)
+    diagnostics = {k: v[:, -1] for k, v in cond.items()}
+    return diagnostics.pop("signal"), diagnostics
+
+def screen_frames(frames: dict, y_highs: dict, **thresholds) -> pd.DataFrame:
+    """
+    Convenience wrapper: screen {symbol: indicator DataFrame} against
+    {symbol: yesterday's high}. Symbols missing a high never break out.
+    Returns a DataFrame indexed by symbol with one column per condition
+    plus the combined `signal` column.
+    """
+    symbols, bars = stack_bars(frames)
+    y_high = [y_highs.get(s, np.inf) for s in symbols]
+    mask, diag = screen_entries(bars, y_high, **thresholds)
+    out = pd.DataFrame(diag, index=pd.Index(symbols, name="symbol"))
+    out["signal"] = mask
+    return out
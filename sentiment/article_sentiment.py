@@ -1,18 +1,32 @@
 from newspaper import Article
 import logging
 
+import metrics
+import http_cache
+
+ARTICLE_MAX_AGE = 6 * 3600    # serve cached article HTML this long before revalidating
+USER_AGENT      = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
 # Suppress the newspaper library's logging output
 logging.getLogger("newspaper").setLevel(logging.CRITICAL)
 
-def extract_main_content(url):
+@metrics.timed("article_extract")
+def extract_main_content(url, html=None):
+    """
+    Download through the shared HTTP cache (unless `html` is already given),
+    parse and summarize the article at url. Returns headline / body_text /
+    summary, or None.
+    """
     try:
-        article = Article(url)
-        article.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-                          '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        if html is None:
+            resp = http_cache.get(url, headers={'User-Agent': USER_AGENT},
+                                  timeout=15, max_age=ARTICLE_MAX_AGE)
+            resp.raise_for_status()
+            html = resp.text
 
-        article.download()
+        article = Article(url)
+        article.download(input_html=html)
         article.parse()
         article.nlp()
 
@@ -23,6 +37,7 @@ def extract_main_content(url):
         }
 
     except Exception as e:
+        metrics.incr("article_extract_failures")
         print(f"[ERROR] Failed to download or parse the article at {url}: {e}")
         return None
 
@@ -0,0 +1,218 @@
+"""Near-duplicate headline clustering ahead of URL decoding and scoring.
+
+Google News lists the same story from many outlets ("Nuvve Holding Shares
+Soar 40% After DOE Grant - Reuters" / "... - Yahoo Finance"). Headlines are
+reduced to a normalized token set (outlet suffix, stopwords, corporate
+suffixes and plural 's' dropped), and two headlines are duplicates when
+their Jaccard similarity is at least SIMILARITY, they share at least
+MIN_SHARED tokens, and they carry the same polarity words: "earnings beat
+estimates" and "earnings miss estimates" are different stories however
+similar the rest of the headline is.
+
+Candidates are found with MinHash LSH: NUM_PERM min-hashes split into
+BANDS bands; headlines sharing any band are compared exactly. Within a
+cycle, cluster() groups a ticker's articles and picks the newest as the
+representative. Across cycles, HeadlineIndex keeps the band keys of
+recently scored representatives in SQLite, so a rewrite of a story scored
+an hour ago (by any process) reuses that article's stored vectors.
+Returns:
+    cluster():              [Cluster(rep, members, known_url)]
+    HeadlineIndex.lookup(): url of a recent scored duplicate, or None
+"""
+
+import re
+import random
+import sqlite3
+import threading
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+NUM_PERM       = 32
+BANDS          = 16          # 16 bands × 2 rows: J=0.6 → 99.9% chance of being a candidate
+SIMILARITY     = 0.7         # Jaccard on normalized headline tokens
+MIN_SHARED     = 4           # short headlines need this many tokens in common too
+WINDOW_HOURS   = 24          # how far back the history index looks
+
+_PRIME = (1 << 61) - 1
+_rng   = random.Random(20240501)                 # fixed: band keys must match across processes
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_ROWS  = NUM_PERM // BANDS
+
+STOPWORDS = set("""
+a an the of to in on for and or at by with is are as its it from after be this that
+inc corp corporation co ltd plc company stock stocks share shares today
+""".split())
+
+# direction words (after headline_tokens normalization); headlines whose
+# sets of directions differ are never duplicates
+POSITIVE = set("""
+beat beaten up rise rose risen gain gained surge surged soar soared jump jumped rally rallie
+rallied climb climbed upgrade upgraded raise raised higher top topped approve approved approval
+win won profit record boost boosted exceed exceeded
+""".split())
+NEGATIVE = set("""
+miss misse missed down fall fell fallen drop dropped decline declined plunge plunged sink sank
+slump slumped tumble tumbled downgrade downgraded cut lower lowered reject rejected rejection
+lose lost loss halt halted warn warning sue lawsuit delay delayed fail failed
+""".split())
+
+def _h64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+def headline_tokens(title: str) -> frozenset:
+    """Normalized token set of a feed title ("HEADLINE - Outlet")."""
+    head, sep, _outlet = (title or "").rpartition(" - ")
+    text = (head if sep else title or "").lower().replace("'s", "")
+    out = set()
+    for tok in re.findall(r"[a-z0-9]+(?:\.\d+)?", text):
+        tok = re.sub(r"\.0+$", "", tok)                  # 5.0 → 5
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]                               # soars → soar
+        if tok not in STOPWORDS:
+            out.add(tok)
+    return frozenset(out)
+
+def jaccard(a, b) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def polarity(tokens) -> frozenset:
+    return frozenset(("+" if tokens & POSITIVE else "") + ("-" if tokens & NEGATIVE else ""))
+
+def similar(a, b, similarity: float = SIMILARITY) -> bool:
+    """Same story: enough overlap, and no conflict in direction words."""
+    return (len(a & b) >= MIN_SHARED and jaccard(a, b) >= similarity
+            and polarity(a) == polarity(b))
+
+def minhash(tokens) -> list:
+    hashes = [_h64(t) for t in tokens] or [0]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+def band_keys(signature) -> list:
+    """One signed 64-bit key per band (fits an SQLite INTEGER)."""
+    keys = []
+    for i in range(BANDS):
+        chunk = ",".join(map(str, signature[i * _ROWS:(i + 1) * _ROWS]))
+        keys.append(_h64(f"{i}:{chunk}") - (1 << 63))
+    return keys
+
+# ── Within a cycle ────────────────────────────────────────────────────────────
+@dataclass
+class Cluster:
+    rep:       dict                        # article that gets scored
+    members:   list = field(default_factory=list)    # all articles, rep included
+    tokens:    frozenset = frozenset()
+    known_url: str = None                  # set when a recent duplicate was already scored
+
+def cluster(articles, similarity: float = SIMILARITY) -> list:
+    """
+    Group near-duplicate articles (feed dicts with a 'title'), keeping
+    input order; the first article of each group (the newest, as the feed
+    is sorted) is its representative.
+    """
+    clusters, buckets = [], {}
+    for art in articles:
+        tokens = headline_tokens(art.get("title", ""))
+        keys = band_keys(minhash(tokens)) if tokens else []
+        match = None
+        for key in keys:
+            for c in buckets.get(key, ()):
+                if similar(tokens, c.tokens, similarity):
+                    match = c
+                    break
+            if match:
+                break
+        if match is None:
+            match = Cluster(rep=art, tokens=tokens)
+            clusters.append(match)
+            for key in keys:
+                buckets.setdefault(key, []).append(match)
+        match.members.append(art)
+    return clusters
+
+# ── Across cycles ─────────────────────────────────────────────────────────────
+class HeadlineIndex:
+    """Recently scored representative headlines, shared through SQLite."""
+
+    def __init__(self, db_file: str, window_hours: float = WINDOW_HOURS,
+                 similarity: float = SIMILARITY):
+        self.db_file      = db_file
+        self.window       = timedelta(hours=window_hours)
+        self.similarity   = similarity
+        conn = sqlite3.connect(db_file)
+        conn.executescript("""
+          CREATE TABLE IF NOT EXISTS headline_index (
+            id        INTEGER PRIMARY KEY AUTOINCREMENT,
+            url       TEXT    NOT NULL,
+            ticker    TEXT,
+            tokens    TEXT    NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+          );
+          CREATE TABLE IF NOT EXISTS headline_bands (
+            band_key  INTEGER NOT NULL,
+            headline  INTEGER NOT NULL
+          );
+          CREATE INDEX IF NOT EXISTS idx_headline_bands_key ON headline_bands (band_key);
+          CREATE INDEX IF NOT EXISTS idx_headline_index_ts ON headline_index (timestamp);
+        """)
+        conn.close()
+
+    def _cutoff(self, now=None) -> str:
+        # timestamps are SQLite CURRENT_TIMESTAMP (UTC)
+        return ((now or datetime.utcnow()) - self.window).strftime("%Y-%m-%d %H:%M:%S")
+
+    def lookup(self, tokens, now=None):
+        """URL of the most similar recent representative at/above the threshold, or None."""
+        if not tokens:
+            return None
+        keys = band_keys(minhash(tokens))
+        conn = sqlite3.connect(self.db_file)
+        rows = conn.execute(f"""
+            SELECT DISTINCT h.id, h.url, h.tokens FROM headline_bands b
+            JOIN headline_index h ON h.id = b.headline
+            WHERE b.band_key IN ({','.join('?' * len(keys))}) AND h.timestamp >= ?
+            ORDER BY h.id DESC
+        """, (*keys, self._cutoff(now))).fetchall()
+        conn.close()
+        best, best_sim = None, 0.0
+        for _id, url, stored in rows:            # newest first, so ties keep the newest
+            stored = frozenset(stored.split())
+            sim = jaccard(tokens, stored)
+            if similar(tokens, stored, self.similarity) and sim > best_sim:
+                best, best_sim = url, sim
+        return best
+
+    def add(self, tokens, url: str, ticker: str = None):
+        if not tokens:
+            return
+        conn = sqlite3.connect(self.db_file)
+        cur = conn.execute("INSERT INTO headline_index (url, ticker, tokens) VALUES (?, ?, ?)",
+                           (url, ticker, " ".join(sorted(tokens))))
+        conn.executemany("INSERT INTO headline_bands (band_key, headline) VALUES (?, ?)",
+                         [(k, cur.lastrowid) for k in band_keys(minhash(tokens))])
+        conn.commit()
+        conn.close()
+
+    def resolve(self, clusters, now=None) -> list:
+        """Fill known_url on clusters whose story was scored within the window."""
+        for c in clusters:
+            c.known_url = self.lookup(c.tokens, now)
+        return clusters
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_index(db_file: str) -> HeadlineIndex:
+    """Process-wide HeadlineIndex per database (tables created on first use)."""
+    with _indexes_lock:
+        if db_file not in _indexes:
+            _indexes[db_file] = HeadlineIndex(db_file)
+        return _indexes[db_file]
+
+def prune_index(conn, cutoff: str) -> int:
+    """Delete index rows older than cutoff (UTC 'YYYY-MM-DD HH:MM:SS'); caller commits."""
+    conn.execute("DELETE FROM headline_bands WHERE headline IN "
+                 "(SELECT id FROM headline_index WHERE timestamp < ?)", (cutoff,))
+    return conn.execute("DELETE FROM headline_index WHERE timestamp < ?", (cutoff,)).rowcount
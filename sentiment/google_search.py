@@ -14,6 +14,9 @@ import urllib.parse
 from time import mktime
 from datetime import datetime, timedelta
 
+import metrics
+
+@metrics.timed("feed_fetch")
 def fetch_google_news_feed_sorted(query, max_results=10, minutes_back=15):
     q = urllib.parse.quote(query)
     feed_url = f"https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
@@ -13,10 +13,10 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 if not openai.api_key:
     raise RuntimeError("Please set OPENAI_API_KEY in your .env file")
 
-def estimate_sentiment(text: str) -> tuple[float, str]:
+def estimate_sentiment_scores(text: str) -> dict:
     """
     Classify the given financial text as Positive/Neutral/Negative
-    with probabilities. Returns (best_prob, best_label).
+    with probabilities. Returns {"positive": p, "neutral": p, "negative": p}.
     Uses gpt-4o-mini via OpenAI ChatCompletion.
     """
     system_prompt = (
@@ -33,6 +33,7 @@ def estimate_sentiment(text: str) -> tuple[float, str]:
         model="gpt-4o-mini",
         temperature=0.01,
         max_tokens=150,
+        request_timeout=20,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user",   "content": user_prompt},
@@ -54,7 +55,11 @@ def estimate_sentiment(text: str) -> tuple[float, str]:
     total = sum(sentiment.values())
     if abs(total - 1.0) > 1e-3:
         raise ValueError(f"Probabilities must sum to 1. Got {total}")
+    return {k: sentiment[k] for k in ("positive", "neutral", "negative")}
 
+def estimate_sentiment(text: str) -> tuple[float, str]:
+    """Returns (best_prob, best_label)."""
+    sentiment  = estimate_sentiment_scores(text)
     best_label = max(sentiment, key=sentiment.get)
     best_prob  = sentiment[best_label]
     return best_prob, best_label
@@ -17,6 +17,7 @@ if not API_KEY:
 # Dartmouth endpoints
 _JWT_URL  = "https://api.dartmouth.edu/api/jwt"
 _CHAT_URL = "https://api.dartmouth.edu/api/ai/tgi/codellama-13b-instruct-hf/v1/chat/completions"
+_TIMEOUT  = (5, 20)     # (connect, read) seconds; a hung endpoint must not hold a worker
 
 # module-level cache for JWT
 _jwt_token      = None
@@ -32,7 +33,7 @@ def _get_jwt() -> str:
     if _jwt_token and now < _jwt_expires_at - 300:
         return _jwt_token
 
-    resp = requests.post(_JWT_URL, headers={"Authorization": API_KEY})
+    resp = requests.post(_JWT_URL, headers={"Authorization": API_KEY}, timeout=_TIMEOUT)
     resp.raise_for_status()
     data = resp.json()
     token = data.get("jwt")
@@ -42,10 +43,10 @@ def _get_jwt() -> str:
     _jwt_expires_at = now + 3600
     return token
 
-def estimate_sentiment(text: str) -> tuple[float, str]:
+def estimate_sentiment_scores(text: str) -> dict:
     """
     Classify the given financial text as Positive/Neutral/Negative
-    with probabilities. Returns (best_prob, best_label).
+    with probabilities. Returns {"positive": p, "neutral": p, "negative": p}.
     """
     jwt = _get_jwt()
 
@@ -73,7 +74,7 @@ def estimate_sentiment(text: str) -> tuple[float, str]:
         "Content-Type":  "application/json"
     }
 
-    resp = requests.post(_CHAT_URL, json=payload, headers=headers)
+    resp = requests.post(_CHAT_URL, json=payload, headers=headers, timeout=_TIMEOUT)
     if not resp.ok:
         print(f"ERROR {resp.status_code}: {resp.text}")
         resp.raise_for_status()
@@ -90,7 +91,11 @@ def estimate_sentiment(text: str) -> tuple[float, str]:
         if k not in sentiment:
             raise KeyError(f"Missing '{k}' in model output: {sentiment}")
         sentiment[k] = float(sentiment[k])
+    return {k: sentiment[k] for k in ("positive", "neutral", "negative")}
 
+def estimate_sentiment(text: str) -> tuple[float, str]:
+    """Returns (best_prob, best_label)."""
+    sentiment  = estimate_sentiment_scores(text)
     best_label = max(sentiment, key=sentiment.get)
     best_prob  = sentiment[best_label]
     return best_prob, best_label
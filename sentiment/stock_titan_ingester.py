@@ -0,0 +1,291 @@
+"""Incremental StockTitan live-feed ingester.
+
+Each poll revalidates the live page (a conditional GET through the HTTP
+cache, so an unchanged feed costs a 304) and keeps only the updates newer
+than the stored cursor: the last-seen update id, with its publish time as
+the fallback once that id has scrolled off the page. New articles are
+downloaded concurrently on an asyncio loop, at most PER_HOST_LIMIT at a
+time per host, and each one is scored as soon as it lands. Its text goes
+through the shared scorer ensemble (stock_news_analyzer.run_text_analysis),
+the vectors are stored per mentioned ticker, and every ticker is
+re-aggregated and passed to apply_ticker_score, as in the Google News sweep.
+
+`python sentiment/stock_titan_ingester.py [--once] [--poll SECONDS]`
+Returns:
+    ingest_once() -> {"new": n, "scored": n, "failed": n}
+"""
+
+import time
+import asyncio
+import sqlite3
+import argparse
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+import requests
+
+from stock_titan_scraper import fetch_live_blog_updates, scrape_and_extract, store_results
+from stock_news_analyzer import (
+    init_url_cache,
+    run_text_analysis,
+    has_url_been_analyzed,
+    mark_url_as_analyzed,
+    apply_ticker_score,
+    record_article_sentiment,
+    clean_ticker,
+    start_sentiment_pool,
+    stop_sentiment_pool,
+    TITLE_PENALTY_FACTOR,
+    TRADE_DB_FILE
+)
+from sentiment_scores import save_article_scores, rescore_ticker
+from columnar_sink import get_sink
+import metrics
+from log_config import setup_logging
+
+# ── CONFIG ────────────────────────────────────────────────────────────────
+LIVE_URL          = "https://www.stocktitan.net/news/live.html"
+FEED              = "stock_titan"
+POLL_SECONDS      = 30
+PER_HOST_LIMIT    = 4      # concurrent article downloads per host
+SCORE_LIMIT       = 2      # articles inside the scorer ensemble at once
+INITIAL_BACKFILL  = 20     # updates taken on the very first poll (no cursor yet)
+MAX_FETCH_TRIES   = 3      # polls an update may fail before the cursor moves past it
+AGGREGATE_MINUTES = 120    # stored articles a ticker is re-aggregated over
+
+# ── Cursor ────────────────────────────────────────────────────────────────
+def init_cursor_table(db_file=TRADE_DB_FILE):
+    conn = sqlite3.connect(db_file)
+    conn.execute("""
+      CREATE TABLE IF NOT EXISTS feed_cursors (
+        feed        TEXT    PRIMARY KEY,
+        last_id     TEXT,
+        published   TEXT,
+        updated_at  DATETIME DEFAULT CURRENT_TIMESTAMP
+      );
+    """)
+    conn.execute("""
+      CREATE TABLE IF NOT EXISTS feed_failures (
+        feed        TEXT    NOT NULL,
+        update_id   TEXT    NOT NULL,
+        attempts    INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (feed, update_id)
+      );
+    """)
+    conn.commit()
+    conn.close()
+
+def record_failure(db_file, uid, feed=FEED) -> int:
+    """Count one more failed fetch of an update; returns its attempts so far."""
+    conn = sqlite3.connect(db_file)
+    conn.execute("""
+        INSERT INTO feed_failures (feed, update_id, attempts) VALUES (?, ?, 1)
+        ON CONFLICT(feed, update_id) DO UPDATE SET attempts = attempts + 1;
+    """, (feed, uid))
+    attempts = conn.execute("SELECT attempts FROM feed_failures WHERE feed = ? AND update_id = ?",
+                            (feed, uid)).fetchone()[0]
+    conn.commit()
+    conn.close()
+    return attempts
+
+def clear_failures(db_file, uids, feed=FEED):
+    conn = sqlite3.connect(db_file)
+    conn.executemany("DELETE FROM feed_failures WHERE feed = ? AND update_id = ?",
+                     [(feed, uid) for uid in uids])
+    conn.commit()
+    conn.close()
+
+def load_cursor(db_file=TRADE_DB_FILE, feed=FEED):
+    """(last_id, published) of the newest update already ingested, or (None, None)."""
+    conn = sqlite3.connect(db_file)
+    row = conn.execute("SELECT last_id, published FROM feed_cursors WHERE feed = ?",
+                       (feed,)).fetchone()
+    conn.close()
+    return row if row else (None, None)
+
+def save_cursor(db_file, last_id, published, feed=FEED):
+    conn = sqlite3.connect(db_file)
+    conn.execute("""
+        INSERT INTO feed_cursors (feed, last_id, published)
+        VALUES (?, ?, ?)
+        ON CONFLICT(feed) DO UPDATE
+          SET last_id    = excluded.last_id,
+              published  = excluded.published,
+              updated_at = CURRENT_TIMESTAMP;
+    """, (feed, last_id, published))
+    conn.commit()
+    conn.close()
+
+def update_id(update) -> str:
+    return update.get("@id") or update.get("url")
+
+def published_utc(update):
+    """datePublished as a naive UTC ISO string (what recency weighting expects), or None."""
+    raw = update.get("datePublished")
+    if not raw:
+        return None
+    try:
+        ts = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts.isoformat(timespec="seconds")
+
+def new_updates(updates, last_id=None, last_published=None, backfill: int = INITIAL_BACKFILL):
+    """Updates newer than the cursor, oldest first."""
+    # newest first; undated updates keep their feed order at the end
+    updates = sorted((u for u in updates if u.get("url")),
+                     key=lambda u: published_utc(u) or "", reverse=True)
+    fresh = []
+    for u in updates:
+        if last_id is not None and update_id(u) == last_id:
+            return fresh[::-1]
+        fresh.append(u)
+    if last_published is not None:
+        # the cursor id scrolled off the page: fall back to publish time
+        fresh = [u for u in fresh if (published_utc(u) or "") > last_published]
+    elif last_id is None:
+        fresh = fresh[:backfill]
+    return fresh[::-1]
+
+# ── Scoring ───────────────────────────────────────────────────────────────
+def score_article(url, text, tickers, source, published=None, db_file=TRADE_DB_FILE):
+    """Score one fetched update through the shared ensemble; returns the symbols re-aggregated."""
+    if has_url_been_analyzed(db_file, url):
+        metrics.incr("url_cache_hits")
+        return []
+    res = run_text_analysis(url, text, used_fallback=(source == "title"))
+    if not res:
+        return []
+
+    prob, label, used_fallback, vectors = res
+    published = published or datetime.utcnow().isoformat(timespec="seconds")
+    symbols = sorted({clean_ticker(t) for t in tickers})
+    for sym in symbols:
+        # article_scores is keyed by URL: one row per ticker for multi-ticker releases
+        key = url if len(symbols) == 1 else f"{url}#{sym}"
+        save_article_scores(db_file, key, sym, vectors,
+                            source=urlparse(url).netloc or None,
+                            published=published,
+                            confidence=TITLE_PENALTY_FACTOR if used_fallback else 1.0)
+    mark_url_as_analyzed(db_file, url, prob, label)
+    store_results(url, text, tickers, {"label": label, "score": prob}, source)
+    for sym in symbols:
+        record_article_sentiment(sym, prob, label, published)
+
+    since = (datetime.utcnow() - timedelta(minutes=AGGREGATE_MINUTES)).isoformat(timespec="seconds")
+    for sym in symbols:
+        scored = rescore_ticker(db_file, sym, since=since)
+        if scored:
+            apply_ticker_score(sym, *scored)
+    return symbols
+
+# ── Async fetch ───────────────────────────────────────────────────────────
+class HostLimiter:
+    """One asyncio.Semaphore per host, created on first use (within one event loop)."""
+
+    def __init__(self, per_host: int = PER_HOST_LIMIT):
+        self.per_host = per_host
+        self._sems    = {}
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self._sems:
+            self._sems[host] = asyncio.Semaphore(self.per_host)
+        return self._sems[host]
+
+async def _process(update, hosts, score_slots, stats, db_file) -> bool:
+    """False when the article couldn't be fetched (so it is retried next poll)."""
+    url = update["url"]
+    async with hosts(url):
+        text, tickers, source = await asyncio.to_thread(scrape_and_extract, url)
+    if text is None:
+        # fetch failed; already logged inside scrape_and_extract
+        stats["failed"] += 1
+        metrics.incr("stock_titan_failures")
+        return False
+    if not text or not tickers:
+        print(f"   → {url}: no {'text' if not text else 'tickers'}, skipping sentiment.")
+        return True
+    async with score_slots:
+        symbols = await asyncio.to_thread(score_article, url, text, tickers, source,
+                                          published_utc(update), db_file)
+    if symbols:
+        stats["scored"] += 1
+        print(f"   ✔ {url} → {', '.join(symbols)} ({source})")
+    return True
+
+async def ingest(db_file=TRADE_DB_FILE, live_url=LIVE_URL) -> dict:
+    """
+    One poll: fetch and score every update past the cursor, then advance it
+    up to (not past) the oldest update whose fetch failed, so it is retried
+    next poll; after MAX_FETCH_TRIES failed polls it is given up on.
+    """
+    init_cursor_table(db_file)
+    last_id, last_published = load_cursor(db_file)
+    try:
+        updates = await asyncio.to_thread(fetch_live_blog_updates, live_url)
+    except requests.RequestException as e:
+        print(f"✖ Failed to fetch StockTitan live feed: {e}")
+        return {"new": 0, "scored": 0, "failed": 0}
+
+    fresh = new_updates(updates, last_id, last_published)
+    stats = {"new": len(fresh), "scored": 0, "failed": 0}
+    if not fresh:
+        return stats
+
+    hosts, score_slots = HostLimiter(PER_HOST_LIMIT), asyncio.Semaphore(SCORE_LIMIT)
+    with metrics.timer("stock_titan_batch"):
+        results = await asyncio.gather(*(_process(u, hosts, score_slots, stats, db_file)
+                                         for u in fresh), return_exceptions=True)
+    done = None                          # newest update the cursor may move to
+    for update, res in zip(fresh, results):  # oldest first
+        if isinstance(res, Exception):
+            stats["failed"] += 1
+            metrics.incr("stock_titan_failures")
+            print(f"   ✖ {update['url']}: {res}")
+        if res is True:
+            done = update
+            continue
+        if record_failure(db_file, update_id(update)) < MAX_FETCH_TRIES:
+            break
+        print(f"   ✖ giving up on {update['url']} after {MAX_FETCH_TRIES} polls")
+        done = update
+    if done is not None:
+        passed = fresh[:fresh.index(done) + 1]
+        clear_failures(db_file, [update_id(u) for u in passed])
+        save_cursor(db_file, update_id(done), published_utc(done))
+    get_sink("articles").flush()
+    metrics.incr("stock_titan_updates", stats["new"])
+    print(f"📡 StockTitan: {stats['new']} new, {stats['scored']} scored, {stats['failed']} failed.")
+    return stats
+
+def ingest_once(db_file=TRADE_DB_FILE) -> dict:
+    """Blocking single poll (what the scheduler job runs)."""
+    return asyncio.run(ingest(db_file))
+
+async def run_forever(poll_seconds: float = POLL_SECONDS, db_file=TRADE_DB_FILE):
+    while True:
+        started = time.monotonic()
+        await ingest(db_file)
+        await asyncio.sleep(max(poll_seconds - (time.monotonic() - started), 0))
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser("StockTitan live-feed ingester")
+    ap.add_argument("--once", action="store_true", help="poll once and exit")
+    ap.add_argument("--poll", type=float, default=POLL_SECONDS, help="seconds between polls")
+    args = ap.parse_args()
+
+    setup_logging()
+    start_sentiment_pool()
+    init_url_cache(TRADE_DB_FILE)
+    try:
+        if args.once:
+            ingest_once()
+        else:
+            asyncio.run(run_forever(args.poll))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_sentiment_pool()
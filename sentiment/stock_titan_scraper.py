@@ -1,31 +1,28 @@
 import time
 import requests
-from bs4 import BeautifulSoup
 import re
-import csv
-import json
 from finbert_utils import estimate_sentiment
+from columnar_sink import get_sink
+import http_cache
+from html_parsing import parse, ld_json
+from symbol_index import get_symbol_index
 # from llama_utils import estimate_sentiment
 
+ARTICLE_MAX_AGE = 6 * 3600    # news pages rarely change once published
+
 def fetch_live_blog_updates(url):
     headers = {'User-Agent': 'Mozilla/5.0'}
-    response = requests.get(url, headers=headers)
+    response = http_cache.get(url, headers=headers, timeout=10)
     response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
-    
-    json_scripts = soup.find_all("script", type="application/ld+json")
     updates = []
-    for script in json_scripts:
-        try:
-            data = json.loads(script.string)
-            if isinstance(data, list):
-                for item in data:
-                    if item.get("@type") == "LiveBlogPosting" and "liveBlogUpdate" in item:
-                        updates.extend(item["liveBlogUpdate"])
-            elif isinstance(data, dict) and data.get("@type") == "LiveBlogPosting":
-                updates.extend(data.get("liveBlogUpdate", []))
-        except Exception:
-            continue
+    for data in ld_json(response.text):
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and item.get("@type") == "LiveBlogPosting" \
+                        and "liveBlogUpdate" in item:
+                    updates.extend(item["liveBlogUpdate"])
+        elif isinstance(data, dict) and data.get("@type") == "LiveBlogPosting":
+            updates.extend(data.get("liveBlogUpdate", []))
     return updates
 
 def scrape_and_extract(url):
@@ -37,34 +34,40 @@ def scrape_and_extract(url):
     """
     headers = {'User-Agent': 'Mozilla/5.0'}
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = http_cache.get(url, headers=headers, timeout=10, max_age=ARTICLE_MAX_AGE)
         resp.raise_for_status()
     except requests.RequestException as e:
         print(f"    ✖ Failed to fetch {url!r}: {e}")
         return None, None, None
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    doc = parse(resp.text)
 
     # Try summary
-    summary_div = soup.find("div", {"id": "summary", "lang": "en"})
+    summary_div = doc.select_one('div#summary[lang="en"]')
     if summary_div:
-        text = summary_div.get_text(separator=" ", strip=True)
+        text = summary_div.text()
         source = "summary"
     else:
         # fallback → use page <title>
-        title = soup.title.string if soup.title else ""
-        text = title.strip()
+        text = doc.title().strip()
         source = "title"
 
     # extract tickers from the chosen text
     tickers = re.findall(r'\b(?:TSX|NYSE|NASDAQ):\s?[A-Z]{1,5}\b', text)
     tickers = [t.replace(" ", "") for t in tickers]
+    # companies named without an exchange prefix, from the symbol master
+    listed = {t.split(":")[-1] for t in tickers}
+    tickers += [t for t in get_symbol_index().tag(text) if t not in listed]
     return text, tickers, source
 
 def store_results(url, text, tickers, sentiment, source):
-    with open('scraped_data.csv', 'a', newline='', encoding='utf-8') as f:
-        w = csv.writer(f)
-        w.writerow([url, source, text, ",".join(tickers), sentiment['label'], sentiment['score']])
+    # one row per mentioned ticker so the ticker partitions stay queryable
+    sink = get_sink("articles")
+    for ticker in tickers or [None]:
+        sink.append(ticker=ticker.split(":")[-1] if ticker else None,
+                    url=url, source=source, text=text, tickers=",".join(tickers),
+                    sentiment=sentiment['label'], probability=float(sentiment['score']),
+                    scraper="stock_titan")
 
 def run_pipeline():
     live_update_url = "https://www.stocktitan.net/news/live.html"
@@ -99,5 +102,7 @@ def run_pipeline():
         # polite
         time.sleep(2)
 
+    get_sink("articles").flush()
+
 if __name__ == "__main__":
     run_pipeline()
\ No newline at end of file
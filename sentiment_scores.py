@@ -0,0 +1,161 @@
+"""Full per-model sentiment vectors: storage and ticker aggregation.
+
+Every scored article keeps one [positive, neutral, negative] row per model
+in `article_scores` (a float32 BLOB of shape (n_models, 3) plus the model
+names), so ticker decisions can be recomputed from stored vectors without
+calling the models again.
+
+Ticker aggregation is a NumPy reduction over an (articles × models × 3)
+stack, weighted per model (MODEL_WEIGHTS), per source (SOURCE_WEIGHTS),
+by recency (half-life RECENCY_HALF_LIFE_MIN) and by a per-article
+confidence factor (the title-fallback penalty). score_summary() turns the
+result back into the (probability, label) pair the trade rule uses.
+"""
+
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+LABELS                = ("positive", "neutral", "negative")
+MODEL_WEIGHTS         = {"finbert": 1.0, "llama": 1.0, "gpt": 1.0}
+SOURCE_WEIGHTS        = {}          # e.g. {"tipranks.com": 1.2}; unknown sources weigh 1
+RECENCY_HALF_LIFE_MIN = 60.0
+
+# ── Vectors ───────────────────────────────────────────────────────────────────
+def to_vector(scores) -> np.ndarray:
+    """{"positive": p, ...} (or a (prob, label) pair) → float32 [pos, neu, neg]."""
+    if isinstance(scores, dict):
+        return np.array([float(scores.get(k, 0.0)) for k in LABELS], dtype=np.float32)
+    prob, label = scores
+    rest = (1.0 - prob) / 2
+    return np.array([prob if k == label.lower() else rest for k in LABELS], dtype=np.float32)
+
+def score_summary(vector):
+    """Best label and its probability for one [pos, neu, neg] vector."""
+    i = int(np.argmax(vector))
+    return float(vector[i]), LABELS[i]
+
+def pack(matrix) -> bytes:
+    return np.ascontiguousarray(matrix, dtype=np.float32).tobytes()
+
+def unpack(blob: bytes, n_models: int) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float32).reshape(n_models, len(LABELS))
+
+# ── Storage ───────────────────────────────────────────────────────────────────
+def init_scores_table(db_file):
+    conn = sqlite3.connect(db_file)
+    conn.execute("""
+      CREATE TABLE IF NOT EXISTS article_scores (
+        url           TEXT    PRIMARY KEY,
+        ticker        TEXT,
+        source        TEXT,
+        published     TEXT,
+        models        TEXT,
+        scores        BLOB,
+        confidence    REAL    DEFAULT 1.0,
+        timestamp     DATETIME DEFAULT CURRENT_TIMESTAMP
+      );
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_article_scores_ticker ON article_scores (ticker, published)")
+    conn.commit()
+    conn.close()
+
+def save_article_scores(db_file, url, ticker, vectors: dict, source=None, published=None,
+                        confidence: float = 1.0):
+    """vectors: {model: {"positive": p, ...}} for the models that answered."""
+    models = list(vectors)
+    matrix = np.stack([to_vector(vectors[m]) for m in models]) if models \
+             else np.zeros((0, len(LABELS)), dtype=np.float32)
+    conn = sqlite3.connect(db_file)
+    conn.execute("""
+      INSERT OR REPLACE INTO article_scores (url, ticker, source, published, models, scores, confidence)
+      VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (url, ticker, source, published, ",".join(models), pack(matrix), confidence))
+    conn.commit()
+    conn.close()
+
+def load_article_scores(db_file, urls=None, ticker=None, since=None):
+    """Rows as dicts with a (n_models, 3) 'matrix'; filter by urls, ticker and/or published >= since."""
+    sql, args = "SELECT url, ticker, source, published, models, scores, confidence FROM article_scores", []
+    where = []
+    if urls is not None:
+        urls = list(urls)
+        if not urls:
+            return []
+        where.append(f"url IN ({','.join('?' * len(urls))})")
+        args += urls
+    if ticker is not None:
+        where.append("ticker = ?")
+        args.append(ticker)
+    if since is not None:
+        where.append("published >= ?")
+        args.append(since)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute(sql, args).fetchall()
+    conn.close()
+    out = []
+    for url, tkr, source, published, models, blob, confidence in rows:
+        names = models.split(",") if models else []
+        out.append({"url": url, "ticker": tkr, "source": source, "published": published,
+                    "models": names, "matrix": unpack(blob, len(names)),
+                    "confidence": confidence if confidence is not None else 1.0})
+    return out
+
+# ── Aggregation ───────────────────────────────────────────────────────────────
+def recency_weights(published, now: datetime = None, half_life_min: float = RECENCY_HALF_LIFE_MIN):
+    """0.5^(age / half_life) per article; unknown publish times weigh 1."""
+    now = now or datetime.utcnow()
+    ages = []
+    for p in published:
+        try:
+            ages.append(max((now - datetime.fromisoformat(p)).total_seconds() / 60, 0.0))
+        except (TypeError, ValueError):
+            ages.append(0.0)
+    return np.power(0.5, np.asarray(ages, dtype=np.float64) / half_life_min)
+
+def source_weights(sources, table=None):
+    table = SOURCE_WEIGHTS if table is None else table
+    return np.array([table.get(s, 1.0) for s in sources], dtype=np.float64)
+
+def aggregate(rows, now: datetime = None, model_weights=None, weighting=("recency", "source")):
+    """
+    Weighted [pos, neu, neg] for a ticker from load_article_scores() rows.
+    Articles are first reduced over their models (missing models carry no
+    weight), then over articles; each article's vector is scaled by its
+    confidence, so a penalised title-only article lowers the final prob.
+    Returns None if no article has any model output.
+    """
+    model_weights = MODEL_WEIGHTS if model_weights is None else model_weights
+    rows = [r for r in rows if len(r["models"])]
+    if not rows:
+        return None
+    models = sorted({m for r in rows for m in r["models"]})
+    col = {m: i for i, m in enumerate(models)}
+
+    stack = np.zeros((len(rows), len(models), len(LABELS)), dtype=np.float64)
+    present = np.zeros((len(rows), len(models)), dtype=np.float64)
+    for i, r in enumerate(rows):
+        idx = [col[m] for m in r["models"]]
+        stack[i, idx] = r["matrix"]
+        present[i, idx] = 1.0
+
+    mw = present * np.array([model_weights.get(m, 1.0) for m in models])
+    per_article = np.einsum("am,aml->al", mw, stack) / mw.sum(axis=1, keepdims=True)
+    per_article *= np.array([r["confidence"] for r in rows])[:, None]
+
+    w = np.ones(len(rows))
+    if "recency" in weighting:
+        w *= recency_weights([r["published"] for r in rows], now)
+    if "source" in weighting:
+        w *= source_weights([r["source"] for r in rows])
+    if w.sum() <= 0:
+        w = np.ones(len(rows))
+    return (w[:, None] * per_article).sum(axis=0) / w.sum()
+
+def rescore_ticker(db_file, ticker, since=None, now: datetime = None, **kwargs):
+    """Recompute a ticker's (prob, label) from stored vectors; None if nothing stored."""
+    vector = aggregate(load_article_scores(db_file, ticker=ticker, since=since), now, **kwargs)
+    return None if vector is None else score_summary(vector)
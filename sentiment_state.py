@@ -0,0 +1,188 @@
+"""Rolling, time-decayed sentiment per ticker.
+
+Each newly scored, qualifying article adds its probability to its
+ticker's exponentially decayed sum (half-life HALF_LIFE_MIN), dated at
+its publish time, so a ticker with fresh, repeated good news outranks one
+whose single good article is hours old.
+
+Decay is applied lazily. Every ticker keeps a time-invariant log key
+    key = ln(score at t) + λ·(t − EPOCH)
+which never changes while no new news arrives, and orders tickers the
+same way their current scores do at any moment. Tickers live in a sorted
+container on that key (sortedcontainers when installed, else a bisect-
+maintained list), so updates are O(log n) and top_k() is O(k).
+
+State survives restarts as a JSON snapshot plus an append-only update log
+(one JSON line per update), replayed on load and folded into a fresh
+snapshot every COMPACT_EVERY updates.
+"""
+
+import os
+import json
+import math
+import time
+import bisect
+import threading
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:
+    SortedList = None
+
+HALF_LIFE_MIN   = 30.0
+STATE_FILE      = os.environ.get("SENTIMENT_STATE_FILE", "sentiment_state.json")
+STATE_LOG       = os.environ.get("SENTIMENT_STATE_LOG", "sentiment_state.log")
+COMPACT_EVERY   = 1000
+PRUNE_BELOW     = 1e-3          # drop tickers decayed below this at compaction
+EPOCH           = 1_700_000_000  # keeps λ·(t − EPOCH) small
+
+class _BisectList:
+    """The bit of SortedList we use, on a plain list."""
+
+    def __init__(self):
+        self._items = []
+
+    def add(self, item):
+        bisect.insort(self._items, item)
+
+    def remove(self, item):
+        i = bisect.bisect_left(self._items, item)
+        if i == len(self._items) or self._items[i] != item:
+            raise ValueError(f"{item!r} not in list")
+        del self._items[i]
+
+    def __getitem__(self, i):
+        return self._items[i]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+class SentimentState:
+    def __init__(self, half_life_min: float = HALF_LIFE_MIN,
+                 path: str = STATE_FILE, log_path: str = STATE_LOG):
+        self.rate     = math.log(2) / (half_life_min * 60)
+        self.path     = path
+        self.log_path = log_path
+        self.tickers  = {}      # ticker -> {"key", "count", "last_update"}
+        self._order   = SortedList() if SortedList is not None else _BisectList()
+        self._pending = 0       # log lines since the last snapshot
+        self._lock    = threading.RLock()
+
+    # ── updates ───────────────────────────────────────────────────────────────
+    def _apply(self, ticker: str, prob: float, ts: float):
+        if prob <= 0:
+            return
+        contribution = math.log(prob) + self.rate * (ts - EPOCH)
+        entry = self.tickers.get(ticker)
+        if entry is None:
+            entry = self.tickers[ticker] = {"key": contribution, "count": 0, "last_update": ts}
+        else:
+            self._order.remove((-entry["key"], ticker))
+            hi, lo = max(entry["key"], contribution), min(entry["key"], contribution)
+            entry["key"] = hi + math.log1p(math.exp(lo - hi))     # log(e^a + e^b)
+        entry["count"] += 1
+        entry["last_update"] = max(entry["last_update"], ts)
+        self._order.add((-entry["key"], ticker))
+
+    def update(self, ticker: str, prob: float, ts: float = None, persist: bool = True):
+        """Add prob (at time ts, default now) to ticker's decayed score."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._apply(ticker, prob, ts)
+            if persist and self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"t": ticker, "p": prob, "ts": ts}) + "\n")
+                self._pending += 1
+                if self._pending >= COMPACT_EVERY:
+                    self.compact()
+
+    # ── reads ─────────────────────────────────────────────────────────────────
+    def _score(self, key: float, now: float) -> float:
+        return math.exp(key - self.rate * (now - EPOCH))
+
+    def score(self, ticker: str, now: float = None) -> float:
+        with self._lock:
+            entry = self.tickers.get(ticker)
+            return 0.0 if entry is None else self._score(entry["key"], time.time() if now is None else now)
+
+    def get(self, ticker: str, now: float = None):
+        with self._lock:
+            entry = self.tickers.get(ticker)
+            if entry is None:
+                return None
+            now = time.time() if now is None else now
+            return {"score": self._score(entry["key"], now), "count": entry["count"],
+                    "last_update": entry["last_update"]}
+
+    def top_k(self, k: int, now: float = None, min_score: float = 0.0, exclude=()):
+        """[(ticker, current score)] highest first, stopping below min_score."""
+        now = time.time() if now is None else now
+        out = []
+        with self._lock:
+            for neg_key, ticker in self._order:
+                score = self._score(-neg_key, now)
+                if score < min_score or len(out) >= k:
+                    break
+                if ticker not in exclude:
+                    out.append((ticker, score))
+        return out
+
+    def __len__(self):
+        return len(self.tickers)
+
+    # ── persistence ───────────────────────────────────────────────────────────
+    def load(self):
+        """Snapshot, then replay any logged updates written after it."""
+        with self._lock:
+            if self.path and os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    snap = json.load(f)
+                old_rate = snap.get("rate", self.rate)
+                for ticker, entry in snap.get("tickers", {}).items():
+                    entry = dict(entry)
+                    if old_rate != self.rate:       # half-life changed: re-key at last update
+                        age = entry["last_update"] - EPOCH
+                        entry["key"] += (self.rate - old_rate) * age
+                    self.tickers[ticker] = entry
+                    self._order.add((-entry["key"], ticker))
+            if self.log_path and os.path.exists(self.log_path):
+                with open(self.log_path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                        except ValueError:
+                            continue        # torn last line after a crash
+                        self._apply(rec["t"], rec["p"], rec["ts"])
+                        self._pending += 1
+        return self
+
+    def compact(self, now: float = None):
+        """Write a fresh snapshot (dropping fully decayed tickers) and truncate the log."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for ticker, entry in list(self.tickers.items()):
+                if self._score(entry["key"], now) < PRUNE_BELOW:
+                    self._order.remove((-entry["key"], ticker))
+                    del self.tickers[ticker]
+            if self.path:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"rate": self.rate, "epoch": EPOCH, "tickers": self.tickers}, f)
+                os.replace(tmp, self.path)
+            if self.log_path:
+                open(self.log_path, "w").close()
+            self._pending = 0
+
+_state = None
+_state_lock = threading.Lock()
+
+def get_state() -> SentimentState:
+    """Process-wide state, loaded from STATE_FILE / STATE_LOG on first use."""
+    global _state
+    with _state_lock:
+        if _state is None:
+            _state = SentimentState().load()
+        return _state
@@ -1,13 +1,32 @@
+import os
+import time
 import sqlite3
+import multiprocessing
 import requests
+from datetime import datetime, timezone
+from urllib.parse import urlparse
 from googlenewsdecoder import gnewsdecoder
 from tradingview_gainers_scraper import run_scraper_pipeline
 from sentiment.google_search import fetch_google_news_feed_sorted
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from sentiment.dedup import cluster, get_index
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from article_sentiment import extract_main_content
-from finbert_utils import estimate_sentiment as finbert_sentiment
-from llama_utils import estimate_sentiment as llama_sentiment
-from gpt_utils import estimate_sentiment as gpt_sentiment
+from finbert_utils import estimate_sentiment_scores as finbert_sentiment
+from llama_utils import estimate_sentiment_scores as llama_sentiment
+from gpt_utils import estimate_sentiment_scores as gpt_sentiment
+import metrics
+import resilience
+from ensemble import run_ensemble, mean_vector
+from sentiment_scores import (init_scores_table, save_article_scores, load_article_scores,
+                              aggregate, score_summary, to_vector)
+from log_config import get_logger, setup_logging
+from sentiment_state import get_state
+from trade_history import record_candidate
+from columnar_sink import get_sink
+from symbol_index import get_symbol_index
+
+log = get_logger("stock_news_analyzer")
 
 DB_FILE           = "gainers.db"
 TRADE_DB_FILE     = "potential_trades.db"
@@ -16,6 +35,17 @@ minutes_back      = 20
 max_news          = 1
 MAX_WORKERS       = 100
 TITLE_PENALTY_FACTOR = 0.85
+SENTIMENT_PROCESSES = int(os.environ.get("SENTIMENT_PROCESSES", "0"))   # 0 = score in-thread
+# (pooled workers send their metrics and breaker outcomes back with each result)
+ENSEMBLE_MODE     = os.environ.get("ENSEMBLE_MODE", "full")   # "full" | "cascade" (stop once decided)
+FINBERT_INPUT     = os.environ.get("FINBERT_INPUT", "summary")  # "summary" | "document" (headline + body)
+
+# ensemble members, cheapest first; each returns {"positive": p, "neutral": p, "negative": p}
+SCORERS = (
+    ("finbert", finbert_sentiment),
+    ("llama",   llama_sentiment),
+    ("gpt",     gpt_sentiment),
+)
 
 def init_url_cache(db_file=TRADE_DB_FILE):
     conn = sqlite3.connect(db_file)
@@ -28,8 +58,10 @@ def init_url_cache(db_file=TRADE_DB_FILE):
         timestamp   DATETIME DEFAULT CURRENT_TIMESTAMP
       );
     """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_analyzed_urls_ts ON analyzed_urls (timestamp)")
     conn.commit()
     conn.close()
+    init_scores_table(db_file)
 
 def has_url_been_analyzed(db_file, url):
     conn = sqlite3.connect(db_file)
@@ -47,6 +79,7 @@ def get_cached_sentiment(db_file, url):
     conn.close()
     return (row[0], row[1]) if row else None
 
+@metrics.timed("db_write", table="analyzed_urls")
 def mark_url_as_analyzed(db_file, url, probability, sentiment):
     conn = sqlite3.connect(db_file)
     c = conn.cursor()
@@ -70,67 +103,174 @@ def get_latest_gainers():
 
 def resolve_actual_url(google_news_url):
     try:
-        status = gnewsdecoder(google_news_url)
-        print(f"[↪️] Decoded URL found: {status['decoded_url']}")
+        with metrics.timer("url_decode"):
+            status = gnewsdecoder(google_news_url)
+        log.debug("Decoded URL", extra={"url": status['decoded_url'], "stage": "url_decode"})
         return status['decoded_url']
     except Exception as e:
-        print(f"[ERROR] Failed to resolve article URL: {e}")
+        log.error("Failed to resolve article URL: %s", e,
+                  extra={"url": google_news_url, "stage": "url_decode"})
         return google_news_url
 
 def analyze_article(url, fallback_text=None):
-    print(f"[INFO] Extracting and summarizing article: {url}")
+    started = time.perf_counter()
+    ctx = {"url": url, "stage": "extract"}
+    log.debug("Extracting and summarizing article", extra=ctx)
     content = extract_main_content(url)
     used_fallback = False
+    document = None
 
     if content is None:
         if fallback_text:
-            print("[WARN] Content extraction failed. Using fallback title.")
+            log.warning("Content extraction failed; using fallback title.", extra=ctx)
             summary = fallback_text.strip()
             used_fallback = True
         else:
-            print("[WARN] Content extraction failed and no fallback provided.")
+            log.warning("Content extraction failed and no fallback provided.", extra=ctx)
             return None
     else:
         summary = content.get("summary", "").strip()
+        if FINBERT_INPUT == "document" and content.get("body_text"):
+            # FinBERT picks its own bounded set of relevant windows from the full text
+            document = "\n".join(filter(None, [content.get("headline"), content["body_text"]]))
         if not summary:
             if fallback_text:
-                print("[WARN] No summary extracted. Using fallback title.")
+                log.warning("No summary extracted; using fallback title.", extra=ctx)
                 summary = fallback_text.strip()
                 used_fallback = True
             else:
-                print("[WARN] No summary extracted and no fallback provided.")
+                log.warning("No summary extracted and no fallback provided.", extra=ctx)
                 return None
 
     if not summary:
-        print("[WARN] Summary (or fallback) is empty.")
+        log.warning("Summary (or fallback) is empty.", extra=ctx)
         return None
 
-    results = []
-    for fn in (finbert_sentiment, llama_sentiment, gpt_sentiment):
+    return analyze_text(url, summary, document=document, used_fallback=used_fallback, started=started)
+
+def analyze_text(url, summary, document=None, used_fallback=False, started=None):
+    """
+    Run the scorer ensemble over already-extracted text; returns
+    (avg_prob, label, used_fallback, vectors) or None.
+    """
+    started = started or time.perf_counter()
+
+    def score_one(name, fn):
+        if resilience.is_open(name):
+            log.debug("Skipping scorer with open circuit", extra={"url": url, "model": name})
+            return None
+        text = document if name == "finbert" and document else summary
         try:
-            prob, sentiment = fn(summary)
-            results.append((prob, sentiment))
+            with metrics.timer("sentiment", model=name):
+                return resilience.call(name, fn, text)
         except Exception as e:
-            print(f"[ERROR] Sentiment estimation failed: {e}")
+            log.error("Sentiment estimation failed: %s", e,
+                      extra={"url": url, "stage": "sentiment", "model": name})
+            return None
 
-    if not results:
-        print("[WARN] No sentiment functions succeeded.")
+    penalty = TITLE_PENALTY_FACTOR if used_fallback else 1.0
+    scored, skipped = run_ensemble(SCORERS, score_one, penalty, SENTIMENT_THRESHOLD,
+                                   cascade=(ENSEMBLE_MODE == "cascade"))
+    metrics.incr("ensemble_articles")
+    for name in skipped:
+        metrics.incr("ensemble_skips", model=name)
+    if skipped:
+        log.debug("Decision fixed; skipped %s", ", ".join(skipped), extra={"url": url, "stage": "sentiment"})
+    vectors = dict(scored)
+
+    if not vectors:
+        log.warning("No sentiment functions succeeded.", extra={"url": url, "stage": "sentiment"})
         return None
 
-    avg_prob = sum(p for p, _ in results) / len(results)
-    pos_count = sum(1 for _, s in results if s.lower() == "positive")
-    majority_sent = "positive" if pos_count >= 2 else "negative"
-
     if used_fallback:
-        print(f"[⚠️] Fallback used, applying penalty {TITLE_PENALTY_FACTOR:.2f}")
-        avg_prob *= TITLE_PENALTY_FACTOR
-
-    print(f"[INFO] Sentiment: {majority_sent} (avg prob: {avg_prob:.2f})")
-    return (avg_prob, majority_sent, used_fallback)
+        log.debug("Fallback used, applying penalty %.2f", TITLE_PENALTY_FACTOR, extra={"url": url})
+    # average the full label vectors, then read off the top label
+    avg_prob, label = score_summary(mean_vector(vectors.values()) * penalty)
+
+    log.info("Sentiment %s (avg prob %.2f)", label, avg_prob,
+             extra={"url": url, "stage": "sentiment", "prob": round(avg_prob, 4),
+                    "sentiment": label,
+                    "duration": round(time.perf_counter() - started, 3)})
+    return (avg_prob, label, used_fallback, vectors)
+
+# ── Process pool for extraction + scoring ─────────────────────────────────────
+_sentiment_pool = None
+
+def _init_sentiment_worker():
+    # the pool supplies the parallelism; one intra-op thread per worker avoids
+    # 16 processes each spinning up 16 torch threads
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+def _worker_ready():
+    return os.getpid()
+
+def start_sentiment_pool(processes: int = SENTIMENT_PROCESSES):
+    """
+    Fork `processes` workers that run analyze_article. Call this early, before
+    any other threads start: the models are already loaded at import, so the
+    forked workers share their weights copy-on-write instead of reloading them.
+    """
+    global _sentiment_pool
+    if processes <= 0 or _sentiment_pool is not None:
+        return _sentiment_pool
+    _sentiment_pool = ProcessPoolExecutor(max_workers=processes,
+                                          mp_context=multiprocessing.get_context("fork"),
+                                          initializer=_init_sentiment_worker)
+    # the fork context starts every worker on first submit; do it now
+    _sentiment_pool.submit(_worker_ready).result()
+    log.info("Started %d sentiment worker processes", processes, extra={"stage": "pool"})
+    return _sentiment_pool
+
+def stop_sentiment_pool():
+    global _sentiment_pool
+    if _sentiment_pool is not None:
+        _sentiment_pool.shutdown(wait=True, cancel_futures=True)
+        _sentiment_pool = None
+
+def _run_in_worker(fn, blocked, *args):
+    """Pool side: run fn, shipping its metrics and breaker outcomes back with the result."""
+    with metrics.capture() as recorded, resilience.delegated(blocked) as outcomes:
+        result = fn(*args)
+    return result, recorded.export(), outcomes
+
+def _pooled(fn, *args):
+    global _sentiment_pool
+    pool = _sentiment_pool
+    if pool is None:
+        return fn(*args)
+    try:
+        result, recorded, outcomes = pool.submit(_run_in_worker, fn, resilience.open_endpoints(),
+                                                 *args).result()
+        metrics.merge(recorded)
+        resilience.apply_outcomes(outcomes)
+        return result
+    except BrokenProcessPool as e:
+        # a worker died (OOM kill, segfault in a model). Re-forking now would
+        # copy a process full of threads, so score in-thread from here on.
+        if _sentiment_pool is pool:
+            _sentiment_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            metrics.incr("sentiment_pool_broken")
+            log.error("Sentiment pool broke (%s); scoring in-thread from now on", e,
+                      extra={"stage": "pool"})
+        return fn(*args)
+
+def run_analysis(url, fallback_text=None):
+    """analyze_article in a worker process when the pool is up, else in this thread."""
+    return _pooled(analyze_article, url, fallback_text)
+
+def run_text_analysis(url, text, used_fallback=False):
+    """analyze_text for text a scraper already pulled out, pooled like run_analysis."""
+    return _pooled(analyze_text, url, text, None, used_fallback)
 
 def clean_ticker(ticker: str) -> str:
     return ticker.split(":", 1)[-1].strip()
 
+@metrics.timed("db_write", table="trades")
 def save_trade_candidate(ticker: str, probability: float):
     clean = clean_ticker(ticker)
     conn  = sqlite3.connect(TRADE_DB_FILE)
@@ -143,6 +283,8 @@ def save_trade_candidate(ticker: str, probability: float):
             timestamp   DATETIME DEFAULT (DATETIME('now','localtime'))
         );
     """)
+    # covers run_trader's ORDER BY probability DESC LIMIT ? without touching the table
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_trades_prob ON trades (probability DESC, ticker)")
     cur.execute("""
         INSERT INTO trades (ticker, probability)
         VALUES (?, ?)
@@ -150,69 +292,156 @@ def save_trade_candidate(ticker: str, probability: float):
           SET probability = excluded.probability,
               timestamp   = CURRENT_TIMESTAMP;
     """, (clean, probability))
+    record_candidate(conn, TRADE_DB_FILE, clean, probability)
     conn.commit()
     conn.close()
-    print(f"[💾] Saved {clean} @ {probability:.2f}")
+    log.info("Saved %s @ %.2f", clean, probability,
+             extra={"ticker": clean, "stage": "save", "prob": round(probability, 4), "table": "trades"})
+
+def fetch_routed_news(row, universe=()):
+    """
+    Google News for one gainer, searched by its symbol-master name when known
+    (else the scraped company name) and split by the tickers each headline
+    names: {ticker: [articles]}, limited to this ticker and `universe`.
+    """
+    ticker = clean_ticker(row.get("ticker") or "")
+    index  = get_symbol_index()
+    query  = index.search_name(ticker) or row.get("company_name")
+    if not query:
+        return {}
+    news = fetch_google_news_feed_sorted(
+        query,
+        max_results = max_news,
+        minutes_back= minutes_back
+    )
+    return index.route(news, ticker, universe, query=query)
 
 def fetch_news_for_company(row):
     company = row.get("company_name")
     ticker  = row.get("ticker")
     if not company:
         return (ticker, company, [])
-    news = fetch_google_news_feed_sorted(
-        company,
-        max_results = max_news,
-        minutes_back= minutes_back
-    )
+    news = fetch_routed_news(row).get(clean_ticker(ticker), [])
     return (ticker, company, news)
 
-def process_articles_for_ticker(ticker: str, articles: list):
+def published_ts(published) -> float:
+    """Epoch seconds for a naive-UTC ISO publish time (now if missing, bad or in the future)."""
+    now = time.time()
+    try:
+        return min(datetime.fromisoformat(published).replace(tzinfo=timezone.utc).timestamp(), now)
+    except (TypeError, ValueError):
+        return now
+
+def record_article_sentiment(ticker: str, prob: float, label: str, published=None):
+    """Add one newly scored article to the ticker's rolling score, at its publish time."""
+    if label == "positive" and prob >= SENTIMENT_THRESHOLD:
+        get_state().update(clean_ticker(ticker), prob, ts=published_ts(published))
+
+def score_ticker(ticker: str, articles: list, on_scored=None):
+    """
+    Score a ticker's articles and aggregate their stored label vectors
+    (weighted by recency, source and model); returns (prob, label) or None.
+    Each article scored for the first time is passed to
+    on_scored(ticker, prob, label, published) (default: record_article_sentiment);
+    cached and duplicate stories aren't, so nothing is counted twice.
+    """
+    on_scored = on_scored or record_article_sentiment
+
     def _analyze_one(art):
         raw_url = art.get("link")
         title   = art.get("title", "")
         url     = resolve_actual_url(raw_url)
 
         if has_url_been_analyzed(TRADE_DB_FILE, url):
-            prob, sent = get_cached_sentiment(TRADE_DB_FILE, url)
-            print(f"   ↳ [cache] {url}: {prob:.2f} {sent}")
-            return prob, sent
+            metrics.incr("url_cache_hits")
+            log.debug("Cache hit", extra={"ticker": ticker, "url": url, "stage": "url_cache"})
+            return url
 
-        res = analyze_article(url, fallback_text=title)
+        res = run_analysis(url, fallback_text=title)
         if not res:
             return None
 
-        prob, sent, _ = res
+        prob, sent, used_fallback, vectors = res
+        save_article_scores(TRADE_DB_FILE, url, clean_ticker(ticker), vectors,
+                            source=urlparse(url).netloc or None,
+                            published=art.get("published"),
+                            confidence=TITLE_PENALTY_FACTOR if used_fallback else 1.0)
         mark_url_as_analyzed(TRADE_DB_FILE, url, prob, sent)
-        return prob, sent
+        on_scored(ticker, prob, sent, art.get("published"))
+        return url
+
+    # near-duplicate headlines: score one representative per story, and
+    # none at all when the story was already scored in a recent cycle
+    index    = get_index(TRADE_DB_FILE)
+    clusters = index.resolve(cluster(articles))
+    todo     = [c for c in clusters if c.known_url is None]
+    skipped  = len(articles) - len(todo)
+    if skipped:
+        metrics.incr("headline_dupes", skipped)
+        log.info("%s: %d articles → %d stories, %d to score", ticker, len(articles),
+                 len(clusters), len(todo), extra={"ticker": ticker, "stage": "dedup"})
+
+    def _analyze_story(c):
+        # representative first; if it can't be decoded or extracted, the next member stands in
+        for art in [c.rep] + [m for m in c.members if m is not c.rep]:
+            url = _analyze_one(art)
+            if url:
+                return url
+        return None
 
-    probs = []
-    sentiments = []
+    url_of = {id(c): c.known_url for c in clusters if c.known_url}
     with ThreadPoolExecutor(max_workers=8) as exe:
-        futures = {exe.submit(_analyze_one, art): art for art in articles}
+        futures = {exe.submit(metrics.bind(_analyze_story), c): c for c in todo}
         for fut in as_completed(futures):
-            result = fut.result()
-            if result:
-                prob, sent = result
-                probs.append(prob)
-                sentiments.append(sent)
-
-    if not probs:
-        print(f"[INFO] {ticker} no usable sentiment data.")
-        return
-
-    avg_prob = sum(probs) / len(probs)
-    pos_count = sum(1 for s in sentiments if s.lower() == "positive")
-    majority_sent = "positive" if pos_count >= 2 else "negative"
-
-    print(f"[INFO] {ticker}: averaged prob = {avg_prob:.2f}, sentiment = {majority_sent}")
-
-    if avg_prob >= SENTIMENT_THRESHOLD and majority_sent == "positive":
+            url = fut.result()
+            if url:
+                url_of[id(futures[fut])] = url
+                index.add(futures[fut].tokens, url, clean_ticker(ticker))
+
+    urls = set(url_of.values())
+    rows = load_article_scores(TRADE_DB_FILE, urls=urls)
+    # URLs cached before vectors were stored only have (prob, label)
+    for url in urls - {r["url"] for r in rows}:
+        cached = get_cached_sentiment(TRADE_DB_FILE, url)
+        if cached:
+            rows.append({"url": url, "source": None, "published": None, "models": ["cached"],
+                         "matrix": to_vector(cached)[None, :], "confidence": 1.0})
+
+    # every member of a story carries its representative's vectors at its own publish time
+    by_url = {r["url"]: r for r in rows}
+    rows = [dict(by_url[url_of[id(c)]], published=art.get("published"))
+            for c in clusters if url_of.get(id(c)) in by_url
+            for art in c.members]
+
+    vector = aggregate(rows)
+    if vector is None:
+        log.info("%s no usable sentiment data.", ticker, extra={"ticker": ticker, "stage": "aggregate"})
+        return None
+    return score_summary(vector)
+
+def apply_ticker_score(ticker: str, avg_prob: float, majority_sent: str):
+    """Save the ticker as a trade candidate if its score clears the bar (idempotent upsert)."""
+    log.info("%s: averaged prob = %.2f, sentiment = %s", ticker, avg_prob, majority_sent,
+             extra={"ticker": ticker, "stage": "aggregate", "prob": round(avg_prob, 4),
+                    "sentiment": majority_sent})
+
+    saved = avg_prob >= SENTIMENT_THRESHOLD and majority_sent == "positive"
+    get_sink("decisions").append(ticker=clean_ticker(ticker), probability=float(avg_prob),
+                                 sentiment=majority_sent, saved=saved)
+    if saved:
         save_trade_candidate(ticker, avg_prob)
     else:
-        print(f"[INFO] {ticker} did not meet sentiment requirements "
-              f"({avg_prob:.2f}, sentiment: {majority_sent})")
+        log.info("%s did not meet sentiment requirements (%.2f, sentiment: %s)",
+                 ticker, avg_prob, majority_sent, extra={"ticker": ticker, "stage": "aggregate"})
+
+def process_articles_for_ticker(ticker: str, articles: list):
+    scored = score_ticker(ticker, articles)
+    if scored:
+        apply_ticker_score(ticker, *scored)
 
 if __name__ == "__main__":
+    setup_logging()
+    start_sentiment_pool()
     init_url_cache(TRADE_DB_FILE)
 
     print("🔄 Running TradingView scraper...")
@@ -0,0 +1,61 @@
+"""Pure strategy rules shared by the live trader and the backtester.
+
+Indicators, risk-based sizing and the split-exit price levels. Nothing in
+here talks to Alpaca or TwelveData.
+"""
+
+import numpy as np
+setattr(np, "NaN", np.nan)
+import pandas_ta as ta
+
+# ── Indicators ────────────────────────────────────────────────────────────────
+def compute_indicators(df):
+    df['vwap']   = ta.vwap(df['high'], df['low'], df['close'], df['volume'])
+    df['ema5']   = ta.ema(df['close'], length=5)
+    df['rsi14']  = ta.rsi(df['close'], length=14)
+    return df
+
+def trail_ema(close, ema_len: int = 5):
+    """EMA used by the trailing half of the split exit."""
+    return ta.ema(close, length=ema_len)
+
+# ── Sizing ────────────────────────────────────────────────────────────────────
+def shares_for_risk(cash: float,
+                    entry_price: float,
+                    risk_pct: float = 0.02,
+                    stop_pct: float = 0.02
+                   ) -> int:
+    """
+    Number of shares such that a stop-out at stop_pct below entry loses
+    no more than risk_pct of cash.
+    """
+    risk_amount = cash * risk_pct
+    if risk_amount < 1:
+        return 0
+    share_risk = entry_price * stop_pct
+    if share_risk <= 0:
+        return 0
+    qty = int(risk_amount / share_risk)
+    return max(qty, 0)
+
+# ── Split exit ────────────────────────────────────────────────────────────────
+def exit_levels(entry_price: float,
+                stop_pct: float = 0.02,
+                rr: float       = 2.0):
+    """Returns (hard stop, rr× limit target) for a filled entry."""
+    stop_price   = round(entry_price * (1 - stop_pct), 2)
+    target_price = round(entry_price * (1 + stop_pct * rr), 2)
+    return stop_price, target_price
+
+def split_qty(qty: int):
+    """Returns (limit-sell half, trailing half)."""
+    half_qty = qty // 2
+    return half_qty, qty - half_qty
+
+def trail_exit_reason(last_px: float, ema_val: float, stop_price: float):
+    """'EMA' or 'STOP' if the trailing half should be sold now, else None."""
+    if last_px < ema_val:
+        return "EMA"
+    if last_px < stop_price:
+        return "STOP"
+    return None
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Parallel parameter sweep over the backtester.
+
+Takes a parameter grid ({param: [values, …]} over backtest.DEFAULT_PARAMS
+keys), replays the same bars + sentiment dataset for every combination
+across a process pool and collects one summary row per combination.
+
+Bars are packed once into shared memory; workers attach to the block and
+rebuild their DataFrames from it instead of receiving pickled copies.
+Indicators are computed once per worker, and prepared signals are reused
+for every combination that only changes sizing / sentiment parameters.
+Returns:
+    DataFrame of params + trades, pnl, return_pct, hit_rate, max_drawdown
+"""
+
+import json
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import backtest
+from strategy import compute_indicators
+
+BAR_FIELDS = ["open", "high", "low", "close", "volume"]
+# params that change prepare_symbol's output; the rest only affect the replay
+SIGNAL_PARAMS = ("vol_mult", "pb_pct", "rsi_max", "ema_len")
+
+# ── Grid helpers ──────────────────────────────────────────────────────────────
+def load_grid(spec: str) -> dict:
+    """Grid from a JSON file path or an inline JSON object."""
+    if os.path.exists(spec):
+        with open(spec, encoding="utf-8") as f:
+            grid = json.load(f)
+    else:
+        grid = json.loads(spec)
+    unknown = set(grid) - set(backtest.DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    return {k: v if isinstance(v, list) else [v] for k, v in grid.items()}
+
+def expand_grid(grid: dict) -> list:
+    """Cartesian product of the grid, ordered so equal signal params are adjacent."""
+    keys = list(grid)
+    combos = [dict(zip(keys, vals)) for vals in itertools.product(*grid.values())]
+    return sorted(combos, key=lambda c: tuple(str(c.get(k)) for k in SIGNAL_PARAMS))
+
+# ── Shared-memory bar store ───────────────────────────────────────────────────
+def pack_bars(bars: dict):
+    """
+    Copy every symbol's bars into two shared blocks (float64 OHLCV rows and
+    int64 UTC-ns timestamps). Returns (blocks, meta); meta is the small,
+    picklable description workers need to attach.
+    """
+    symbols = [s for s, df in bars.items() if len(df)]
+    lengths = [len(bars[s]) for s in symbols]
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(int).tolist()
+    total   = offsets[-1]
+
+    values_shm = shared_memory.SharedMemory(create=True, size=max(total * len(BAR_FIELDS) * 8, 1))
+    ts_shm     = shared_memory.SharedMemory(create=True, size=max(total * 8, 1))
+    values = np.ndarray((total, len(BAR_FIELDS)), dtype=np.float64, buffer=values_shm.buf)
+    ts     = np.ndarray((total,), dtype=np.int64, buffer=ts_shm.buf)
+    for s, lo, hi in zip(symbols, offsets[:-1], offsets[1:]):
+        df = bars[s]
+        values[lo:hi] = df[BAR_FIELDS].to_numpy(dtype=np.float64)
+        ts[lo:hi]     = df.index.asi8
+
+    meta = {
+        "values":  values_shm.name,
+        "ts":      ts_shm.name,
+        "rows":    total,
+        "symbols": symbols,
+        "offsets": offsets,
+    }
+    return (values_shm, ts_shm), meta
+
+def _attach(name: str):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def attach_bars(meta: dict):
+    """Rebuild {symbol: DataFrame} on top of the shared blocks."""
+    # the parent owns (and unlinks) the blocks. Pool workers share its
+    # resource tracker, where attaching re-registers an already-tracked name
+    # (a no-op); unregistering here would remove the parent's entry and make
+    # its unlink() fail in the tracker, so workers leave tracking alone.
+    values_shm = _attach(meta["values"])
+    ts_shm     = _attach(meta["ts"])
+    values = np.ndarray((meta["rows"], len(BAR_FIELDS)), dtype=np.float64, buffer=values_shm.buf)
+    ts     = np.ndarray((meta["rows"],), dtype=np.int64, buffer=ts_shm.buf)
+
+    bars = {}
+    for s, lo, hi in zip(meta["symbols"], meta["offsets"][:-1], meta["offsets"][1:]):
+        idx = pd.to_datetime(ts[lo:hi], utc=True).tz_convert(backtest.TZ_NY)
+        bars[s] = pd.DataFrame(values[lo:hi], index=idx, columns=BAR_FIELDS, copy=False)
+    return (values_shm, ts_shm), bars
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+_worker = {}
+
+def _init_worker(meta: dict, sentiment: pd.DataFrame):
+    blocks, bars = attach_bars(meta)
+    _worker["blocks"]     = blocks
+    _worker["bars"]       = bars
+    _worker["indicators"] = {s: compute_indicators(df.copy()) for s, df in bars.items()}
+    _worker["sentiment"]  = sentiment
+    _worker["prepared"]   = (None, None)
+
+def _run_combo(combo: dict) -> dict:
+    params = dict(backtest.DEFAULT_PARAMS)
+    params.update(combo)
+
+    key = tuple(params[k] for k in SIGNAL_PARAMS)
+    cached_key, prepared = _worker["prepared"]
+    if cached_key != key:
+        prepared = {s: backtest.prepare_symbol(_worker["bars"][s], params, indicators=ind)
+                    for s, ind in _worker["indicators"].items()}
+        _worker["prepared"] = (key, prepared)
+
+    result = backtest.run_backtest(_worker["bars"], _worker["sentiment"], params, prepared=prepared)
+    row = dict(combo)
+    row.update(result.summary())
+    return row
+
+# ── Driver ────────────────────────────────────────────────────────────────────
+def run_sweep(bars: dict, sentiment: pd.DataFrame, grid: dict, workers: int = None) -> pd.DataFrame:
+    combos = expand_grid(grid)
+    workers = workers or os.cpu_count() or 1
+    blocks, meta = pack_bars(bars)
+    try:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(meta, sentiment)) as exe:
+            chunk = max(1, len(combos) // (workers * 4))
+            rows = list(exe.map(_run_combo, combos, chunksize=chunk))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    table = pd.DataFrame(rows)
+    return table.sort_values("pnl", ascending=False).reset_index(drop=True)
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser("Parallel parameter sweep over the backtester")
+    ap.add_argument("--bars-dir", required=True,
+                    help="Directory of <SYMBOL>.csv minute bars")
+    ap.add_argument("--sentiment", default=backtest.TRADE_DB_FILE,
+                    help="Sentiment records (.csv) or trades DB (.db)")
+    ap.add_argument("--grid", required=True,
+                    help='JSON file or inline JSON, e.g. \'{"rr": [1.5, 2, 3], "ema_len": [5, 9]}\'')
+    ap.add_argument("--workers", type=int, default=None,
+                    help="Worker processes (default: all cores)")
+    ap.add_argument("--out", default="sweep_results.csv",
+                    help="Where to write the results table")
+    args = ap.parse_args()
+
+    grid = load_grid(args.grid)
+    bars = backtest.load_bars_csv(args.bars_dir)
+    sentiment = (backtest.load_sentiment_db(args.sentiment)
+                 if args.sentiment.endswith(".db")
+                 else backtest.load_sentiment_csv(args.sentiment))
+
+    n = len(expand_grid(grid))
+    print(f"→ Sweeping {n} combinations over {len(bars)} symbols…")
+    table = run_sweep(bars, sentiment, grid, workers=args.workers)
+    table.to_csv(args.out, index=False)
+    print(f"→ wrote {len(table)} rows to {args.out}. Top 5 by PnL:")
+    print(table.head().to_string(index=False))
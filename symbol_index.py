@@ -0,0 +1,329 @@
+"""Local symbol master and one-pass ticker tagging for news text.
+
+refresh_symbols(api) pulls the active US equities from Alpaca
+(api.list_assets) into the `symbols` table: ticker, exchange, listed name,
+and the aliases news actually uses for the company. For "Nuvve Holding
+Corp. Common Stock" those are "nuvve holding corp" and "nuvve":
+share-class text, then legal and holding-company suffixes, are dropped. Warrants, units, rights
+and preferreds keep their row but contribute no aliases, so they never
+shadow the common stock.
+
+SymbolIndex.tag(text) finds every ticker a text names in one pass:
+    - explicit forms via regex: "NASDAQ: ACME", "NYSE:ACME", "$ACME", and
+      "(ACME)" only for tickers the caller expects ("(EPS)" is not EPS)
+    - company aliases via an Aho–Corasick automaton over the case-folded,
+      punctuation-free text, matched on word boundaries, leftmost-longest
+Only tickers present in the master count, and single-word aliases that
+are everyday words ("target", "block") are left out.
+
+route() splits a ticker's search results by the tickers each headline
+names: articles naming other gainers go to them as well, instead of
+costing another search, and an article only leaves the searched ticker
+when it explicitly names a different listed company and not this one.
+Returns:
+    tag(text) -> [tickers in order of first mention]; route(articles, default) -> {ticker: [articles]}
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+import metrics
+
+SYMBOL_DB = os.environ.get("SYMBOL_DB", "potential_trades.db")
+
+# listed-name tails that describe the security, not the company
+SHARE_CLASS_RE = re.compile(
+    r"\b(?:class [a-z]\b|common stock|common shares|ordinary shares|subordinate voting|"
+    r"american depositary|depositary shares|each representing|new york registry|"
+    r"shares of beneficial interest|\(the\)).*$", re.IGNORECASE)
+# securities that share the issuer's name with its common stock
+DERIVATIVE_RE = re.compile(r"\b(?:warrants?|units?|rights?|preferred|notes due|debentures|"
+                           r"depositary shares representing)\b", re.IGNORECASE)
+LEGAL_SUFFIXES = set("""
+inc incorporated corp corporation co company ltd limited plc llc lp l p sa s a nv n v ag se
+the holdings holding group trust
+""".split())
+# single-word aliases that are everyday (or everyday-finance) words
+GENERIC_WORDS = set("""
+target block shift visa general first united american national international global energy
+capital bank health one new best live match snap ford gap progressive alliance discovery
+pioneer insight vital premier summit genesis frontier liberty apex core edge open clear
+""".split())
+MIN_ALIAS_CHARS = 4
+
+EXPLICIT_RE = re.compile(
+    r"\b(?:NASDAQ|NYSE(?:\s?American|\s?Arca|\s?MKT)?|AMEX|TSX(?:V)?|OTC(?:QB|QX)?|CBOE)\s?:\s?"
+    r"([A-Z]{1,5}(?:\.[A-Z])?)\b"
+    r"|\$([A-Z]{1,5})\b"
+    r"|\(\s*([A-Z]{3,5})\s*\)")          # bare "(AI)", "(IT)" are too often not tickers
+
+def normalize_text(text: str) -> str:
+    """Case-folded words separated by single spaces, padded so aliases match on word boundaries."""
+    return " " + " ".join(re.findall(r"[a-z0-9]+", (text or "").lower())) + " "
+
+def name_aliases(name: str) -> list:
+    """Aliases news uses for a listed name, longest first."""
+    if not name or DERIVATIVE_RE.search(name):
+        return []
+    words = normalize_text(SHARE_CLASS_RE.sub("", name)).split()
+    full = " ".join(words)
+    while words and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    while words and words[0] == "the":
+        words.pop(0)
+    core = " ".join(words)
+    out = []
+    for alias in (full, core):
+        if len(alias) < MIN_ALIAS_CHARS or alias in out:
+            continue
+        if " " not in alias and alias in GENERIC_WORDS:
+            continue
+        out.append(alias)
+    return out
+
+# ── Aho–Corasick ──────────────────────────────────────────────────────────────
+class AhoCorasick:
+    """Multi-pattern matcher: every occurrence of every pattern in one scan of the text."""
+
+    def __init__(self):
+        self._goto  = [{}]
+        self._fail  = [0]
+        self._out   = [[]]        # (pattern length, value) ending at each state
+        self._built = False
+
+    def add(self, pattern: str, value):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), value))
+        self._built = False
+
+    def build(self):
+        """Breadth-first failure links; each state also reports its suffixes' outputs."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+        self._built = True
+        return self
+
+    def iter(self, text: str):
+        """Yield (start, end, value) for every match."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in out[state]:
+                yield i + 1 - length, i + 1, value
+
+    def __len__(self):
+        return len(self._goto)
+
+# ── Index ─────────────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Symbol:
+    ticker:   str
+    exchange: str
+    name:     str
+    aliases:  tuple = ()
+
+class SymbolIndex:
+    def __init__(self, symbols=()):
+        self.symbols  = {s.ticker: s for s in symbols}
+        self._by_name = {}
+        self._matcher = AhoCorasick()
+        for s in self.symbols.values():
+            for alias in s.aliases:
+                self._by_name.setdefault(alias, []).append(s.ticker)
+        for alias, tickers in self._by_name.items():
+            # padded: matches start and end on word boundaries of normalize_text output
+            self._matcher.add(f" {alias} ", tuple(tickers))
+        self._matcher.build()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def resolve(self, ref: str):
+        """Symbol for "NASDAQ:ACME", "$ACME", "ACME" or a company name; None if unknown."""
+        ref = (ref or "").strip()
+        if ":" in ref or ref.startswith("$") or ref.isupper():
+            sym = self.symbols.get(ref.split(":", 1)[-1].strip().lstrip("$"))
+            if sym is not None:
+                return sym
+        tickers = self._by_name.get(normalize_text(SHARE_CLASS_RE.sub("", ref)).strip())
+        return self.symbols[tickers[0]] if tickers and len(tickers) == 1 else None
+
+    def search_name(self, ticker: str):
+        """The company name to search news for (shortest alias), or None if not in the master."""
+        sym = self.resolve(ticker)
+        return sym.aliases[-1] if sym is not None and sym.aliases else None
+
+    def _hits(self, text: str, allowed=None) -> list:
+        """(position, ticker, explicit) for every mention, in text order."""
+        if not text or not self.symbols:
+            return []
+        hits = []
+        for m in EXPLICIT_RE.finditer(text):
+            prefixed, cashtag, bare = m.groups()
+            ticker = prefixed or cashtag or bare
+            if ticker not in self.symbols:
+                continue
+            # "(EPS)", "(USA)": a bare parenthesised symbol only counts for tickers we expect
+            if bare and (allowed is None or ticker not in allowed):
+                continue
+            hits.append((m.start(), ticker, True))
+
+        # leftmost-longest alias matches, so "american airlines group" beats "american airlines"
+        matches = sorted(self._matcher.iter(normalize_text(text)), key=lambda m: (m[0], -m[1]))
+        covered = -1
+        for start, end, tickers in matches:
+            if start + 1 < covered:         # the shared padding space may overlap
+                continue
+            covered = end
+            hits.extend((start, t, False) for t in tickers)
+        return sorted(hits, key=lambda h: h[0])
+
+    def tag(self, text: str, allowed=None) -> list:
+        """
+        Known tickers the text names, in order of first mention. Bare
+        "(ABC)" forms are only accepted for tickers in `allowed`.
+        """
+        out = []
+        for _, ticker, _explicit in self._hits(text, allowed):
+            if ticker not in out:
+                out.append(ticker)
+        return out
+
+    def mentions(self, text: str, ticker: str, query: str = None) -> bool:
+        """Does text name ticker by symbol, search query or the first word of one of its names?"""
+        norm = normalize_text(text)
+        sym = self.symbols.get(ticker)
+        names = [query] + list(sym.aliases if sym else ())
+        words = {f" {ticker.lower()} "}
+        for name in filter(None, names):
+            name = normalize_text(name).strip()
+            head = name.split(" ")[0] if name else ""
+            words.add(f" {name} ")
+            if len(head) >= MIN_ALIAS_CHARS and head not in GENERIC_WORDS:
+                words.add(f" {head} ")
+        return any(w in norm for w in words if w.strip())
+
+    def route(self, articles, default: str, universe=None, query: str = None) -> dict:
+        """
+        {ticker: [articles]} for one search's results. Every headline that
+        names other tickers in `universe` also goes to them. A headline stays
+        with `default` unless it names another company explicitly
+        ("NYSE: XYZ", "$XYZ") and mentions neither the default ticker, the
+        search query nor the company's name; alias matches of other
+        companies alone ("Meta taps Oracle") never move an article away.
+        """
+        universe = set(universe or ()) | {default}
+        routed = {}
+        for art in articles:
+            head, sep, _outlet = (art.get("title") or "").rpartition(" - ")
+            head = head if sep else art.get("title") or ""
+            hits = self._hits(head, allowed=universe)
+            targets = []
+            for _, ticker, _explicit in hits:
+                if ticker in universe and ticker not in targets:
+                    targets.append(ticker)
+            elsewhere = any(explicit and t not in universe for _, t, explicit in hits)
+            if default not in targets and (not elsewhere or self.mentions(head, default, query)):
+                targets.insert(0, default)
+            if not targets:
+                metrics.incr("news_misattributed")
+            for t in targets:
+                routed.setdefault(t, []).append(art)
+        return routed
+
+# ── Symbol master (SQLite) ────────────────────────────────────────────────────
+def init_symbols_table(db_file=SYMBOL_DB):
+    conn = sqlite3.connect(db_file)
+    conn.execute("""
+      CREATE TABLE IF NOT EXISTS symbols (
+        ticker      TEXT    PRIMARY KEY,
+        exchange    TEXT,
+        name        TEXT,
+        aliases     TEXT,
+        updated_at  DATETIME DEFAULT CURRENT_TIMESTAMP
+      );
+    """)
+    conn.commit()
+    conn.close()
+
+def build_symbols(assets) -> list:
+    """Symbols from Alpaca Asset objects (or dicts with symbol / exchange / name)."""
+    out = []
+    for a in assets:
+        get = a.get if isinstance(a, dict) else lambda k, d=None: getattr(a, k, d)
+        if not get("symbol") or get("tradable", True) is False:
+            continue
+        name = get("name") or ""
+        out.append(Symbol(get("symbol").upper(), get("exchange") or "", name, tuple(name_aliases(name))))
+    return out
+
+def save_symbols(symbols, db_file=SYMBOL_DB) -> int:
+    """Replace the master with `symbols`; returns the row count."""
+    init_symbols_table(db_file)
+    conn = sqlite3.connect(db_file)
+    conn.execute("DELETE FROM symbols")
+    conn.executemany("INSERT OR REPLACE INTO symbols (ticker, exchange, name, aliases) VALUES (?, ?, ?, ?)",
+                     [(s.ticker, s.exchange, s.name, "|".join(s.aliases)) for s in symbols])
+    conn.commit()
+    conn.close()
+    return len(symbols)
+
+def load_index(db_file=SYMBOL_DB) -> SymbolIndex:
+    init_symbols_table(db_file)
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute("SELECT ticker, exchange, name, aliases FROM symbols").fetchall()
+    conn.close()
+    return SymbolIndex(Symbol(t, e or "", n or "", tuple(a.split("|")) if a else ())
+                       for t, e, n, a in rows)
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_symbol_index(db_file=SYMBOL_DB) -> SymbolIndex:
+    """Process-wide index, loaded on first use (empty until the first refresh)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = load_index(db_file)
+        return _index
+
+def refresh_symbols(api, db_file=SYMBOL_DB) -> int:
+    """Rebuild the master from api.list_assets and swap in the new index."""
+    global _index
+    assets = api.list_assets(status="active", asset_class="us_equity")
+    count = save_symbols(build_symbols(assets), db_file)
+    index = load_index(db_file)
+    with _index_lock:
+        _index = index
+    print(f"🔤 Symbol master: {count} symbols, {len(index._by_name)} aliases.")
+    return count
+
+if __name__ == "__main__":
+    import sys
+    index = get_symbol_index()
+    text = " ".join(sys.argv[1:]) or sys.stdin.read()
+    print(index.tag(text))
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+import backtest
+from conftest import make_session
+
+
+def test_simulate_split_exit_target_and_trail():
+    # entry 100 → target 104, stop 98; rally through target then roll over
+    df = make_session("2024-01-03", [100, 101, 103, 105, 106, 104, 101, 99, 99, 99])
+    data = backtest.prepare_symbol(df, backtest.DEFAULT_PARAMS)
+    exits = backtest.simulate_split_exit(data, 0, 100.0, 10, backtest.DEFAULT_PARAMS)
+
+    target = [e for e in exits if e[3] == "target"][0]
+    assert target[1] == 5 and target[2] == pytest.approx(105.0)   # gapped through 104
+    trail = [e for e in exits if e[3] in ("EMA", "STOP")][0]
+    assert trail[1] == 5
+    assert trail[0] > target[0]
+
+
+def test_simulate_split_exit_flattens_at_session_end():
+    df = make_session("2024-01-03", [100, 101, 102, 103])
+    data = backtest.prepare_symbol(df, backtest.DEFAULT_PARAMS)
+    exits = backtest.simulate_split_exit(data, 0, 100.0, 4, backtest.DEFAULT_PARAMS)
+    assert [e[3] for e in exits] == ["eod", "eod"]
+    assert all(e[0] == 3 for e in exits)
+
+
+def test_run_backtest_enters_on_signal_with_sentiment():
+    yday  = make_session("2024-01-02", [50] * 30)
+    # 08:00-08:29 quiet at 50, then at 08:30 breaks yesterday's high on volume
+    today = make_session("2024-01-03", [50] * 30 + [51, 51.5, 53, 55, 55.5, 54, 52, 50],
+                         start="08:00")
+    today.loc[today.index[30], "volume"] = 1000.0
+    bars = {"ABC": pd.concat([yday, today])}
+    sentiment = backtest._normalize_sentiment(pd.DataFrame({
+        "timestamp":   ["2024-01-03 07:55"],
+        "ticker":      ["NASDAQ:ABC"],
+        "probability": [0.9],
+    }))
+
+    result = backtest.run_backtest(bars, sentiment)
+    assert len(result.trades) == 1
+    trade = result.trades.iloc[0]
+    assert trade["symbol"] == "ABC"
+    assert trade["entry_price"] == pytest.approx(51.5)
+    # sized off 2% risk / 2% stop on 100k cash, then capped by cash
+    assert trade["qty"] == min(int(100_000 * 0.02 / (51 * 0.02)), int(100_000 // 51.5))
+    assert result.summary()["trades"] == 1
+
+
+def test_run_backtest_ignores_sub_threshold_sentiment():
+    yday  = make_session("2024-01-02", [50] * 30)
+    today = make_session("2024-01-03", [50] * 30 + [51, 52, 53], start="08:00")
+    bars = {"ABC": pd.concat([yday, today])}
+    sentiment = backtest._normalize_sentiment(pd.DataFrame({
+        "timestamp":     ["2024-01-03 07:55"],
+        "ticker":        ["ABC"],
+        "probability":   [0.8],
+        "used_fallback": [True],        # 0.8 × 0.85 < 0.7
+    }))
+    assert backtest.run_backtest(bars, sentiment).trades.empty
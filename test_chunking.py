@@ -0,0 +1,46 @@
+from scraper import chunking
+
+ARTICLE = """Nuvve Holding ( (NVVE) ) has issued an update.
+On May 9, 2025, Nuvve Holding Corp. announced its engagement with digital asset advisory consultants.
+This strategic move aims to enhance the digital asset portfolio.
+The committee is chaired by a renowned crypto investor.
+Subscribe to our newsletter for more updates. All rights reserved.
+Nuvve Holding Corp. (NASDAQ: NVVE) is a global leader in vehicle-to-grid technology."""
+
+
+def encode(sentences):
+    """Word-level stand-in for the tokenizer: id = sentence * 100 + word."""
+    return [[i * 100 + j for j, _ in enumerate(s.split())] for i, s in enumerate(sentences)]
+
+
+def test_sentences_tickers_and_weights():
+    sentences = chunking.split_sentences(ARTICLE)
+    assert len(sentences) == 7 and sentences[4] == "Subscribe to our newsletter for more updates."
+    assert sentences[6].startswith("Nuvve Holding Corp. (NASDAQ: NVVE) is")
+    assert chunking.find_tickers(ARTICLE) == {"NVVE"}
+    w = chunking.sentence_weights(sentences, [len(ids) for ids in encode(sentences)])
+    assert w[0] == chunking.HEADLINE_WEIGHT + chunking.MENTION_BOOST
+    assert w[3] == chunking.LEAD_WEIGHT and w[6] == 1.0 + chunking.MENTION_BOOST
+    assert w[4] < 0.2 and w[5] < 0.2                    # boilerplate
+
+
+def test_plan_windows_keeps_relevant_sentences_within_budget():
+    sentences = chunking.split_sentences(ARTICLE)
+    ids = encode(sentences)
+    weights = chunking.sentence_weights(sentences, [len(x) for x in ids])
+    windows = chunking.plan_windows(ids, weights, max_tokens=20, max_windows=2)
+    assert len(windows) <= 2 and all(len(w) <= 20 for w, _ in windows)
+    kept = [[tok // 100 for tok in w] for w, _ in windows]
+    assert all(k == sorted(k) for k in kept)           # document order inside each window
+    kept = {i for k in kept for i in k}
+    # headline and ticker sentence always; boilerplate never
+    assert {0, 6} <= kept and not {4, 5} & kept
+    assert windows[0][1] > 0
+
+
+def test_over_long_sentence_is_split_and_budget_bounds_cost():
+    ids = [list(range(100)), list(range(5))]
+    windows = chunking.plan_windows(ids, [1.0, 3.0], max_tokens=30, max_windows=3)
+    # the 5-token relevant sentence first, then whatever pieces still fit
+    assert [len(w) for w, _ in windows] == [30, 30, 15]
+    assert windows[0][0] == list(range(0, 30)) and windows[-1][0] == list(range(90, 100)) + list(range(5))
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+import columnar_sink as cs
+
+TZ = "America/New_York"
+
+
+@pytest.fixture(params=["csv", "parquet", "ipc"])
+def fmt(request):
+    if request.param != "csv":
+        pytest.importorskip("pyarrow")
+    return request.param
+
+
+def test_partitioned_write_and_pruned_read(tmp_path, fmt):
+    sink = cs.ColumnarSink("decisions", root=str(tmp_path), fmt=fmt, flush_rows=1000)
+    for day, ticker, prob in [(3, "ABC", 0.8), (3, "XYZ", 0.6), (4, "ABC", 0.9), (5, "ABC", 0.7)]:
+        sink.append(ticker=ticker, probability=prob, sentiment="positive",
+                    timestamp=datetime(2025, 6, day, 10, 30))
+    assert len(sink) == 4
+    paths = sink.flush()
+    assert len(paths) == 4 and len(sink) == 0
+    assert any("date=2025-06-03" in p and "ticker=XYZ" in p for p in paths)
+
+    df = cs.read_dataset("decisions", str(tmp_path), start="2025-06-03", end="2025-06-04",
+                         tickers=["abc"], columns=["timestamp", "ticker", "probability"])
+    assert list(df["probability"]) == [0.8, 0.9]
+    assert str(df["timestamp"].dt.tz) == TZ and df["timestamp"][0].hour == 10
+    assert cs.read_dataset("decisions", str(tmp_path), tickers=["NOPE"]).empty
+
+
+def test_compact_merges_part_files(tmp_path, fmt):
+    sink = cs.ColumnarSink("articles", root=str(tmp_path), fmt=fmt)
+    for i in range(3):
+        sink.append(ticker="ABC", url=f"u{i}", probability=0.5 + i / 10,
+                    timestamp=datetime(2025, 6, 3, 9, i))
+        sink.flush()
+    sink.append(ticker=None, url="none", timestamp=datetime(2025, 6, 3, 9, 5))
+    sink.flush()
+    assert cs.compact("articles", "2025-06-03", str(tmp_path), fmt=fmt) == 2
+    assert len(cs.list_files("articles", str(tmp_path), tickers=["ABC"])) == 1
+    df = cs.read_dataset("articles", str(tmp_path))
+    assert list(df["url"]) == ["u0", "u1", "u2", "none"]
+
+
+def test_record_bars_only_appends_new_bars(tmp_path, monkeypatch):
+    monkeypatch.setattr(cs, "_last_bar", {})
+    sink = cs.ColumnarSink("bars", root=str(tmp_path), fmt="csv", flush_rows=1000)
+    idx = pd.date_range("2025-06-03 09:30", periods=5, freq="min", tz=TZ)
+    df = pd.DataFrame({c: range(5) for c in ("open", "high", "low", "close", "volume")},
+                      index=idx, dtype=float)
+    assert cs.record_bars("ABC", df.iloc[:3], sink) == 3
+    assert cs.record_bars("ABC", df, sink) == 2
+    assert cs.record_bars("ABC", df, sink) == 0
+    sink.flush()
+    out = cs.read_dataset("bars", str(tmp_path), tickers=["ABC"])
+    assert list(out["close"]) == [0, 1, 2, 3, 4]
+
+
+def test_record_bars_resumes_from_stored_history_after_a_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(cs, "_last_bar", {})
+    idx = pd.date_range("2025-06-03 09:30", periods=5, freq="min", tz=TZ)
+    df = pd.DataFrame({c: range(5) for c in ("open", "high", "low", "close", "volume")},
+                      index=idx, dtype=float)
+    sink = cs.ColumnarSink("bars", root=str(tmp_path), fmt="csv", flush_rows=1000)
+    assert cs.record_bars("ABC", df.iloc[:3], sink) == 3
+    sink.flush()
+
+    monkeypatch.setattr(cs, "_last_bar", {})              # a new process
+    sink = cs.ColumnarSink("bars", root=str(tmp_path), fmt="csv", flush_rows=1000)
+    assert cs.record_bars("ABC", df, sink) == 2
+    assert cs.record_bars("XYZ", df.iloc[:1], sink) == 1   # no history yet
+    sink.flush()
+    out = cs.read_dataset("bars", str(tmp_path), tickers=["ABC"])
+    assert list(out["close"]) == [0, 1, 2, 3, 4]
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from sentiment import dedup
+
+FEED = [
+    {"title": "Nuvve Holding Shares Soar 40% After DOE Grant Announcement - Yahoo Finance", "link": "g1"},
+    {"title": "Nuvve Holding announces pricing of $5 million public offering - GlobeNewswire", "link": "g2"},
+    {"title": "Nuvve Holding shares soar 40% after DOE grant announcement - Reuters", "link": "g3"},
+    {"title": "Nuvve Holding stock soars 40% after DOE grant - MarketWatch", "link": "g4"},
+    {"title": "Nuvve Holding Announces Pricing of $5.0 Million Public Offering - Nasdaq", "link": "g5"},
+    {"title": "Why Nuvve Holding stock is skyrocketing today - Motley Fool", "link": "g6"},
+]
+
+
+def test_headline_tokens_normalize_outlet_case_and_plurals():
+    assert dedup.headline_tokens("Nuvve Holding Shares Soars 5.0% - Reuters") == {"nuvve", "holding", "soar", "5"}
+    assert dedup.headline_tokens("") == frozenset()
+
+
+def test_cluster_groups_rewrites_of_the_same_story():
+    clusters = dedup.cluster(FEED)
+    assert [[a["link"] for a in c.members] for c in clusters] == [
+        ["g1", "g3", "g4"], ["g2", "g5"], ["g6"]]
+    assert [c.rep["link"] for c in clusters] == ["g1", "g2", "g6"]
+
+
+def test_history_index_matches_recent_stories_only(tmp_path):
+    index = dedup.HeadlineIndex(str(tmp_path / "trades.db"), window_hours=6)
+    grant, offering, other = dedup.cluster(FEED)
+    index.add(grant.tokens, "https://reuters.example/nuvve-grant", "NVVE")
+
+    later = dedup.cluster([{"title": "Nuvve Holding shares soar 40% on DOE grant - Benzinga"}] + FEED[1:2])
+    index.resolve(later)
+    assert [c.known_url for c in later] == ["https://reuters.example/nuvve-grant", None]
+
+    assert index.lookup(grant.tokens, now=datetime.utcnow() + timedelta(hours=7)) is None
+
+
+def test_opposite_outcomes_are_different_stories():
+    beat = {"title": "Acme Q2 earnings beat estimates - Reuters", "link": "b"}
+    miss = {"title": "Acme Q2 earnings miss estimates - Reuters", "link": "m"}
+    assert len(dedup.cluster([beat, miss])) == 2
+    assert len(dedup.cluster([{"title": "Acme upgraded to buy at Jefferies"},
+                              {"title": "Acme downgraded to sell at Jefferies"}])) == 2
+    # same direction, reworded: still one story
+    assert len(dedup.cluster([{"title": "Acme shares surge after FDA approval of lead drug"},
+                              {"title": "Acme shares surged after FDA approval of lead drug - CNBC"}])) == 1
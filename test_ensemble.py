@@ -0,0 +1,72 @@
+import itertools
+
+import pytest
+from ensemble import is_trade, outcomes, run_ensemble
+
+THRESHOLD = 0.7
+GRID = [0.0, 0.2, 0.5, 0.7, 0.9, 1.0]        # includes both extremes of P(positive)
+ANSWERS = [None] + [{"positive": p, "neutral": 1 - p, "negative": 0.0} for p in GRID]
+
+
+def brute_force(vectors, remaining, penalty):
+    decisions = set()
+    for combo in itertools.product(ANSWERS, repeat=remaining):
+        decisions.add(is_trade(list(vectors) + [a for a in combo if a], penalty, THRESHOLD))
+    return True in decisions, False in decisions
+
+
+@pytest.mark.parametrize("penalty", [1.0, 0.85])
+def test_outcomes_match_exhaustive_search(penalty):
+    for n_done in range(3):
+        for answered in itertools.product(ANSWERS, repeat=n_done):
+            vectors = [a for a in answered if a]
+            got = outcomes([v["positive"] for v in vectors], 3 - n_done, penalty, THRESHOLD)
+            assert got == brute_force(vectors, 3 - n_done, penalty), (answered, penalty)
+
+
+def vec(pos, neg=None):
+    neg = 1 - pos if neg is None else neg
+    return {"positive": pos, "neutral": 1 - pos - neg, "negative": neg}
+
+
+def make_scorers(answers):
+    calls = []
+    def scorer(name, answer):
+        def fn():
+            calls.append(name)
+            return answer
+        return name, fn
+    return [scorer(n, a) for n, a in answers], calls
+
+
+def score_one(name, fn):
+    return fn()
+
+
+def test_cascade_stops_once_the_last_scorer_cannot_lift_the_mean():
+    # (0.5 + 0.05 + 1) / 3 < 0.7 whatever gpt says
+    scorers, calls = make_scorers([("finbert", vec(0.5, 0.2)),
+                                   ("llama",   vec(0.05)),
+                                   ("gpt",     vec(0.99))])
+    results, skipped = run_ensemble(scorers, score_one, 1.0, THRESHOLD)
+    assert calls == ["finbert", "llama"]
+    assert skipped == ["gpt"]
+    assert [r[0] for r in results] == ["finbert", "llama"]
+
+
+def test_cascade_skips_everything_after_low_first_prob_with_penalty():
+    # after 0.2, even two perfect answers give (0.2 + 2) / 3 × 0.85 < 0.7
+    scorers, calls = make_scorers([("finbert", vec(0.2)),
+                                   ("llama",   vec(1.0)),
+                                   ("gpt",     vec(1.0))])
+    _, skipped = run_ensemble(scorers, score_one, 0.85, THRESHOLD)
+    assert calls == ["finbert"] and skipped == ["llama", "gpt"]
+
+
+def test_full_mode_runs_every_scorer():
+    scorers, calls = make_scorers([("finbert", vec(0.05)),
+                                   ("llama",   None),
+                                   ("gpt",     vec(0.99))])
+    results, skipped = run_ensemble(scorers, score_one, 1.0, THRESHOLD, cascade=False)
+    assert calls == ["finbert", "llama", "gpt"] and skipped == []
+    assert len(results) == 2
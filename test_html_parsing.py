@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+import html_parsing
+from html_parsing import parse, css_to_xpath, ld_json, state_json
+
+PAGE = """
+<html><head><title> Acme beats estimates </title>
+<script type="application/ld+json">{"@type": "LiveBlogPosting", "liveBlogUpdate": [{"headline": "a"}]}</script>
+<script type="application/ld+json">not json</script>
+</head><body>
+<div id="summary" lang="en"><p>Acme  (NASDAQ: ACME)</p> <p>raised <b>guidance</b>.</p></div>
+<div id="summary" lang="de"><p>nein</p></div>
+<table><tr class="listRow odd" data-rowkey="NASDAQ:ACME"><td>x</td><td><span> +12.5% </span></td></tr></table>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("backend", html_parsing.BACKENDS)
+def test_backends_agree_on_selectors_and_text(backend):
+    doc = parse(PAGE, backend=backend)
+    assert doc.title() == "Acme beats estimates"
+    assert doc.select_one('div#summary[lang="en"]').text() == "Acme  (NASDAQ: ACME) raised guidance ."
+    row = doc.select_one("tr.listRow")
+    assert row.attr("data-rowkey") == "NASDAQ:ACME" and row.attr("missing", "-") == "-"
+    assert row.select("td")[1].select_one("span").text() == "+12.5%"
+    assert [p.text() for p in doc.select("div > p")] == ["Acme  (NASDAQ: ACME)", "raised guidance .", "nein"]
+    assert doc.select_one("div.post-entry") is None
+
+
+def test_css_to_xpath_subset():
+    assert css_to_xpath("tr.listRow") == \
+        ".//tr[contains(concat(' ', normalize-space(@class), ' '), ' listRow ')]"
+    assert css_to_xpath('div#summary[lang="en"] > p') == ".//div[@id='summary'][@lang='en']/p"
+    with pytest.raises(ValueError):
+        css_to_xpath("a:hover")
+
+
+def test_script_payloads_without_a_tree():
+    assert ld_json(PAGE) == [{"@type": "LiveBlogPosting", "liveBlogUpdate": [{"headline": "a"}]}]
+
+    literal = '<script>window.__STATE__ = {"news": [{"slug": "x", "t": "a;b}"}]};\nfoo()</script>'
+    assert state_json(literal) == {"news": [{"slug": "x", "t": "a;b}"}]}
+
+    encoded = r'<script>var a=1; window.__STATE__ = JSON.parse("{\"news\":[{\"slug\":\"x\\u00e9\"}]}")</script>'
+    assert state_json(encoded) == {"news": [{"slug": "xé"}]}
+
+    assert state_json("<script>window.__STATE__ = JSON.parse(\"{broken\")</script>") is None
+    assert state_json("<html><script>var x = 1</script></html>") is None
+
+
+def test_gainers_fixture_parses_the_same_on_every_backend(monkeypatch):
+    tradingview = pytest.importorskip("scraper.tradingview_gainers_scraper")
+    with open(os.path.join(os.path.dirname(__file__), "benchmarks", "fixtures",
+                           "tradingview_gainers.html"), encoding="utf-8") as f:
+        html = f.read()
+
+    rows = {}
+    for backend in html_parsing.BACKENDS:
+        monkeypatch.setattr(tradingview, "parse", lambda h, b=backend: parse(h, backend=b))
+        rows[backend] = tradingview.parse_gainers_html(html)
+    first = rows[html_parsing.BACKENDS[0]]
+    assert len(first) == 100 and first[0]["ticker"] and first[0]["pct_change"]
+    assert all(r == first for r in rows.values())
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+import requests
+
+import http_cache
+
+
+class FakeSession:
+    """Serves scripted (status, body, headers) and records request headers."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.sent.append(dict(headers or {}))
+        status, body, headers = self.responses.pop(0)
+        resp = requests.Response()
+        resp.status_code, resp._content, resp.url = status, body, url
+        resp.headers.update(headers)
+        return resp
+
+
+def test_revalidation_with_etag_and_last_modified(tmp_path):
+    cache = http_cache.HttpCache(str(tmp_path))
+    session = FakeSession(
+        (200, b"<html>v1</html>", {"ETag": '"v1"', "Last-Modified": "Fri, 09 May 2025 14:00:00 GMT",
+                                   "Content-Type": "text/html; charset=utf-8"}),
+        (304, b"", {}),
+        (200, b"<html>v2</html>", {"ETag": '"v2"'}),
+    )
+    first = cache.get("https://x.example/a", session=session)
+    assert first.text == "<html>v1</html>" and not first.from_cache
+
+    again = cache.get("https://x.example/a", session=session)            # 304 → cached body
+    assert again.text == "<html>v1</html>" and again.from_cache
+    assert session.sent[1]["If-None-Match"] == '"v1"'
+    assert session.sent[1]["If-Modified-Since"] == "Fri, 09 May 2025 14:00:00 GMT"
+
+    changed = cache.get("https://x.example/a", session=session)
+    assert changed.text == "<html>v2</html>" and not changed.from_cache
+    assert cache.get("https://x.example/a", session=session, max_age=60).text == "<html>v2</html>"
+    assert len(session.sent) == 3                                        # fresh hit: no request
+
+
+def test_offline_replay_and_content_addressing(tmp_path):
+    cache = http_cache.HttpCache(str(tmp_path))
+    cache.put("https://x.example/a", b"same body")
+    cache.put("https://x.example/b", b"same body")
+    assert cache.stats()["entries"] == 2 and cache.stats()["objects"] == 1
+
+    offline = http_cache.HttpCache(str(tmp_path), offline=True)
+    assert offline.get("https://x.example/b").content == b"same body"
+    with pytest.raises(requests.RequestException):
+        offline.get("https://x.example/missing")
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = http_cache.HttpCache(str(tmp_path), max_bytes=10**9)
+    bodies = {u: bytes(range(256)) * 40 + u.encode() for u in "abc"}   # distinct objects
+    for u, body in bodies.items():
+        cache.put(f"https://x.example/{u}", body)
+    cache.get("https://x.example/a", max_age=60)                        # a is now most recent
+    size = cache.stats()["bytes"]
+    assert cache.evict(max_bytes=size - 1) >= 1
+    assert cache.lookup("https://x.example/b") is None
+    assert cache.lookup("https://x.example/a") is not None
+
+
+def test_replaced_bodies_are_deleted(tmp_path):
+    cache = http_cache.HttpCache(str(tmp_path), max_bytes=1024 * 1024)
+    for i in range(20):
+        cache.put("https://x.example/feed", f"version {i}".encode() * 100)
+    cache.put("https://x.example/copy", b"version 19" * 100)             # shares the last body
+    cache.put("https://x.example/feed", b"final")
+    objects = [f for _, _, files in os.walk(tmp_path / "objects") for f in files]
+    assert len(objects) == 2 == cache.stats()["objects"]
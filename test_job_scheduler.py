@@ -0,0 +1,81 @@
+import threading
+from datetime import datetime, date, time as dtime
+
+import pytest
+
+from job_scheduler import Job, Scheduler, MarketCalendar, TZ_NY
+
+
+def at(hh, mm, ss=0, day=(2024, 7, 2)):
+    return datetime(*day, hh, mm, ss, tzinfo=TZ_NY)
+
+
+class FakeCalendarAPI:
+    """Alpaca's /calendar: 2024-07-03 is a half day, 2024-07-04 is a holiday."""
+
+    class Day:
+        def __init__(self, d, close):
+            self.date = datetime.combine(d, dtime())
+            self.session_open, self.session_close = dtime(4, 0), close
+
+    def get_calendar(self, start, end):
+        return [self.Day(date(2024, 7, 2), dtime(20, 0)),
+                self.Day(date(2024, 7, 3), dtime(17, 0))]
+
+
+def test_slots_align_to_wall_clock_boundaries():
+    job = Job("news", None, every_minutes=10, offset_minutes=1)
+    assert job.schedule_after(at(9, 30)) == at(9, 31)
+    assert job.schedule_after(at(9, 31)) == at(9, 41)         # strictly after
+    assert job.schedule_after(at(9, 47, 30)) == at(9, 51)     # a late wake-up doesn't drift
+    assert job.schedule_after(at(23, 55)) == at(0, 1, day=(2024, 7, 3))
+    with pytest.raises(ValueError):
+        Job("x", None, every_minutes=1, overlap="drop")
+
+
+def test_windows_and_market_calendar():
+    sched = Scheduler([], calendar=MarketCalendar(FakeCalendarAPI()))
+    gainers = Job("gainers", None, every_minutes=10)
+    trader  = Job("trader", None, every_minutes=1, window=(dtime(9, 30), dtime(11, 0)))
+    nightly = Job("maintenance", None, every_minutes=24 * 60, market_hours=False)
+
+    assert sched._in_window(gainers, at(4, 0)) and not sched._in_window(gainers, at(3, 59))
+    assert sched._in_window(gainers, at(19, 0, day=(2024, 7, 2)))
+    assert not sched._in_window(gainers, at(19, 0, day=(2024, 7, 3)))   # half day
+    assert not sched._in_window(gainers, at(12, 0, day=(2024, 7, 4)))   # holiday
+    assert sched._in_window(trader, at(9, 30)) and not sched._in_window(trader, at(11, 1))
+    assert sched._in_window(nightly, at(2, 0, day=(2024, 7, 4)))
+
+    # outside its window a slot is dropped without touching the job
+    calls = []
+    trader.func = lambda: calls.append(1)
+    sched._dispatch(trader, at(8, 0))
+    assert not trader.running and calls == []
+
+
+def _run_overlapping(overlap):
+    """Dispatch three slots while the first run is still blocked; return the run count."""
+    release, started, runs = threading.Event(), threading.Event(), []
+
+    def work():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+
+    job = Job("news", work, every_minutes=10, overlap=overlap, market_hours=False)
+    sched = Scheduler([job])
+    sched._dispatch(job, at(9, 31))
+    assert started.wait(5)
+    sched._dispatch(job, at(9, 41))
+    sched._dispatch(job, at(9, 51))
+    release.set()
+    for t in threading.enumerate():
+        if t.name == "job-news":
+            t.join(5)
+    assert not job.running and not job.queued
+    return len(runs)
+
+
+def test_overlap_skip_drops_slots_and_queue_runs_once_more():
+    assert _run_overlapping("skip") == 1
+    assert _run_overlapping("queue") == 2
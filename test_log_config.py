@@ -0,0 +1,87 @@
+import json
+import logging
+
+import pytest
+
+import log_config
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    log_config.shutdown_logging()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    for h in handlers:
+        root.addHandler(h)
+    root.setLevel(level)
+    logging.getLogger("noisy").setLevel(logging.NOTSET)
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_json_lines_carry_structured_fields(tmp_path, restore_logging):
+    logfile = str(tmp_path / "pipeline.log")
+    listener = log_config.setup_logging(level="INFO", levels="noisy=WARNING", fmt="json", logfile=logfile)
+    assert log_config.setup_logging() is listener           # idempotent
+    root = logging.getLogger()
+    assert [type(h) for h in root.handlers] == [log_config._PrepareQueueHandler]
+
+    log = log_config.get_logger("stock_news_analyzer")
+    log.info("Saved %s @ %.2f", "ACME", 0.91,
+             extra={"ticker": "ACME", "stage": "save", "prob": 0.91, "unlisted": "x"})
+    log.debug("not emitted at INFO")
+    log_config.get_logger("noisy").info("filtered by its module level")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("Scoring failed", extra={"url": "https://example.com/a", "model": "gpt"})
+    log_config.shutdown_logging()                            # flushes the queue
+
+    records = [json.loads(line) for line in read_lines(logfile)]
+    assert len(records) == 2
+    saved, failed = records
+    assert {k: saved[k] for k in ("level", "logger", "msg", "ticker", "stage", "prob")} == {
+        "level": "INFO", "logger": "stock_news_analyzer", "msg": "Saved ACME @ 0.91",
+        "ticker": "ACME", "stage": "save", "prob": 0.91}
+    assert "unlisted" not in saved and "url" not in saved
+    assert saved["thread"] == "MainThread" and isinstance(saved["ts"], float)
+    assert failed["level"] == "ERROR" and failed["model"] == "gpt"
+    assert "ValueError: boom" in failed["exc"]
+
+
+def test_text_format_appends_key_value_pairs(tmp_path, restore_logging):
+    logfile = str(tmp_path / "pipeline.log")
+    log_config.setup_logging(level="INFO", levels="", fmt="text", logfile=logfile)
+    log_config.get_logger("trader").info("Bought %d", 10, extra={"ticker": "ACME", "duration": 0.5})
+    log_config.shutdown_logging()
+    (line,) = read_lines(logfile)
+    assert line.endswith("INFO  trader: Bought 10  ticker=ACME duration=0.5")
+
+
+def test_listener_lifecycle(tmp_path, restore_logging):
+    first = str(tmp_path / "first.log")
+    listener = log_config.setup_logging(level="INFO", levels="", fmt="json", logfile=first)
+    assert listener._thread is not None and listener._thread.is_alive()
+    thread = listener._thread
+    for i in range(200):
+        log_config.get_logger("burst").info("record %d", i)
+    log_config.shutdown_logging()
+    assert not thread.is_alive() and log_config._listener is None
+    assert len(read_lines(first)) == 200                    # nothing lost on shutdown
+    log_config.shutdown_logging()                            # a second stop is a no-op
+
+    second = str(tmp_path / "second.log")
+    assert log_config.setup_logging(level="INFO", levels="", fmt="json", logfile=second) is not listener
+    log_config.get_logger("burst").info("after restart")
+    log_config.shutdown_logging()
+    assert [json.loads(l)["msg"] for l in read_lines(second)] == ["after restart"]
+
+
+def test_parse_levels():
+    assert log_config._parse_levels(" a=debug, b.c=WARNING ,bad,, ") == {"a": "DEBUG", "b.c": "WARNING"}
@@ -0,0 +1,49 @@
+import threading
+
+import metrics
+from scraper.lru_cache import LRUCache, content_key
+
+
+def test_lru_evicts_least_recently_used_and_counts_hits():
+    cache = LRUCache("test", maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1          # a is now most recent
+    cache.put("c", 3)                   # evicts b
+    assert cache.get("b") is None and cache.get("c") == 3
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 2, "hit_rate": 2 / 3}
+
+    off = LRUCache("off", maxsize=0)
+    off.put("a", 1)
+    assert off.get("a") is None and len(off) == 0
+
+
+def test_content_key_and_metrics(monkeypatch):
+    assert content_key("Nuvve soars") == content_key(b"Nuvve soars")
+    assert content_key([101, 2054, 102]) != content_key([101, 2054])
+    monkeypatch.setattr(metrics, "_enabled", True)
+    metrics.cycle_summary(reset=True)
+    cache = LRUCache("finbert_tokens", maxsize=8)
+    cache.get(content_key("x"))
+    cache.put(content_key("x"), [1, 2])
+    assert cache.get(content_key("x")) == [1, 2]
+    counters = metrics.cycle_summary(reset=True)["counters"]
+    assert counters["finbert_tokens_cache_hits"] == 1 and counters["finbert_tokens_cache_misses"] == 1
+
+
+def test_concurrent_access_stays_bounded():
+    cache = LRUCache("threads", maxsize=50)
+
+    def hammer(offset):
+        for i in range(500):
+            key = (offset + i) % 80
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+    threads = [threading.Thread(target=hammer, args=(n * 7,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = cache.stats()
+    assert stats["size"] <= 50 and stats["hits"] + stats["misses"] == 8 * 500
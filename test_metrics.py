@@ -0,0 +1,100 @@
+import json
+import threading
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    reg = metrics.Registry()
+    monkeypatch.setattr(metrics, "_registry", reg)
+    monkeypatch.setattr(metrics, "METRICS_LOG", str(tmp_path / "metrics.jsonl"))
+    monkeypatch.setattr(metrics, "PROM_FILE", None)
+    monkeypatch.setattr(metrics, "_events", False)
+    monkeypatch.setattr(metrics, "_enabled", True)
+    return reg
+
+
+def test_disabled_metrics_record_nothing(registry, monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", False)
+    with metrics.timer("feed_fetch"):
+        pass
+    metrics.incr("cache_hits")
+    assert metrics.log_cycle_summary() is None
+    assert registry.histograms == {} and registry.counters == {}
+
+
+def test_timer_timed_and_cycle_summary(registry):
+    @metrics.timed("article_extract")
+    def extract(fail=False):
+        if fail:
+            raise ValueError("boom")
+        return "text"
+
+    assert extract() == "text"
+    with pytest.raises(ValueError):
+        extract(fail=True)
+    with metrics.timer("sentiment", model="finbert"):
+        pass
+    metrics.incr("url_cache_hits", 3)
+    metrics.observe("sentiment", 0.2, model="finbert")
+
+    summary = metrics.cycle_summary()
+    assert summary["stages"]["article_extract"]["count"] == 2
+    assert summary["stages"]["sentiment[finbert]"]["count"] == 2
+    assert summary["stages"]["sentiment[finbert]"]["max"] == pytest.approx(0.2)
+    assert summary["counters"] == {"article_extract_errors": 1, "url_cache_hits": 3}
+    # a summary starts a new cycle; cumulative metrics carry on
+    assert metrics.cycle_summary()["stages"] == {}
+    assert registry.counters[("url_cache_hits", ())] == 3
+
+
+def test_concurrent_jobs_keep_separate_cycles(registry, tmp_path):
+    gainers_running, news_done = threading.Event(), threading.Event()
+
+    def gainers():
+        with metrics.job("gainers"):
+            metrics.observe("gainers_scrape", 4.0)
+            gainers_running.set()
+            news_done.wait(5)
+            metrics.incr("gainers_rows", 100)
+
+    t = threading.Thread(target=gainers)
+    t.start()
+    assert gainers_running.wait(5)
+    with metrics.job("news"):
+        worker = threading.Thread(target=metrics.bind(lambda: metrics.observe("sentiment", 0.5)))
+        worker.start()
+        worker.join()
+        metrics.incr("news_searches_saved")
+        news = metrics.log_cycle_summary("news")
+    news_done.set()
+    t.join()
+
+    assert list(news["stages"]) == ["sentiment"]
+    assert news["counters"] == {"news_searches_saved": 1}
+    logged = [json.loads(line) for line in open(tmp_path / "metrics.jsonl")]
+    assert [r["name"] for r in logged] == ["news"]
+    gainers_cycle = metrics.cycle_summary(job="gainers")
+    assert list(gainers_cycle["stages"]) == ["gainers_scrape"]
+    assert gainers_cycle["counters"] == {"gainers_rows": 100}
+
+
+def test_render_prometheus(registry):
+    metrics.observe("feed_fetch", 0.03, source="google")
+    metrics.observe("feed_fetch", 45.0, source="google")
+    metrics.incr("retries", endpoint="gpt")
+    text = metrics.render_prometheus()
+    lines = text.splitlines()
+    assert "# TYPE pipeline_feed_fetch_seconds histogram" in lines
+    assert 'pipeline_feed_fetch_seconds_bucket{source="google",le="0.025"} 0' in lines
+    assert 'pipeline_feed_fetch_seconds_bucket{source="google",le="0.05"} 1' in lines
+    assert 'pipeline_feed_fetch_seconds_bucket{source="google",le="60"} 2' in lines
+    assert 'pipeline_feed_fetch_seconds_bucket{source="google",le="+Inf"} 2' in lines
+    assert 'pipeline_feed_fetch_seconds_sum{source="google"} 45.030000' in lines
+    assert 'pipeline_feed_fetch_seconds_count{source="google"} 2' in lines
+    assert "# TYPE pipeline_retries_total counter" in lines
+    assert 'pipeline_retries_total{endpoint="gpt"} 1' in lines
+    assert text.endswith("\n")
@@ -0,0 +1,76 @@
+import time
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from priority import (parse_number, momentum_score, news_freshness,
+                      rank_gainers, PriorityScheduler)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("+265.46%", 265.46),
+    ("−3.10%",   -3.1),
+    ("7.87",     7.87),
+    ("1.2K",     1200.0),
+    ("1,234.5",  1234.5),
+    ("—",        0.0),
+    (None,       0.0),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == pytest.approx(expected)
+
+
+def test_rank_gainers_puts_big_movers_first():
+    rows = [{"ticker": f"S{i}", "pct_change": "+5.00%", "rel_volume": "1.5"} for i in range(50)]
+    rows.append({"ticker": "BIG", "pct_change": "+300.00%", "rel_volume": "12.0"})
+    assert rank_gainers(rows)[0]["ticker"] == "BIG"
+    assert momentum_score(rows[-1]) > momentum_score(rows[0])
+
+
+def test_news_freshness_halves_per_half_life():
+    now = datetime(2025, 5, 9, 14, 0)
+    fresh = [{"published": now.isoformat()}]
+    stale = [{"published": (now - timedelta(minutes=10)).isoformat()}]
+    assert news_freshness(fresh, now) == pytest.approx(1.0)
+    assert news_freshness(stale, now) == pytest.approx(0.5)
+    assert news_freshness([], now) == 0.0
+
+
+def test_scheduler_runs_highest_first_and_follow_ups():
+    order = []
+    sched = PriorityScheduler(max_workers=1)
+    sched.push(1.0, lambda: order.append("low"), name="low")
+    sched.push(5.0, lambda: (order.append("high"),
+                             sched.push(3.0, lambda: order.append("follow"), name="follow")),
+               name="high")
+    sched.push(2.0, lambda: order.append("mid"), name="mid")
+    stats = sched.run()
+    assert order == ["high", "follow", "mid", "low"]
+    assert stats == {"done": 4, "errors": 0, "skipped": []}
+
+
+def test_scheduler_budget_skips_low_priority_work():
+    sched = PriorityScheduler(max_workers=1, budget_s=0.05)
+    for p in (3.0, 2.0, 1.0):
+        sched.push(p, time.sleep, 0.1, name=f"p{p:.0f}")
+    stats = sched.run()
+    assert stats["done"] == 1
+    assert stats["skipped"] == ["p2", "p1"]
+
+
+def test_held_scheduler_waits_for_a_feeder_and_runs_in_heap_order():
+    order, scorer = [], PriorityScheduler(max_workers=1)
+    gate = threading.Event()
+    scorer.push(9.0, gate.wait, 5, name="first")      # keeps the worker busy while the feeder pushes
+
+    def feed():
+        for p in (1.0, 3.0, 2.0):
+            scorer.push(p, order.append, p, name=f"p{p:.0f}")
+        gate.set()
+        scorer.release()
+
+    scorer.hold()
+    threading.Thread(target=feed).start()
+    stats = scorer.run()
+    assert order == [3.0, 2.0, 1.0]
+    assert stats == {"done": 4, "errors": 0, "skipped": []}
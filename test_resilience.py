@@ -0,0 +1,111 @@
+import time
+import threading
+
+import pytest
+import requests
+import resilience
+from fault_server import FaultServer
+
+
+@pytest.fixture
+def server():
+    srv = FaultServer().start()
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture
+def stub_policy(monkeypatch):
+    def set_policy(**overrides):
+        policy = dict(timeout=1.0, retries=0, backoff_s=0.0, hedge_after=None,
+                      failures=2, reset_s=60.0)
+        policy.update(overrides)
+        monkeypatch.setitem(resilience.POLICIES, "stub", policy)
+        resilience.reset("stub")
+    yield set_policy
+    resilience.reset("stub")
+
+
+def fetch(url):
+    resp = requests.get(url, timeout=5)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def test_retries_through_errors_and_dropped_connections(server, stub_policy):
+    stub_policy(retries=2)
+    server.script("/q", [("error", 503), ("drop",), ("ok", {"price": 1.5})])
+    assert resilience.call("stub", fetch, server.url("/q")) == {"price": 1.5}
+    assert server.hits["/q"] == 3
+
+
+def test_timeout_stops_waiting_on_a_slow_endpoint(server, stub_policy):
+    stub_policy(timeout=0.2)
+    server.script("/slow", [("delay", 1.0, {"late": True})])
+    started = time.monotonic()
+    with pytest.raises(resilience.CallTimeout):
+        resilience.call("stub", fetch, server.url("/slow"))
+    assert time.monotonic() - started < 0.6
+
+
+def test_hedged_request_wins_over_a_slow_first_attempt(server, stub_policy):
+    stub_policy(timeout=2.0, hedge_after=0.1)
+    server.script("/h", [("delay", 1.5, {"n": 1}), ("ok", {"n": 2})])
+    started = time.monotonic()
+    assert resilience.call("stub", fetch, server.url("/h")) == {"n": 2}
+    assert time.monotonic() - started < 1.0
+
+
+def test_abandoned_attempts_do_not_run_later(stub_policy):
+    stub_policy(timeout=0.05, retries=2, bulkhead=1, failures=100)
+    release, runs = threading.Event(), []
+
+    def stuck():
+        runs.append(1)
+        release.wait(5)
+
+    # the first attempt holds the only thread; both retries queue behind it
+    with pytest.raises(resilience.CallTimeout):
+        resilience.call("stub", stuck)
+    release.set()
+    resilience.executor("stub").submit(lambda: None).result(timeout=5)
+    assert len(runs) == 1
+
+
+def test_breaker_opens_then_half_opens(server, stub_policy):
+    stub_policy(failures=2, reset_s=0.2)
+    server.script("/b", [("error", 500), ("error", 500), ("ok", {"ok": True})])
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            resilience.call("stub", fetch, server.url("/b"))
+    assert resilience.is_open("stub")
+    with pytest.raises(resilience.CircuitOpenError):
+        resilience.call("stub", fetch, server.url("/b"))
+    assert server.hits["/b"] == 2                       # skipped without a request
+
+    time.sleep(0.25)
+    assert resilience.call("stub", fetch, server.url("/b")) == {"ok": True}
+    assert not resilience.is_open("stub")
+
+
+def test_stalled_endpoint_does_not_time_out_another(stub_policy, monkeypatch):
+    stub_policy(timeout=0.05, bulkhead=2, failures=100)
+    monkeypatch.setitem(resilience.POLICIES, "other", dict(timeout=0.5, retries=0, bulkhead=2))
+    resilience.reset("other")
+    release = threading.Event()
+
+    # far more hung calls than any shared pool would have threads for
+    callers = [threading.Thread(target=lambda: pytest.raises(resilience.CallTimeout,
+                                                             resilience.call, "stub", release.wait, 5))
+               for _ in range(80)]
+    for t in callers:
+        t.start()
+    for t in callers:
+        t.join()
+    try:
+        started = time.monotonic()
+        assert resilience.call("other", lambda: "ok") == "ok"
+        assert time.monotonic() - started < 0.2
+        assert not resilience.is_open("other")
+    finally:
+        release.set()
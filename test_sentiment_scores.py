@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import sentiment_scores as ss
+
+NOW = datetime(2025, 5, 9, 14, 0)
+
+
+def test_vectors_round_trip_through_sqlite(tmp_path):
+    db = str(tmp_path / "trades.db")
+    ss.init_scores_table(db)
+    ss.save_article_scores(db, "https://a.example/x", "ABC",
+                           {"finbert": {"positive": 0.8, "neutral": 0.15, "negative": 0.05},
+                            "gpt":     {"positive": 0.6, "neutral": 0.3,  "negative": 0.1}},
+                           source="a.example", published=NOW.isoformat(), confidence=0.85)
+    [row] = ss.load_article_scores(db, ticker="ABC")
+    assert row["models"] == ["finbert", "gpt"]
+    assert row["matrix"].dtype == np.float32 and row["matrix"].shape == (2, 3)
+    np.testing.assert_allclose(row["matrix"][0], [0.8, 0.15, 0.05], rtol=1e-6)
+    assert ss.load_article_scores(db, urls=["https://a.example/x"])[0]["confidence"] == 0.85
+    assert ss.load_article_scores(db, urls=[]) == []
+
+
+def row(url, published, models, matrix, confidence=1.0, source=None):
+    return {"url": url, "source": source, "published": published, "models": models,
+            "matrix": np.asarray(matrix, dtype=np.float32), "confidence": confidence}
+
+
+def test_single_article_is_averaged_over_its_models():
+    r = row("u", NOW.isoformat(), ["finbert", "llama"], [[0.9, 0.05, 0.05], [0.7, 0.2, 0.1]])
+    prob, label = ss.score_summary(ss.aggregate([r], NOW))
+    assert label == "positive" and prob == pytest.approx(0.8)
+
+
+def test_recency_and_confidence_weighting():
+    fresh = row("a", NOW.isoformat(), ["finbert"], [[1.0, 0.0, 0.0]])
+    stale = row("b", (NOW - timedelta(minutes=60)).isoformat(), ["finbert"], [[0.0, 0.0, 1.0]])
+    # one half-life old → weight 0.5 vs 1
+    np.testing.assert_allclose(ss.aggregate([fresh, stale], NOW), [2 / 3, 0, 1 / 3], rtol=1e-6)
+
+    penalised = row("c", NOW.isoformat(), ["gpt"], [[0.8, 0.1, 0.1]], confidence=0.85)
+    prob, label = ss.score_summary(ss.aggregate([penalised], NOW))
+    assert label == "positive" and prob == pytest.approx(0.68)
+
+
+def test_model_weights_and_missing_models():
+    a = row("a", None, ["finbert", "gpt"], [[0.2, 0.6, 0.2], [0.8, 0.1, 0.1]])
+    b = row("b", None, ["gpt"], [[0.8, 0.1, 0.1]])
+    vec = ss.aggregate([a, b], NOW, model_weights={"finbert": 1.0, "gpt": 3.0})
+    # a → (0.2 + 3·0.8) / 4 = 0.65 positive; b → 0.8
+    assert vec[0] == pytest.approx((0.65 + 0.8) / 2)
+    assert ss.aggregate([row("x", None, [], np.zeros((0, 3)))], NOW) is None
+
+
+def test_to_vector_from_cached_pair():
+    np.testing.assert_allclose(ss.to_vector((0.8, "Positive")), [0.8, 0.1, 0.1], rtol=1e-6)
@@ -0,0 +1,52 @@
+import pytest
+import sentiment_state
+from sentiment_state import SentimentState
+
+T0 = 1_750_000_000.0
+HALF = 30 * 60
+
+
+@pytest.fixture(params=["sortedcontainers", "bisect"])
+def make_state(request, tmp_path, monkeypatch):
+    if request.param == "bisect":
+        monkeypatch.setattr(sentiment_state, "SortedList", None)
+    def make():
+        return SentimentState(half_life_min=30, path=str(tmp_path / "state.json"),
+                              log_path=str(tmp_path / "state.log"))
+    return make
+
+
+def test_score_decays_and_accumulates(make_state):
+    state = make_state()
+    state.update("ABC", 0.8, ts=T0)
+    assert state.score("ABC", now=T0 + HALF) == pytest.approx(0.4)
+    state.update("ABC", 0.8, ts=T0 + HALF)
+    info = state.get("ABC", now=T0 + HALF)
+    assert info["score"] == pytest.approx(1.2) and info["count"] == 2
+    assert info["last_update"] == T0 + HALF
+
+
+def test_top_k_prefers_fresh_news(make_state):
+    state = make_state()
+    state.update("OLD", 0.95, ts=T0)
+    state.update("NEW", 0.75, ts=T0 + 2 * HALF)
+    state.update("MID", 0.80, ts=T0 + HALF)
+    now = T0 + 2 * HALF
+    assert [t for t, _ in state.top_k(3, now=now)] == ["NEW", "MID", "OLD"]
+    assert [t for t, _ in state.top_k(3, now=now, min_score=0.35)] == ["NEW", "MID"]
+    assert [t for t, _ in state.top_k(1, now=now, exclude={"NEW"})] == ["MID"]
+
+
+def test_state_survives_restart_via_snapshot_and_log(make_state):
+    state = make_state()
+    state.update("ABC", 0.9, ts=T0)
+    state.compact(now=T0)
+    state.update("XYZ", 0.7, ts=T0 + 60)          # only in the log
+
+    restored = make_state().load()
+    assert len(restored) == 2
+    for ticker in ("ABC", "XYZ"):
+        assert restored.score(ticker, now=T0 + HALF) == pytest.approx(state.score(ticker, now=T0 + HALF))
+
+    restored.compact(now=T0 + 40 * HALF)              # everything decayed away
+    assert len(restored) == 0 and restored.top_k(5, now=T0 + 40 * HALF) == []
@@ -0,0 +1,94 @@
+import os
+import multiprocessing
+from datetime import datetime, timedelta
+
+import pytest
+
+import metrics
+import resilience
+from conftest import stub_model_clients
+from sentiment_state import SentimentState
+
+stub_model_clients()
+analyzer = pytest.importorskip("stock_news_analyzer")
+
+PID_LOG = None
+
+
+def stub_scorer(text):
+    with open(PID_LOG, "a") as f:
+        f.write(f"{os.getpid()}\n")
+    return {"positive": 0.9, "neutral": 0.05, "negative": 0.05}
+
+
+def failing_scorer(text):
+    raise RuntimeError("model server down")
+
+
+def scored_in(path):
+    with open(path) as f:
+        return [int(line) for line in f]
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                    reason="the sentiment pool forks its workers")
+def test_pool_scores_in_workers_and_survives_a_dead_worker(tmp_path, monkeypatch):
+    global PID_LOG
+    PID_LOG = str(tmp_path / "pids")
+    monkeypatch.setattr(analyzer, "SCORERS", (("stub", stub_scorer), ("flaky", failing_scorer)))
+    monkeypatch.setitem(resilience.POLICIES, "flaky", dict(retries=0, failures=1))
+    monkeypatch.setattr(metrics, "_registry", metrics.Registry())
+    monkeypatch.setattr(metrics, "_enabled", True)
+    resilience.reset("flaky")
+    analyzer.start_sentiment_pool(1)
+    try:
+        prob, label, used_fallback, vectors = analyzer.run_text_analysis("u1", "Acme beats")
+        assert (round(prob, 2), label, used_fallback) == (0.9, "positive", False)
+        assert scored_in(PID_LOG) != [os.getpid()]
+        # what the worker recorded reaches this process
+        summary = metrics.cycle_summary()
+        assert summary["counters"]["ensemble_articles"] == 1
+        assert summary["stages"]["sentiment[stub]"]["count"] == 1
+        assert resilience.is_open("flaky")
+        # and the worker honours the breaker opened here
+        analyzer.run_text_analysis("u1b", "Acme beats")
+        assert list(metrics.cycle_summary()["stages"]) == ["sentiment[stub]"]
+
+        for proc in list(analyzer._sentiment_pool._processes.values()):
+            proc.kill()
+            proc.join()
+        # the broken pool is dropped and this and later calls score in-thread
+        assert analyzer.run_text_analysis("u2", "Acme beats")[1] == "positive"
+        assert analyzer.run_text_analysis("u3", "Acme beats")[1] == "positive"
+        assert analyzer._sentiment_pool is None
+        assert scored_in(PID_LOG)[2:] == [os.getpid(), os.getpid()]
+    finally:
+        analyzer.stop_sentiment_pool()
+        resilience.reset("flaky")
+
+
+def test_each_new_article_feeds_the_rolling_state_once(tmp_path, monkeypatch):
+    db = str(tmp_path / "trades.db")
+    state = SentimentState(path=None, log_path=None)
+    monkeypatch.setattr(analyzer, "TRADE_DB_FILE", db)
+    monkeypatch.setattr(analyzer, "get_state", lambda: state)
+    monkeypatch.setattr(analyzer, "resolve_actual_url", lambda link: link)
+    monkeypatch.setattr(analyzer, "run_analysis",
+                        lambda url, fallback_text=None: (0.9, "positive", False,
+                                                         {"stub": {"positive": 0.9, "neutral": 0.05,
+                                                                   "negative": 0.05}}))
+    monkeypatch.setattr(analyzer, "save_trade_candidate", lambda ticker, prob: None)
+    analyzer.init_url_cache(db)
+
+    published = (datetime.utcnow() - timedelta(minutes=30)).isoformat(timespec="seconds")
+    news = [{"link": "https://example.com/acme-contract", "published": published,
+             "title": "Acme wins $40M Navy contract for drone batteries"},
+            {"link": "https://example.com/acme-ceo", "published": published,
+             "title": "Acme names former Tesla executive as chief operating officer"}]
+    for _ in range(3):                                   # the same news over three sweeps
+        analyzer.process_articles_for_ticker("NASDAQ:ACME", news)
+
+    entry = state.get("ACME")
+    assert entry["count"] == 2
+    # dated at publish time: one half-life old already
+    assert entry["score"] == pytest.approx(2 * 0.9 / 2, rel=0.01)
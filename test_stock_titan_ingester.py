@@ -0,0 +1,86 @@
+import time
+import asyncio
+
+import pytest
+
+from conftest import stub_model_clients
+
+stub_model_clients()
+ingester = pytest.importorskip("stock_titan_ingester")
+
+
+def _update(n, minute):
+    return {"@id": f"u{n}", "url": f"https://www.stocktitan.net/news/A/{n}.html",
+            "datePublished": f"2025-05-09T10:{minute:02d}:00-04:00"}
+
+
+def test_new_updates_follow_the_cursor():
+    feed = [_update(3, 30), _update(2, 20), _update(1, 10)]          # newest first
+    assert [u["@id"] for u in ingester.new_updates(feed)] == ["u1", "u2", "u3"]
+    assert [u["@id"] for u in ingester.new_updates(feed, backfill=2)] == ["u2", "u3"]
+    assert [u["@id"] for u in ingester.new_updates(feed, "u2", "2025-05-09T14:20:00")] == ["u3"]
+    assert ingester.new_updates(feed, "u3", "2025-05-09T14:30:00") == []
+    # cursor id scrolled off the page: publish time decides
+    assert [u["@id"] for u in ingester.new_updates(feed, "u0", "2025-05-09T14:15:00")] == ["u2", "u3"]
+    assert ingester.published_utc(feed[0]) == "2025-05-09T14:30:00"
+
+
+def test_ingest_fetches_only_new_updates_under_a_host_limit(tmp_path, monkeypatch):
+    db = str(tmp_path / "trades.db")
+    feed = [_update(n, n) for n in range(8, 0, -1)]
+    active, peak, scored = [0], [0], []
+
+    def scrape(url):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        active[0] -= 1
+        return "Acme (NASDAQ: ACME) wins contract", ["NASDAQ:ACME"], "summary"
+
+    monkeypatch.setattr(ingester, "fetch_live_blog_updates", lambda url: list(feed))
+    monkeypatch.setattr(ingester, "scrape_and_extract", scrape)
+    monkeypatch.setattr(ingester, "score_article",
+                        lambda url, text, tickers, source, published, db_file: scored.append(url) or ["ACME"])
+    monkeypatch.setattr(ingester, "PER_HOST_LIMIT", 3)
+
+    stats = asyncio.run(ingester.ingest(db))
+    assert stats == {"new": 8, "scored": 8, "failed": 0}
+    assert 1 < peak[0] <= 3
+    assert ingester.load_cursor(db) == ("u8", "2025-05-09T14:08:00")
+
+    feed.insert(0, _update(9, 9))
+    scored.clear()
+    assert asyncio.run(ingester.ingest(db))["new"] == 1
+    assert scored == [_update(9, 9)["url"]]
+
+
+def test_failed_fetches_hold_the_cursor_until_retried(tmp_path, monkeypatch):
+    db = str(tmp_path / "trades.db")
+    feed = [_update(3, 30), _update(2, 20), _update(1, 10)]
+    down, fetched = {feed[1]["url"]}, []
+
+    def scrape(url):
+        fetched.append(url)
+        if url in down:
+            return None, None, None
+        return "Acme (NASDAQ: ACME) wins contract", ["NASDAQ:ACME"], "summary"
+
+    monkeypatch.setattr(ingester, "fetch_live_blog_updates", lambda url: list(feed))
+    monkeypatch.setattr(ingester, "scrape_and_extract", scrape)
+    monkeypatch.setattr(ingester, "score_article", lambda *a: ["ACME"])
+
+    assert asyncio.run(ingester.ingest(db))["failed"] == 1
+    assert ingester.load_cursor(db)[0] == "u1"                    # stops before the failure
+
+    down.clear()
+    fetched.clear()
+    assert asyncio.run(ingester.ingest(db))["failed"] == 0
+    assert sorted(fetched) == sorted([feed[0]["url"], feed[1]["url"]])
+    assert ingester.load_cursor(db)[0] == "u3"
+
+    # a permanently broken update is given up on after MAX_FETCH_TRIES polls
+    feed.insert(0, _update(4, 40))
+    down.add(feed[0]["url"])
+    for _ in range(ingester.MAX_FETCH_TRIES):
+        asyncio.run(ingester.ingest(db))
+    assert ingester.load_cursor(db)[0] == "u4"
@@ -0,0 +1,73 @@
+import os
+import sys
+import subprocess
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+import backtest
+import sweep
+from conftest import make_session
+
+
+def synthetic_bars():
+    bars = {}
+    for sym, peak in (("ABC", 55.5), ("XYZ", 52.0)):
+        yday  = make_session("2024-01-02", [50] * 30)
+        today = make_session("2024-01-03", [50] * 30 + [51, 51.5, 53, peak, peak, 54, 52, 50],
+                             start="08:00")
+        today.loc[today.index[30], "volume"] = 1000.0
+        bars[sym] = pd.concat([yday, today])
+    return bars
+
+
+def test_bars_round_trip_through_shared_memory():
+    bars = synthetic_bars()
+    blocks, meta = sweep.pack_bars(bars)
+    try:
+        attached, rebuilt = sweep.attach_bars(meta)
+        for s in bars:
+            pd.testing.assert_frame_equal(rebuilt[s], bars[s][sweep.BAR_FIELDS], check_freq=False)
+        for shm in attached:
+            shm.close()
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="workers need the pandas_ta stand-in inherited by fork")
+def test_sweep_matches_run_backtest():
+    bars = synthetic_bars()
+    sentiment = backtest._normalize_sentiment(pd.DataFrame({
+        "timestamp":   ["2024-01-03 07:55", "2024-01-03 07:56"],
+        "ticker":      ["ABC", "XYZ"],
+        "probability": [0.9, 0.8],
+    }))
+    grid = {"rr": [1.5, 3.0], "risk_pct": [0.01, 0.02]}
+
+    table = sweep.run_sweep(bars, sentiment, grid, workers=2)
+    assert len(table) == 4
+    for row in table.to_dict("records"):
+        combo = {k: row[k] for k in grid}
+        expected = backtest.run_backtest(bars, sentiment, combo).summary()
+        for k, v in expected.items():
+            assert row[k] == pytest.approx(v), (combo, k)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="workers need the pandas_ta stand-in inherited by fork")
+def test_sweep_leaves_the_resource_tracker_clean():
+    # the tracker reports problems from its own process as the interpreter exits
+    script = (
+        "import conftest, test_sweep, backtest, sweep, pandas as pd\n"
+        "s = backtest._normalize_sentiment(pd.DataFrame({'timestamp': ['2024-01-03 07:55'],"
+        " 'ticker': ['ABC'], 'probability': [0.9]}))\n"
+        "print(len(sweep.run_sweep(test_sweep.synthetic_bars(), s, {'rr': [1.5, 2.0]}, workers=2)))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         capture_output=True, text=True, timeout=120)
+    assert out.stdout.strip() == "2", out.stderr
+    assert "KeyError" not in out.stderr and "leaked" not in out.stderr
@@ -0,0 +1,67 @@
+import symbol_index
+from symbol_index import AhoCorasick, build_symbols, name_aliases
+
+ASSETS = [
+    {"symbol": "NVVE", "exchange": "NASDAQ", "name": "Nuvve Holding Corp. Common Stock"},
+    {"symbol": "NVVEW", "exchange": "NASDAQ", "name": "Nuvve Holding Corp. Warrants"},
+    {"symbol": "AAL", "exchange": "NASDAQ", "name": "American Airlines Group Inc. Common Stock"},
+    {"symbol": "AAPL", "exchange": "NASDAQ", "name": "Apple Inc. Common Stock"},
+    {"symbol": "TGT", "exchange": "NYSE", "name": "Target Corporation Common Stock"},
+    {"symbol": "GOOGL", "exchange": "NASDAQ", "name": "Alphabet Inc. Class A Common Stock"},
+    {"symbol": "GOOG", "exchange": "NASDAQ", "name": "Alphabet Inc. Class C Capital Stock"},
+    {"symbol": "OLD", "exchange": "NYSE", "name": "Delisted Co", "tradable": False},
+    {"symbol": "META", "exchange": "NASDAQ", "name": "Meta Platforms, Inc. Class A Common Stock"},
+    {"symbol": "AMZN", "exchange": "NASDAQ", "name": "Amazon.com, Inc. Common Stock"},
+    {"symbol": "ORCL", "exchange": "NYSE", "name": "Oracle Corporation Common Stock"},
+    {"symbol": "EPS", "exchange": "ARCA", "name": "WisdomTree U.S. LargeCap Fund"},
+]
+
+
+def test_aho_corasick_reports_overlapping_matches():
+    ac = AhoCorasick()
+    for word in ("he", "she", "his", "hers"):
+        ac.add(word, word)
+    assert sorted((s, e, v) for s, e, v in ac.iter("ushers")) == \
+        [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    assert list(ac.iter("xyz")) == []
+
+
+def test_aliases_drop_share_class_and_legal_suffixes():
+    assert name_aliases("Nuvve Holding Corp. Common Stock") == ["nuvve holding corp", "nuvve"]
+    assert name_aliases("Target Corporation Common Stock") == ["target corporation"]
+    assert name_aliases("Nuvve Holding Corp. Warrants") == []
+    assert [s.ticker for s in build_symbols(ASSETS)] == ["NVVE", "NVVEW", "AAL", "AAPL", "TGT", "GOOGL", "GOOG",
+                                                "META", "AMZN", "ORCL", "EPS"]
+
+
+def test_tag_and_route_headlines(tmp_path):
+    db = str(tmp_path / "symbols.db")
+    symbol_index.save_symbols(build_symbols(ASSETS), db)
+    index = symbol_index.load_index(db)
+
+    assert index.tag("American Airlines Group beats; Apple slips, (NASDAQ: NVVE) jumps") == ["AAL", "AAPL", "NVVE"]
+    assert index.tag("Analyst lifts price target on $AAPL") == ["AAPL"]
+    assert index.tag("Alphabet unveils new model") == ["GOOGL", "GOOG"]
+    assert index.tag("Pineapple prices (AI) and the CEO (XYZ)") == []
+    assert index.tag("Acme earnings per share (EPS) rise") == []
+    assert index.tag("Nuvve Holding (NVVE) jumps", allowed={"NVVE"}) == ["NVVE"]
+    assert index.resolve("NASDAQ:NVVE").name.startswith("Nuvve")
+    assert index.resolve("Nuvve Holding Corp.").ticker == "NVVE"
+    assert index.search_name("NASDAQ:NVVE") == "nuvve"
+
+    news = [{"title": "Nuvve soars on DOE grant - Reuters"},
+            {"title": "Apple and Nuvve team up - Yahoo Finance"},
+            {"title": "Target cuts outlook - CNBC"},
+            {"title": "Alphabet rallies - MarketWatch"}]
+    routed = index.route(news, "NVVE", universe={"AAPL"})
+    assert routed["NVVE"] == news                  # another company's alias alone never moves an article
+    assert routed["AAPL"] == [news[1]]
+    assert "GOOGL" not in routed
+
+    # the searched company's own name isn't an alias ("Meta", "Amazon"): still kept
+    assert index.route([{"title": "Meta taps Oracle for AI capacity - Reuters"}], "META",
+                       query="meta platforms")["META"]
+    assert index.route([{"title": "Amazon signs cloud deal with Oracle - CNBC"}], "AMZN")["AMZN"]
+    # only an explicit other listing with no mention of the searched company drops it
+    assert index.route([{"title": "Oracle (NYSE: ORCL) raises guidance - CNBC"}], "NVVE") == {}
+    assert list(index.route([{"title": "Nuvve and Oracle (NYSE: ORCL) partner"}], "NVVE")) == ["NVVE"]
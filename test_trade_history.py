@@ -0,0 +1,56 @@
+import gzip
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import trade_history as th
+from conftest import stub_model_clients
+
+NOW = datetime(2025, 6, 30, 15, 0, tzinfo=th.TZ_NY)
+
+
+def test_partitions_view_and_prune(tmp_path):
+    db = str(tmp_path / "trades.db")
+    conn = sqlite3.connect(db)
+    for age in (45, 31, 2, 0):
+        th.record_candidate(conn, db, f"T{age}", 0.8, now=NOW - timedelta(days=age))
+    th.record_candidate(conn, db, "T0", 0.9, now=NOW)
+    conn.commit()
+    assert [n for _, n in th.list_partitions(conn)] == [
+        "trades_20250516", "trades_20250530", "trades_20250628", "trades_20250630"]
+    assert conn.execute("SELECT COUNT(*) FROM trade_history").fetchone()[0] == 5
+    conn.execute("CREATE TABLE analyzed_urls (url TEXT PRIMARY KEY, timestamp DATETIME)")
+    conn.executemany("INSERT INTO analyzed_urls VALUES (?, ?)",
+                     [("old", "2025-06-01 12:00:00"), ("new", "2025-06-29 12:00:00")])
+    conn.commit()
+    conn.close()
+
+    stats = th.run_maintenance(db, archive_dir=str(tmp_path / "archive"), now=NOW)
+    assert stats["partitions_dropped"] == 2 and stats["urls_deleted"] == 1
+    with gzip.open(stats["archived"][0], "rt") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "ticker,probability,sentiment,timestamp" and lines[1].startswith("T45,0.8")
+
+    conn = sqlite3.connect(db)
+    assert [n for _, n in th.list_partitions(conn)] == ["trades_20250628", "trades_20250630"]
+    assert sorted(r[0] for r in conn.execute("SELECT ticker FROM trade_history")) == ["T0", "T0", "T2"]
+    conn.close()
+
+
+def test_run_trader_query_uses_covering_index(tmp_path, monkeypatch):
+    stub_model_clients()
+    analyzer = pytest.importorskip("stock_news_analyzer")
+    db = str(tmp_path / "trades.db")
+    monkeypatch.setattr(analyzer, "TRADE_DB_FILE", db)
+    analyzer.save_trade_candidate("NASDAQ:ACME", 0.9)     # creates trades + today's partition
+
+    def plan(table):
+        return " ".join(r[-1] for r in conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT ticker FROM {table} ORDER BY probability DESC LIMIT 5"))
+
+    conn = sqlite3.connect(db)
+    assert "COVERING INDEX idx_trades_prob" in plan("trades")
+    (_, partition), = th.list_partitions(conn)
+    assert f"COVERING INDEX idx_{partition}_prob" in plan(partition)
+    conn.close()
@@ -267,6 +267,58 @@ def test_entry_signal_success(patch_api):
     assert trader.entry_signal("HHH", df)
 
 
+# -----------------------------------------------------------------------------
+# Tests for the vectorized screener (must agree with entry_signal)
+# -----------------------------------------------------------------------------
+import screener
+
+# (symbol, yesterday's high, close, volume, vwap, ema5, rsi) — same data as above
+ENTRY_FIXTURES = [
+    ("ABC", 100, [95,96,97,98,99],      [1]*5,   [0]*5,  [0]*5,  [50]*5),
+    ("XYZ", 90,  [90,91,92,93,95],      [1]*5,   [0]*5,  [0]*5,  [50]*5),
+    ("DEF", 50,  [50,51,52,53,55],      [100]*5, [10]*5, [10]*5, [50]*5),
+    ("GGG", 110, [110,111,112,113,115], [200]*5, [110,111,112,113,115],
+                 [110,111,112,113,115], [30,30,30,30,70]),
+    ("HHH", 60,  [61,62,63,64,65],      [200]*5, [60.9,61.5,62.3,63.2,64.8],
+                 [60.9,61.5,62.3,63.2,64.8], [50]*5),
+    # long enough for the 20-bar volume average to kick in
+    ("VOL", 60,  [61]*24 + [65],        [100]*24 + [140], [65]*25, [65]*25, [50]*25),
+]
+
+def _daily_bars(y_high):
+    idx = pd.date_range("2023-01-09", periods=2, freq="D", tz="America/New_York")
+    return pd.DataFrame({"high": [y_high - 5, y_high]}, index=idx)
+
+@pytest.mark.parametrize("fixture", ENTRY_FIXTURES, ids=[f[0] for f in ENTRY_FIXTURES])
+def test_screener_matches_entry_signal(patch_api, fixture):
+    symbol, y_high, close, vol, vwap, ema5, rsi = fixture
+    df = make_bar_df(close, vol, vwap, ema5, rsi)
+    patch_api._next_bars = _daily_bars(y_high)
+
+    expected = trader.entry_signal(symbol, df)
+    out = screener.screen_frames({symbol: df}, {symbol: y_high})
+    assert bool(out.at[symbol, "signal"]) == expected
+
+def test_screener_whole_universe_at_once():
+    frames, highs = {}, {}
+    for symbol, y_high, close, vol, vwap, ema5, rsi in ENTRY_FIXTURES:
+        frames[symbol] = make_bar_df(close, vol, vwap, ema5, rsi)
+        highs[symbol] = y_high
+    out = screener.screen_frames(frames, highs)
+    assert list(out.index[out["signal"]]) == ["HHH"]
+    # per-condition diagnostics explain each rejection
+    assert not out.at["ABC", "breakout"]
+    assert not out.at["DEF", "pullback"]
+    assert not out.at["GGG", "rsi"]
+    assert not out.at["VOL", "volume"]
+    assert out.at["VOL", "vol_avg"] == pytest.approx(102.0)
+
+def test_screener_missing_high_never_breaks_out():
+    df = make_bar_df([61,62,63,64,65], [200]*5, [64.8]*5, [64.8]*5, [50]*5)
+    out = screener.screen_frames({"HHH": df}, {})
+    assert not out.at["HHH", "signal"]
+
+
 # -----------------------------------------------------------------------------
 # Test size_position
 # -----------------------------------------------------------------------------
@@ -274,6 +326,24 @@ def test_size_position_default():
     assert trader.size_position("ANY") == 10
 
 
+def test_size_position_snapshot_reserves_cash(patch_api):
+    from broker_snapshot import BrokerSnapshot
+    snap = BrokerSnapshot(patch_api)
+    snap.cash = 10_000.0
+    snap.prices = {"AAA": 100.0, "BBB": 100.0}
+
+    # 2% of 10k at risk, 2% stop on $100 → 100 shares = all the cash
+    assert trader.size_position("AAA", snapshot=snap) == 100
+    assert snap.available_cash() == pytest.approx(0.0)
+    # a second entry in the same pass can't spend the same cash
+    assert trader.size_position("BBB", snapshot=snap) == 0
+
+    snap.release("AAA")
+    assert trader.size_position("BBB", snapshot=snap) == 100
+    snap.apply_fill("BBB", 100, 99.0)
+    assert snap.available_cash() == pytest.approx(100.0)
+    assert "BBB" in snap.open_symbols()
+
 # -----------------------------------------------------------------------------
 # Test submit_split_exit
 # -----------------------------------------------------------------------------
@@ -318,5 +388,28 @@ def test_submit_split_exit_full_flow(patch_api, patch_thread, monkeypatch):
     assert trail_call["type"] == "market"
 
 
+
+def test_submit_split_exit_rejected_places_no_exits(patch_api, monkeypatch):
+    monkeypatch.setattr(patch_api, "get_order", lambda oid: types.SimpleNamespace(
+        id=oid, status="rejected", filled_qty="0", filled_avg_price=None))
+
+    trader.submit_split_exit("REJ", qty=10)
+
+    # only the entry was sent, and the tracker let go of the order
+    assert len(patch_api.submit_calls) == 1
+    assert trader.get_order_tracker().pending() == []
+
+
+def test_submit_split_exit_partial_fill_exits_filled_qty(patch_api, monkeypatch):
+    monkeypatch.setattr(patch_api, "get_order", lambda oid: types.SimpleNamespace(
+        id=oid, status="canceled", filled_qty="4", filled_avg_price="50.00"))
+    placed = []
+    monkeypatch.setattr(trader, "place_split_exit",
+                        lambda symbol, qty, price, *args: placed.append((symbol, qty, price)))
+
+    trader.submit_split_exit("PRT", qty=10)
+    assert placed == [("PRT", 4, 50.0)]
+
+
 # If you want to run coverage, just do:
 #    pytest --maxfail=1 --disable-warnings -q
\ No newline at end of file
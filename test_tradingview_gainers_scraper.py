@@ -0,0 +1,24 @@
+import sqlite3
+
+import pytest
+
+tradingview = pytest.importorskip("scraper.tradingview_gainers_scraper")
+
+
+def test_gainers_table_is_swapped_only_after_the_scrape(tmp_path, monkeypatch):
+    db = str(tmp_path / "gainers.db")
+    row = {"ticker": "NASDAQ:OLD", "company_name": "Old", "pct_change": "+1%", "rel_volume": "1"}
+    tradingview.init_db(db)
+    tradingview.save_to_db(db, [row])
+
+    seen = []
+
+    def scrape(url):
+        # the news sweep reading mid-scrape still sees the previous screen
+        seen.extend(sqlite3.connect(db).execute("SELECT ticker FROM gainers").fetchall())
+        return [dict(row, ticker="NASDAQ:NEW")]
+
+    monkeypatch.setattr(tradingview, "scrape_gainers", scrape)
+    tradingview.run_scraper_pipeline(db)
+    assert seen == [("NASDAQ:OLD",)]
+    assert sqlite3.connect(db).execute("SELECT ticker FROM gainers").fetchall() == [("NASDAQ:NEW",)]
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+import work_queue
+from work_queue import SqliteQueue, BrokerServer, BrokerClient
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SqliteQueue(str(tmp_path / "jobs.db"))
+
+
+def test_enqueue_is_idempotent_per_key(queue):
+    assert queue.enqueue("ticker", {"ticker": "ABC"}, key="ticker:ABC:1") is True
+    assert queue.enqueue("ticker", {"ticker": "ABC"}, key="ticker:ABC:1") is False
+    assert queue.stats() == {"pending": 1}
+
+
+def test_lease_complete_collect_first_result_wins(queue):
+    queue.enqueue("ticker", {"ticker": "ABC"}, key="k1")
+    job = queue.lease(worker="w1")
+    assert job.payload == {"ticker": "ABC"} and job.attempts == 1
+    assert queue.lease(worker="w2") is None                     # held by w1
+
+    assert queue.complete(job.id, job.token, {"prob": 0.9}) is True
+    assert queue.complete(job.id, job.token, {"prob": 0.1}) is False
+    results = queue.collect()
+    assert [r["result"] for r in results] == [{"prob": 0.9}]
+    assert queue.collect() == []                                # collected once
+
+
+def test_expired_lease_is_redelivered_then_fails(queue):
+    queue.enqueue("ticker", {}, key="k1", max_attempts=2)
+    first = queue.lease(worker="w1", lease_s=0.01)
+    time.sleep(0.02)
+    second = queue.lease(worker="w2", lease_s=0.01)
+    assert second.id == first.id and second.attempts == 2
+    assert queue.extend(first.id, first.token) is False          # w1 lost the lease
+    assert queue.complete(first.id, first.token, {"late": True}) is False
+    time.sleep(0.02)
+    assert queue.lease(worker="w3") is None                      # out of attempts
+    assert queue.stats() == {"failed": 1}
+
+
+def test_lease_filters_by_kind(queue):
+    queue.enqueue("other", {"n": 1}, key="o1")
+    queue.enqueue("ticker", {"n": 2}, key="t1")
+    queue.enqueue("other", {"n": 3}, key="o2")
+    job = queue.lease(worker="w1", kinds=["ticker"])
+    assert job.kind == "ticker" and job.payload == {"n": 2}
+    assert queue.lease(worker="w1", kinds=["ticker"]) is None
+    assert queue.lease(worker="w2").kind == "other"
+
+
+def test_purge_drops_only_old_collected_or_failed_jobs(queue):
+    for key in ("done", "uncollected", "failed", "pending"):
+        queue.enqueue("ticker", {"key": key}, key=key, max_attempts=1)
+    for _ in range(3):
+        job = queue.lease()
+        if job.payload["key"] == "failed":
+            queue.fail(job.id, job.token, "boom")
+        else:
+            queue.complete(job.id, job.token, {"ok": True})
+    queue.collect(limit=1)                                       # only "done" is collected
+    assert queue.purge(older_than_s=60) == 0                     # nothing old enough yet
+    time.sleep(0.02)
+    assert queue.purge(older_than_s=0.01) == 2
+    assert queue.stats() == {"done": 1, "pending": 1}
+
+
+def test_fail_retries_with_backoff(queue, monkeypatch):
+    monkeypatch.setattr(work_queue, "RETRY_BASE_S", 0.0)
+    queue.enqueue("ticker", {}, key="k1", max_attempts=2)
+    job = queue.lease()
+    assert queue.fail(job.id, job.token, "boom") is True
+    retry = queue.lease()
+    assert retry.attempts == 2
+    queue.fail(retry.id, retry.token, "boom again")
+    assert queue.stats() == {"failed": 1}
+
+
+def test_tcp_broker_round_trip(queue):
+    server = BrokerServer(queue, host="127.0.0.1", port=0)
+    host, port = server.start()
+    try:
+        client = BrokerClient(host, port)
+        assert client.enqueue("ticker", {"ticker": "XYZ"}, key="k1") is True
+        job = client.lease(worker="remote")
+        assert job.payload == {"ticker": "XYZ"}
+        assert client.complete(job.id, job.token, {"prob": 0.75}) is True
+        assert client.collect()[0]["result"] == {"prob": 0.75}
+        with pytest.raises(RuntimeError):
+            client._call("drop_table")                           # not an allowed op
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,172 @@
+"""Day-partitioned trade-candidate history, retention and archiving.
+
+`trades` stays the one-row-per-ticker "latest" table that run_trader
+reads (now with a covering (probability DESC, ticker) index). Every save
+also appends to that day's partition, trades_YYYYMMDD, and the
+`trade_history` view stitches the partitions together for the backtester
+and ad-hoc queries.
+
+run_maintenance() (scheduled nightly):
+    - exports partitions older than HISTORY_RETENTION_DAYS to
+      ARCHIVE_DIR/trades_YYYYMMDD.csv.gz, then drops them
+    - deletes analyzed_urls / article_scores / headline_index rows older
+      than URL_RETENTION_DAYS and `trades` rows older than the history window
+    - VACUUMs when anything was removed, so the file actually shrinks
+Dropping a whole day is a metadata operation, so pruning cost stays
+flat however long the bot has been running.
+"""
+
+import os
+import csv
+import gzip
+import sqlite3
+import threading
+from datetime import datetime, date, timedelta
+import zoneinfo
+
+from sentiment.dedup import prune_index
+
+TZ_NY                  = zoneinfo.ZoneInfo("America/New_York")
+PARTITION_PREFIX       = "trades_"
+HISTORY_VIEW           = "trade_history"
+HISTORY_RETENTION_DAYS = 30
+URL_RETENTION_DAYS     = 7
+ARCHIVE_DIR            = "archive"
+
+_known = set()              # (db_file, partition) already created this process
+_known_lock = threading.Lock()
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+def list_partitions(conn):
+    """[(date, table name)] oldest first."""
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'trades_[0-9]*'"
+    ).fetchall()
+    out = []
+    for (name,) in rows:
+        try:
+            out.append((datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date(), name))
+        except ValueError:
+            continue
+    return sorted(out)
+
+def rebuild_view(conn):
+    conn.execute(f"DROP VIEW IF EXISTS {HISTORY_VIEW}")
+    parts = [name for _, name in list_partitions(conn)]
+    if parts:
+        union = " UNION ALL ".join(
+            f"SELECT ticker, probability, sentiment, timestamp FROM {p}" for p in parts)
+        conn.execute(f"CREATE VIEW {HISTORY_VIEW} AS {union}")
+
+def ensure_partition(conn, db_file: str, day: date) -> str:
+    name = partition_name(day)
+    with _known_lock:
+        if (db_file, name) in _known:
+            return name
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                          (name,)).fetchone()
+    if not exists:
+        conn.execute(f"""
+          CREATE TABLE IF NOT EXISTS {name} (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticker      TEXT    NOT NULL,
+            probability REAL,
+            sentiment   TEXT,
+            timestamp   TEXT    NOT NULL
+          )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_prob ON {name} (probability DESC, ticker)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_ticker ON {name} (ticker, timestamp)")
+        rebuild_view(conn)
+    with _known_lock:
+        _known.add((db_file, name))
+    return name
+
+def record_candidate(conn, db_file: str, ticker: str, probability: float,
+                     sentiment: str = "positive", now: datetime = None):
+    """Append one candidate to today's partition (caller commits)."""
+    now = now or datetime.now(TZ_NY)
+    name = ensure_partition(conn, db_file, now.date())
+    conn.execute(f"INSERT INTO {name} (ticker, probability, sentiment, timestamp) VALUES (?, ?, ?, ?)",
+                 (ticker, probability, sentiment, now.isoformat(timespec="seconds")))
+
+# ── Maintenance ───────────────────────────────────────────────────────────────
+def archive_partition(conn, name: str, archive_dir: str = ARCHIVE_DIR) -> str:
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    cur = conn.execute(f"SELECT ticker, probability, sentiment, timestamp FROM {name} ORDER BY id")
+    with gzip.open(path, "wt", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow([d[0] for d in cur.description])
+        w.writerows(cur)
+    return path
+
+def _table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                        (name,)).fetchone() is not None
+
+def prune(db_file: str,
+          retention_days: int = HISTORY_RETENTION_DAYS,
+          url_retention_days: int = URL_RETENTION_DAYS,
+          archive_dir: str = ARCHIVE_DIR,
+          now: datetime = None) -> dict:
+    """Archive + drop old partitions and delete expired cache rows. Returns counts."""
+    now = now or datetime.now(TZ_NY)
+    cutoff_day = now.date() - timedelta(days=retention_days)
+    # cache tables store SQLite CURRENT_TIMESTAMP (UTC, 'YYYY-MM-DD HH:MM:SS')
+    url_cutoff = (now.astimezone(zoneinfo.ZoneInfo("UTC")) - timedelta(days=url_retention_days)) \
+                   .strftime("%Y-%m-%d %H:%M:%S")
+    trades_cutoff = (now.astimezone(zoneinfo.ZoneInfo("UTC")) - timedelta(days=retention_days)) \
+                      .strftime("%Y-%m-%d %H:%M:%S")
+    stats = {"partitions_dropped": 0, "archived": [], "urls_deleted": 0,
+             "scores_deleted": 0, "headlines_deleted": 0, "trades_deleted": 0}
+
+    conn = sqlite3.connect(db_file, timeout=30)
+    try:
+        for day, name in list_partitions(conn):
+            if day >= cutoff_day:
+                break
+            if archive_dir:
+                stats["archived"].append(archive_partition(conn, name, archive_dir))
+            conn.execute(f"DROP TABLE {name}")
+            with _known_lock:
+                _known.discard((db_file, name))
+            stats["partitions_dropped"] += 1
+        if stats["partitions_dropped"]:
+            rebuild_view(conn)
+        if _table_exists(conn, "analyzed_urls"):
+            stats["urls_deleted"] = conn.execute(
+                "DELETE FROM analyzed_urls WHERE timestamp < ?", (url_cutoff,)).rowcount
+        if _table_exists(conn, "article_scores"):
+            stats["scores_deleted"] = conn.execute(
+                "DELETE FROM article_scores WHERE timestamp < ?", (url_cutoff,)).rowcount
+        if _table_exists(conn, "headline_index"):
+            stats["headlines_deleted"] = prune_index(conn, url_cutoff)
+        if _table_exists(conn, "trades"):
+            stats["trades_deleted"] = conn.execute(
+                "DELETE FROM trades WHERE timestamp < ?", (trades_cutoff,)).rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return stats
+
+def vacuum(db_file: str):
+    conn = sqlite3.connect(db_file, timeout=60, isolation_level=None)
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+def run_maintenance(db_file: str, **kwargs) -> dict:
+    stats = prune(db_file, **kwargs)
+    removed = (stats["partitions_dropped"] + stats["urls_deleted"] + stats["scores_deleted"]
+               + stats["headlines_deleted"] + stats["trades_deleted"])
+    if removed:
+        vacuum(db_file)
+    print(f"🧹 {db_file}: dropped {stats['partitions_dropped']} partitions, "
+          f"{stats['urls_deleted']} cached URLs, {stats['scores_deleted']} article scores, "
+          f"{stats['headlines_deleted']} indexed headlines, "
+          f"{stats['trades_deleted']} stale candidates")
+    return stats
@@ -5,14 +5,24 @@ import time
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import pandas as pd
-import numpy as np
-setattr(np, "NaN", np.nan)
-import pandas_ta as ta
 import alpaca_trade_api as tradeapi
 from alpaca_trade_api.rest import APIError
 import requests
 import pytz
 
+from strategy import (
+    compute_indicators,
+    trail_ema,
+    shares_for_risk,
+    exit_levels,
+    split_qty,
+    trail_exit_reason
+)
+from order_tracker import OrderTracker, FILL_TIMEOUT_S
+from broker_snapshot import BrokerSnapshot
+import metrics
+import resilience
+
 
 # Define TZ_NY timezone object
 TZ_NY = pytz.timezone('America/New_York')
@@ -29,6 +39,10 @@ TWELVE_KEY = os.environ['TWELVEDATA_API_KEY']
 api = tradeapi.REST(API_KEY, API_SECRET, API_BASE, api_version='v2')
 
 # ── Market‐data helper ─────────────────────────────────────────────────────────
+def _twelvedata_get(url, params):
+    return requests.get(url, params=params, timeout=resilience.http_timeout("twelvedata")).json()
+
+@metrics.timed("bar_fetch", kind="minute")
 def get_minute_bars(symbol: str,
                     start:  str,
                     end:    str,
@@ -49,14 +63,20 @@ def get_minute_bars(symbol: str,
         "timezone":   "America/New_York",
         "apikey":     TWELVE_KEY,
     }
-    r = requests.get(url, params=params).json()
-    # if window empty or error, drop dates and fetch most recent `limit` bars
-    if r.get("status") != "ok" or not r.get("values"):
-        params.pop("start_date", None)
-        params.pop("end_date",   None)
-        r = requests.get(url, params=params).json()
+    empty = pd.DataFrame(columns=["open","high","low","close","volume"])
+    try:
+        r = resilience.call("twelvedata", _twelvedata_get, url, dict(params))
+        # if window empty or error, drop dates and fetch most recent `limit` bars
         if r.get("status") != "ok" or not r.get("values"):
-            return pd.DataFrame(columns=["open","high","low","close","volume"])
+            params.pop("start_date", None)
+            params.pop("end_date",   None)
+            r = resilience.call("twelvedata", _twelvedata_get, url, dict(params))
+    except (requests.RequestException, ValueError,
+            resilience.CallTimeout, resilience.CircuitOpenError) as e:
+        print(f"[WARN] Couldn't fetch minute bars for {symbol}: {e}")
+        return empty
+    if r.get("status") != "ok" or not r.get("values"):
+        return empty
 
     df = pd.DataFrame(r["values"])[::-1]
     df.index = pd.to_datetime(df["datetime"]) \
@@ -79,13 +99,7 @@ def get_minute_bars(symbol: str,
     })
     return df
 
-# ── Indicators & entry signal ─────────────────────────────────────────────────
-def compute_indicators(df):
-    df['vwap']   = ta.vwap(df['high'], df['low'], df['close'], df['volume'])
-    df['ema5']   = ta.ema(df['close'], length=5)
-    df['rsi14']  = ta.rsi(df['close'], length=14)
-    return df
-
+# ── Entry signal ──────────────────────────────────────────────────────────────
 def entry_signal(symbol, df):
     """
     Return True if all conditions met on the last bar:
@@ -137,80 +151,179 @@ def entry_signal(symbol, df):
         return False
     return True
 
+@metrics.timed("bar_fetch", kind="daily")
+def get_yesterday_highs(last_bar_ts: dict) -> dict:
+    """
+    Batched version of entry_signal's daily-bar lookup: one get_bars call
+    for every symbol in {symbol: timestamp of its last minute bar}.
+    Returns {symbol: yesterday's high}; symbols without daily data are
+    left out (the screener treats them as not breaking out).
+    """
+    symbols = list(last_bar_ts)
+    if not symbols:
+        return {}
+    end_d   = pd.Timestamp.now(tz='America/New_York')
+    start_d = (end_d - pd.Timedelta(days=2)).isoformat()
+    try:
+        raw_day = resilience.call(
+            "alpaca", api.get_bars,
+            symbols,
+            tradeapi.TimeFrame.Day,
+            start=start_d,
+            end=end_d.isoformat(),
+            retry_on=(requests.RequestException, resilience.CallTimeout)
+        ).df
+    except (APIError, requests.RequestException,
+            resilience.CallTimeout, resilience.CircuitOpenError) as e:
+        print(f"[WARN] Couldn't fetch daily bars for {len(symbols)} symbols: {e}")
+        return {}
+    if raw_day.empty:
+        return {}
+
+    today_floor = end_d.floor('D')
+    highs = {}
+    for symbol in symbols:
+        # multi-symbol responses come back either MultiIndexed or with a 'symbol' column
+        if isinstance(raw_day.index, pd.MultiIndex):
+            if symbol not in raw_day.index.get_level_values(0):
+                continue
+            day_df = raw_day.xs(symbol, level=0)
+        elif 'symbol' in raw_day.columns:
+            day_df = raw_day[raw_day['symbol'] == symbol]
+        else:
+            day_df = raw_day
+        if day_df.empty:
+            continue
+        if last_bar_ts[symbol].floor('D') == today_floor:
+            if len(day_df) < 2:
+                continue
+            highs[symbol] = float(day_df['high'].iloc[-2])
+        else:
+            highs[symbol] = float(day_df['high'].iloc[-1])
+    return highs
+
 # ── Position sizing (risk‐based) ─────────────────────────────────────────
 def size_position(symbol: str,
                   risk_pct: float = 0.02,
-                  stop_pct: float = 0.02
+                  stop_pct: float = 0.02,
+                  snapshot: BrokerSnapshot = None
                  ) -> int:
     """
     Buy a number of shares so that if the trade stops out at stop_pct
     below entry, you lose no more than risk_pct of your account cash.
+    With a snapshot, cash and price come from it instead of the API and
+    the cash for the returned quantity is reserved there (capped at what
+    is still unreserved).
     """
     # 1) How much cash do we have?
-    acct = api.get_account()
-    cash = float(acct.cash)
+    if snapshot is not None:
+        cash = snapshot.available_cash()
+    else:
+        acct = api.get_account()
+        cash = float(acct.cash)
 
     # 2) Risk budget in dollars
-    risk_amount = cash * risk_pct
-    if risk_amount < 1:
+    if cash * risk_pct < 1:
         return 0
 
     # 3) Estimate entry price
-    try:
-        last_trade = api.get_last_trade(symbol)
-        entry_price = float(last_trade.price)
-    except Exception:
-        # fallback to last bar close
-        df = get_minute_bars(
-            symbol,
-            (datetime.now(TZ_NY) - timedelta(minutes=5)).isoformat(),
-            datetime.now(TZ_NY).isoformat(),
-            limit=2
-        )
-        if df.empty:
-            return 0
-        entry_price = float(df['close'].iloc[-1])
-
-    # 4) risk per share
-    share_risk = entry_price * stop_pct
-    if share_risk <= 0:
-        return 0
+    entry_price = snapshot.price(symbol) if snapshot is not None else None
+    if entry_price is None:
+        try:
+            last_trade = api.get_last_trade(symbol)
+            entry_price = float(last_trade.price)
+        except Exception:
+            # fallback to last bar close
+            df = get_minute_bars(
+                symbol,
+                (datetime.now(TZ_NY) - timedelta(minutes=5)).isoformat(),
+                datetime.now(TZ_NY).isoformat(),
+                limit=2
+            )
+            if df.empty:
+                return 0
+            entry_price = float(df['close'].iloc[-1])
 
-    # 5) compute qty
-    qty = int(risk_amount / share_risk)
-    return max(qty, 0)
+    # 4) compute qty from risk per share
+    if snapshot is None:
+        return shares_for_risk(cash, entry_price, risk_pct, stop_pct)
+    with snapshot.lock:
+        qty = shares_for_risk(snapshot.available_cash(), entry_price, risk_pct, stop_pct)
+        return snapshot.reserve(symbol, qty, entry_price) if qty > 0 else 0
 
 # ── Split‐exit order logic ───────────────────────────────────────────────────
+def _submit_order(**kwargs):
+    with metrics.timer("order_submit", side=kwargs.get("side")):
+        return api.submit_order(**kwargs)
+
+order_tracker = None
+
+def get_order_tracker() -> OrderTracker:
+    """Shared fill tracker for the current Alpaca client."""
+    global order_tracker
+    if order_tracker is None or order_tracker.api is not api:
+        order_tracker = OrderTracker(api)
+    return order_tracker
+
 def submit_split_exit(symbol: str,
                       qty: int,
                       stop_pct: float = 0.02,
                       rr: float     = 2.0,
-                      ema_len: int  = 5):
-    order = api.submit_order(
-        symbol=symbol,
-        qty=qty,
-        side='buy',
-        type='market',
-        time_in_force='day'
-    )
-    entry_price = None
-    while entry_price is None:
-        time.sleep(0.2)
-        o = api.get_order(order.id)
-        if o.filled_avg_price:
-            entry_price = float(o.filled_avg_price)
-    stop_price   = round(entry_price * (1 - stop_pct), 2)
-    target_price = round(entry_price * (1 + stop_pct * rr), 2)
-    half_qty     = qty // 2
-    trail_qty    = qty - half_qty
-    api.submit_order(
-        symbol=symbol,
-        qty=half_qty,
-        side='sell',
-        type='limit',
-        time_in_force='day',
-        limit_price=target_price
-    )
+                      ema_len: int  = 5,
+                      timeout: float = FILL_TIMEOUT_S,
+                      snapshot: BrokerSnapshot = None):
+    """
+    Submit the market entry and return right away; the shared order
+    tracker places the split exit once the fill comes in (on the filled
+    quantity if only part of the order fills before `timeout`).
+    A snapshot, if given, is updated with the fill or has its cash
+    reservation released when the entry fails.
+    """
+    try:
+        order = _submit_order(
+            symbol=symbol,
+            qty=qty,
+            side='buy',
+            type='market',
+            time_in_force='day'
+        )
+    except Exception:
+        if snapshot is not None:
+            snapshot.release(symbol)
+        raise
+
+    def _on_fill(filled_qty, entry_price):
+        if snapshot is not None:
+            snapshot.apply_fill(symbol, filled_qty, entry_price)
+        place_split_exit(symbol, filled_qty, entry_price, stop_pct, rr, ema_len)
+
+    def _on_reject(reason):
+        if snapshot is not None:
+            snapshot.release(symbol)
+        print(f"✖ {symbol}: entry order {order.id} not filled ({reason}); no exits placed.")
+
+    get_order_tracker().track(order.id, qty, _on_fill, _on_reject,
+                              symbol=symbol, timeout=timeout)
+    return order
+
+def place_split_exit(symbol: str,
+                     qty: int,
+                     entry_price: float,
+                     stop_pct: float = 0.02,
+                     rr: float     = 2.0,
+                     ema_len: int  = 5):
+    """Limit-sell half at the rr target and EMA-trail the rest."""
+    stop_price, target_price = exit_levels(entry_price, stop_pct, rr)
+    half_qty, trail_qty      = split_qty(qty)
+    if half_qty:
+        _submit_order(
+            symbol=symbol,
+            qty=half_qty,
+            side='sell',
+            type='limit',
+            time_in_force='day',
+            limit_price=target_price
+        )
     print(f"→ {symbol}: Bought {qty} @ {entry_price:.2f}, "
           f"placed limit‐sell {half_qty} @ {target_price:.2f}, "
           f"hard stop @ {stop_price:.2f}")
@@ -247,7 +360,7 @@ def submit_split_exit(symbol: str,
                 last_px = local_df['close'].iloc[-1]
                 print(f"⚠️ No new bars for {symbol}. "
                       f"Selling {trail_qty} @ last known {last_px:.2f}")
-                api.submit_order(
+                _submit_order(
                     symbol=symbol,
                     qty=trail_qty,
                     side='sell',
@@ -262,12 +375,12 @@ def submit_split_exit(symbol: str,
                 local_df = local_df.iloc[-ema_len * 20 :]
 
             # 5) recompute EMA and check exit conditions
-            ema_val = ta.ema(local_df['close'], length=ema_len).iloc[-1]
+            ema_val = trail_ema(local_df['close'], ema_len).iloc[-1]
             last_px = local_df['close'].iloc[-1]
-            if last_px < ema_val or last_px < current_stop:
-                reason = "EMA" if last_px < ema_val else "STOP"
+            reason  = trail_exit_reason(last_px, ema_val, current_stop)
+            if reason:
                 print(f"⚠️ Trail exit: {symbol} at {last_px:.2f} (broke {reason})")
-                api.submit_order(
+                _submit_order(
                     symbol=symbol,
                     qty=trail_qty,
                     side='sell',
@@ -0,0 +1,392 @@
+"""Job queue for running news analysis on more than one machine.
+
+The coordinator (the trading node) enqueues one job per gainer each news
+cycle; worker processes, on this host or others, lease jobs, run the news
+fetch + extraction + sentiment and hand back a small result. The
+coordinator then collects finished results and writes them to its own
+trades table.
+
+Two backends share one interface:
+    SqliteQueue   single file, default; fine for workers on the same host
+                  or a shared volume
+    BrokerClient  talks to a BrokerServer (a thin TCP front for a
+                  SqliteQueue) so workers elsewhere need only host:port
+Delivery is at-least-once:
+    - lease() hands a job to one worker until lease_until; a worker that
+      dies simply lets the lease run out and the job is handed out again
+    - fail() retries with exponential backoff up to max_attempts
+    - jobs carry an idempotency key, so enqueuing the same ticker twice in
+      a cycle is a no-op, and only the current lease holder's complete()
+      counts; a worker whose lease expired and was re-leased is ignored
+Usage:
+    q = make_queue("sqlite:///work_queue.db")      # or "tcp://host:8765"
+    python work_queue.py broker --db work_queue.db --port 8765
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+import socketserver
+
+WORK_QUEUE_URL   = os.environ.get("WORK_QUEUE_URL", "sqlite:///work_queue.db")
+LEASE_SECONDS    = 120
+MAX_ATTEMPTS     = 3
+RETRY_BASE_S     = 2.0      # backoff after a failure: base · 2^(attempt-1)
+
+class Job:
+    __slots__ = ("id", "key", "kind", "payload", "attempts", "token")
+
+    def __init__(self, id, key, kind, payload, attempts, token):
+        self.id       = id
+        self.key      = key
+        self.kind     = kind
+        self.payload  = payload
+        self.attempts = attempts
+        self.token    = token
+
+    def to_dict(self):
+        return {s: getattr(self, s) for s in self.__slots__}
+
+    def __repr__(self):
+        return f"Job({self.id}, {self.kind}, key={self.key!r}, attempt={self.attempts})"
+
+# ── SQLite backend ────────────────────────────────────────────────────────────
+class SqliteQueue:
+    def __init__(self, path: str = "work_queue.db"):
+        self.path = path
+        conn = self._connect()
+        conn.executescript("""
+          CREATE TABLE IF NOT EXISTS jobs (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            key          TEXT    UNIQUE,
+            kind         TEXT    NOT NULL,
+            payload      TEXT    NOT NULL,
+            status       TEXT    NOT NULL DEFAULT 'pending',
+            attempts     INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            available_at REAL    NOT NULL,
+            lease_until  REAL,
+            lease_token  TEXT,
+            worker       TEXT,
+            result       TEXT,
+            error        TEXT,
+            collected    INTEGER NOT NULL DEFAULT 0,
+            created_at   REAL    NOT NULL,
+            finished_at  REAL
+          );
+          CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, available_at);
+        """)
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def enqueue(self, kind: str, payload: dict, key: str = None,
+                max_attempts: int = MAX_ATTEMPTS) -> bool:
+        """Add a job; returns False if a job with this key already exists."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            cur = conn.execute("""
+              INSERT OR IGNORE INTO jobs (key, kind, payload, max_attempts, available_at, created_at)
+              VALUES (?, ?, ?, ?, ?, ?)
+            """, (key or uuid.uuid4().hex, kind, json.dumps(payload), max_attempts, now, now))
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def lease(self, worker: str = None, lease_s: float = LEASE_SECONDS, kinds=None):
+        """Claim the oldest ready job (pending, or whose lease ran out), or None."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # expired leases that already used their last attempt are dead
+            conn.execute("""
+              UPDATE jobs SET status = 'failed', error = 'lease expired', finished_at = ?
+              WHERE status = 'leased' AND lease_until < ? AND attempts >= max_attempts
+            """, (now, now))
+            sql = """
+              SELECT id, key, kind, payload, attempts FROM jobs
+              WHERE ((status = 'pending' AND available_at <= ?)
+                  OR (status = 'leased'  AND lease_until  <  ?))
+            """
+            args = [now, now]
+            if kinds:
+                sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+                args += list(kinds)
+            row = conn.execute(sql + " ORDER BY id LIMIT 1", args).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            token = uuid.uuid4().hex
+            conn.execute("""
+              UPDATE jobs SET status = 'leased', attempts = attempts + 1,
+                     lease_until = ?, lease_token = ?, worker = ?
+              WHERE id = ?
+            """, (now + lease_s, token, worker, row[0]))
+            conn.execute("COMMIT")
+            return Job(row[0], row[1], row[2], json.loads(row[3]), row[4] + 1, token)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def extend(self, job_id: int, token: str, lease_s: float = LEASE_SECONDS) -> bool:
+        """Heartbeat: push the lease out; False if we no longer hold it."""
+        conn = self._connect()
+        try:
+            cur = conn.execute("""
+              UPDATE jobs SET lease_until = ?
+              WHERE id = ? AND lease_token = ? AND status = 'leased'
+            """, (time.time() + lease_s, job_id, token))
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def complete(self, job_id: int, token: str, result=None) -> bool:
+        """Store the result if token still holds the lease; False once it was completed or re-leased."""
+        conn = self._connect()
+        try:
+            cur = conn.execute("""
+              UPDATE jobs SET status = 'done', result = ?, finished_at = ?,
+                     lease_until = NULL, error = NULL
+              WHERE id = ? AND lease_token = ? AND status = 'leased'
+            """, (json.dumps(result), time.time(), job_id, token))
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def fail(self, job_id: int, token: str, error: str = "") -> bool:
+        """Give a job back for a retry (with backoff) or mark it failed."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (job_id, token)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return False
+            attempts, max_attempts = row
+            if attempts >= max_attempts:
+                conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                             (error, now, job_id))
+            else:
+                conn.execute("""
+                  UPDATE jobs SET status = 'pending', error = ?, lease_until = NULL,
+                         lease_token = NULL, available_at = ?
+                  WHERE id = ?
+                """, (error, now + RETRY_BASE_S * 2 ** (attempts - 1), job_id))
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def collect(self, limit: int = 500):
+        """Finished results not yet collected, marked collected as they're returned."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("""
+              SELECT id, key, kind, payload, result FROM jobs
+              WHERE status = 'done' AND collected = 0 ORDER BY finished_at LIMIT ?
+            """, (limit,)).fetchall()
+            conn.executemany("UPDATE jobs SET collected = 1 WHERE id = ?", [(r[0],) for r in rows])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return [{"id": r[0], "key": r[1], "kind": r[2],
+                 "payload": json.loads(r[3]), "result": json.loads(r[4])} for r in rows]
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        try:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        finally:
+            conn.close()
+
+    def purge(self, older_than_s: float = 86400) -> int:
+        """Delete collected/failed jobs older than older_than_s."""
+        conn = self._connect()
+        try:
+            cur = conn.execute("""
+              DELETE FROM jobs
+              WHERE ((status = 'done' AND collected = 1) OR status = 'failed') AND finished_at < ?
+            """, (time.time() - older_than_s,))
+            return cur.rowcount
+        finally:
+            conn.close()
+
+# ── TCP broker ────────────────────────────────────────────────────────────────
+# newline-delimited JSON: {"op": "lease", "args": {...}} -> {"ok": ..., "value": ...}
+_OPS = ("enqueue", "lease", "extend", "complete", "fail", "collect", "stats", "purge")
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        queue = self.server.queue
+        for line in self.rfile:
+            try:
+                req = json.loads(line)
+                if req.get("op") not in _OPS:
+                    raise ValueError(f"unknown op {req.get('op')!r}")
+                value = getattr(queue, req["op"])(**req.get("args", {}))
+                if isinstance(value, Job):
+                    value = value.to_dict()
+                resp = {"ok": True, "value": value}
+            except Exception as e:
+                resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(resp) + "\n").encode())
+
+class BrokerServer(socketserver.ThreadingTCPServer):
+    daemon_threads      = True
+    allow_reuse_address = True
+
+    def __init__(self, queue: SqliteQueue, host: str = "0.0.0.0", port: int = 8765):
+        self.queue = queue
+        super().__init__((host, port), _BrokerHandler)
+
+    def start(self):
+        """Serve on a background thread; returns (host, port) actually bound."""
+        threading.Thread(target=self.serve_forever, name="work-broker", daemon=True).start()
+        return self.server_address
+
+class BrokerClient:
+    """Same interface as SqliteQueue, over one persistent TCP connection."""
+
+    def __init__(self, host: str, port: int, timeout: float = 30):
+        self.addr    = (host, port)
+        self.timeout = timeout
+        self._sock   = None
+        self._file   = None
+        self._lock   = threading.Lock()
+
+    def _call(self, op, **args):
+        payload = (json.dumps({"op": op, "args": args}) + "\n").encode()
+        with self._lock:
+            for attempt in (1, 2):      # one reconnect on a dropped connection
+                try:
+                    if self._sock is None:
+                        self._sock = socket.create_connection(self.addr, timeout=self.timeout)
+                        self._file = self._sock.makefile("rb")
+                    self._sock.sendall(payload)
+                    line = self._file.readline()
+                    if not line:
+                        raise ConnectionError("broker closed the connection")
+                    break
+                except OSError:
+                    self.close()
+                    if attempt == 2:
+                        raise
+        resp = json.loads(line)
+        if not resp["ok"]:
+            raise RuntimeError(f"broker {op} failed: {resp['error']}")
+        return resp["value"]
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = self._file = None
+
+    def enqueue(self, kind, payload, key=None, max_attempts=MAX_ATTEMPTS):
+        return self._call("enqueue", kind=kind, payload=payload, key=key, max_attempts=max_attempts)
+
+    def lease(self, worker=None, lease_s=LEASE_SECONDS, kinds=None):
+        value = self._call("lease", worker=worker, lease_s=lease_s, kinds=kinds)
+        return Job(**value) if value else None
+
+    def extend(self, job_id, token, lease_s=LEASE_SECONDS):
+        return self._call("extend", job_id=job_id, token=token, lease_s=lease_s)
+
+    def complete(self, job_id, token, result=None):
+        return self._call("complete", job_id=job_id, token=token, result=result)
+
+    def fail(self, job_id, token, error=""):
+        return self._call("fail", job_id=job_id, token=token, error=error)
+
+    def collect(self, limit=500):
+        return self._call("collect", limit=limit)
+
+    def stats(self):
+        return self._call("stats")
+
+    def purge(self, older_than_s=86400):
+        return self._call("purge", older_than_s=older_than_s)
+
+def make_queue(url: str = WORK_QUEUE_URL):
+    """sqlite:///path/to.db or tcp://host:port."""
+    if url.startswith("sqlite:///"):
+        return SqliteQueue(url[len("sqlite:///"):])
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].rpartition(":")
+        return BrokerClient(host, int(port))
+    raise ValueError(f"unsupported work queue url: {url}")
+
+# ── Worker loop ───────────────────────────────────────────────────────────────
+def run_worker(queue, handlers: dict, worker_id: str = None, lease_s: float = LEASE_SECONDS,
+               poll_s: float = 2.0, stop: threading.Event = None):
+    """
+    Lease → handlers[job.kind](payload) → complete, until stop is set.
+    A heartbeat keeps the lease alive while a handler runs; an exception
+    hands the job back for a retry.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        job = queue.lease(worker=worker_id, lease_s=lease_s, kinds=list(handlers))
+        if job is None:
+            stop.wait(poll_s)
+            continue
+
+        done = threading.Event()
+        def heartbeat():
+            while not done.wait(lease_s / 3):
+                if not queue.extend(job.id, job.token, lease_s):
+                    return
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            result = handlers[job.kind](job.payload)
+            queue.complete(job.id, job.token, result)
+        except Exception as e:
+            print(f"[WARN] {job} failed: {e}")
+            queue.fail(job.id, job.token, str(e))
+        finally:
+            done.set()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser("Work queue broker")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("broker", help="Serve a SQLite queue over TCP")
+    b.add_argument("--db", default="work_queue.db")
+    b.add_argument("--host", default="0.0.0.0")
+    b.add_argument("--port", type=int, default=8765)
+    s = sub.add_parser("stats", help="Job counts by status")
+    s.add_argument("--queue", default=WORK_QUEUE_URL)
+    args = ap.parse_args()
+
+    if args.cmd == "broker":
+        server = BrokerServer(SqliteQueue(args.db), args.host, args.port)
+        print(f"📬 Work queue broker on {args.host}:{args.port} ({args.db})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        print(make_queue(args.queue).stats())